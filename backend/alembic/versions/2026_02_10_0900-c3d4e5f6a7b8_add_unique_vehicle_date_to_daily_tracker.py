@@ -0,0 +1,83 @@
+"""add unique (vehicle_id, date) constraint to p2h_daily_tracker
+
+Revision ID: c3d4e5f6a7b8
+Revises: b7a2c3d4e5f6
+Create Date: 2026-02-10 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d4e5f6a7b8'
+down_revision: Union[str, None] = 'b7a2c3d4e5f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1. Gabungkan tracker duplikat (hasil race check-then-insert) ke satu baris per unit/tanggal
+    op.execute("""
+        WITH ranked AS (
+            SELECT id, vehicle_id, date,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY vehicle_id, date
+                       ORDER BY updated_at NULLS LAST, id
+                   ) AS rn
+            FROM p2h_daily_tracker
+        ),
+        merged AS (
+            SELECT vehicle_id, date,
+                   bool_or(COALESCE(shift_1_done, false)) AS shift_1_done,
+                   (array_agg(shift_1_report_id) FILTER (WHERE shift_1_report_id IS NOT NULL))[1] AS shift_1_report_id,
+                   bool_or(COALESCE(shift_2_done, false)) AS shift_2_done,
+                   (array_agg(shift_2_report_id) FILTER (WHERE shift_2_report_id IS NOT NULL))[1] AS shift_2_report_id,
+                   bool_or(COALESCE(shift_3_done, false)) AS shift_3_done,
+                   (array_agg(shift_3_report_id) FILTER (WHERE shift_3_report_id IS NOT NULL))[1] AS shift_3_report_id,
+                   SUM(COALESCE(submission_count, 0)) AS submission_count
+            FROM p2h_daily_tracker
+            GROUP BY vehicle_id, date
+            HAVING COUNT(*) > 1
+        )
+        UPDATE p2h_daily_tracker t
+        SET shift_1_done = m.shift_1_done,
+            shift_1_report_id = m.shift_1_report_id,
+            shift_2_done = m.shift_2_done,
+            shift_2_report_id = m.shift_2_report_id,
+            shift_3_done = m.shift_3_done,
+            shift_3_report_id = m.shift_3_report_id,
+            submission_count = m.submission_count
+        FROM merged m, ranked r
+        WHERE t.id = r.id
+          AND r.rn = 1
+          AND t.vehicle_id = m.vehicle_id
+          AND t.date = m.date
+    """)
+
+    op.execute("""
+        WITH ranked AS (
+            SELECT id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY vehicle_id, date
+                       ORDER BY updated_at NULLS LAST, id
+                   ) AS rn
+            FROM p2h_daily_tracker
+        )
+        DELETE FROM p2h_daily_tracker t
+        USING ranked r
+        WHERE t.id = r.id AND r.rn > 1
+    """)
+
+    # 2. Constraint unik sebagai target ON CONFLICT untuk klaim shift atomik
+    op.create_unique_constraint(
+        'uq_p2h_daily_tracker_vehicle_date',
+        'p2h_daily_tracker',
+        ['vehicle_id', 'date']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_p2h_daily_tracker_vehicle_date', 'p2h_daily_tracker', type_='unique')
@@ -0,0 +1,49 @@
+"""add outbox columns to telegram_notifications
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-02-11 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e5f6a7b8c9'
+down_revision: Union[str, None] = 'c3d4e5f6a7b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'telegram_notifications',
+        sa.Column('attempt_count', sa.Integer(), nullable=False, server_default='0')
+    )
+    op.add_column(
+        'telegram_notifications',
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=True)
+    )
+
+    # Pesan outbox P2H dirender oleh dispatcher, jadi boleh kosong saat ditulis
+    op.alter_column('telegram_notifications', 'message', existing_type=sa.Text(), nullable=True)
+
+    # Index parsial untuk antrean yang belum terkirim (dipakai dispatcher). Baris yang
+    # sudah mencapai MAX_ATTEMPTS (5) tidak diklaim lagi, jadi tidak ikut di index
+    op.create_index(
+        'ix_telegram_notifications_pending',
+        'telegram_notifications',
+        ['created_at'],
+        postgresql_where=sa.text('is_sent = false AND attempt_count < 5')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_telegram_notifications_pending', table_name='telegram_notifications')
+    op.execute("UPDATE telegram_notifications SET message = '' WHERE message IS NULL")
+    op.alter_column('telegram_notifications', 'message', existing_type=sa.Text(), nullable=False)
+    op.drop_column('telegram_notifications', 'next_attempt_at')
+    op.drop_column('telegram_notifications', 'attempt_count')
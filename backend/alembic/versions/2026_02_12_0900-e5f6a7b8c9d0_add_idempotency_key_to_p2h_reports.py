@@ -0,0 +1,33 @@
+"""add idempotency_key to p2h_reports
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-02-12 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6a7b8c9d0'
+down_revision: Union[str, None] = 'd4e5f6a7b8c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('p2h_reports', sa.Column('idempotency_key', sa.String(100), nullable=True))
+    op.create_index(
+        'ix_p2h_reports_idempotency_key',
+        'p2h_reports',
+        ['idempotency_key'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_p2h_reports_idempotency_key', table_name='p2h_reports')
+    op.drop_column('p2h_reports', 'idempotency_key')
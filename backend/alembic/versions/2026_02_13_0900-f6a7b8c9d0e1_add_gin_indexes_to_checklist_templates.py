@@ -0,0 +1,38 @@
+"""add GIN indexes on checklist_templates vehicle_tags and applicable_shifts
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-02-13 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a7b8c9d0e1'
+down_revision: Union[str, None] = 'e5f6a7b8c9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_checklist_templates_vehicle_tags_gin',
+        'checklist_templates',
+        ['vehicle_tags'],
+        postgresql_using='gin'
+    )
+    op.create_index(
+        'ix_checklist_templates_applicable_shifts_gin',
+        'checklist_templates',
+        ['applicable_shifts'],
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_checklist_templates_applicable_shifts_gin', table_name='checklist_templates')
+    op.drop_index('ix_checklist_templates_vehicle_tags_gin', table_name='checklist_templates')
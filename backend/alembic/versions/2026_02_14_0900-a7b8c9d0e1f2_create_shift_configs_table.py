@@ -0,0 +1,69 @@
+"""create shift_configs table with default shift calendar
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-02-14 09:00:00
+
+"""
+from typing import Sequence, Union
+from datetime import time
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b8c9d0e1f2'
+down_revision: Union[str, None] = 'f6a7b8c9d0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Jendela yang selama ini di-hardcode di app/utils/datetime.py (jam yang benar-benar ditegakkan)
+DEFAULT_SHIFTS = [
+    # shift_type, shift_number, name, start_time, end_time, nominal_start
+    ('SHIFT', 1, 'Shift 1', time(6, 0), time(15, 0), time(7, 0)),
+    ('SHIFT', 2, 'Shift 2', time(15, 0), time(23, 0), time(15, 0)),
+    ('SHIFT', 3, 'Shift 3', time(23, 0), time(6, 0), time(23, 0)),
+    ('LONG_SHIFT', 1, 'Long Shift 1', time(6, 0), time(19, 0), time(7, 0)),
+    ('LONG_SHIFT', 2, 'Long Shift 2', time(19, 0), time(6, 0), time(19, 0)),
+    ('NON_SHIFT', 1, 'Non Shift', time(6, 0), time(16, 0), time(7, 0)),
+]
+
+
+def upgrade() -> None:
+    shift_configs = op.create_table(
+        'shift_configs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('shift_type', sa.String(20), nullable=False),
+        sa.Column('shift_number', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(50), nullable=False),
+        sa.Column('start_time', sa.Time(), nullable=False),
+        sa.Column('end_time', sa.Time(), nullable=False),
+        sa.Column('nominal_start', sa.Time(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint('shift_type', 'shift_number', name='uq_shift_configs_type_number'),
+    )
+    op.create_index('ix_shift_configs_shift_type', 'shift_configs', ['shift_type'])
+
+    op.bulk_insert(shift_configs, [
+        {
+            'id': uuid.uuid4(),
+            'shift_type': shift_type,
+            'shift_number': shift_number,
+            'name': name,
+            'start_time': start_time,
+            'end_time': end_time,
+            'nominal_start': nominal_start,
+            'is_active': True,
+        }
+        for shift_type, shift_number, name, start_time, end_time, nominal_start in DEFAULT_SHIFTS
+    ])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_shift_configs_shift_type', table_name='shift_configs')
+    op.drop_table('shift_configs')
@@ -0,0 +1,32 @@
+"""add composite keyset index to p2h_reports
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-02-15 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c9d0e1f2a3'
+down_revision: Union[str, None] = 'a7b8c9d0e1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Index (submission_date, submission_time, id) untuk cursor pagination /p2h/reports:
+    # setiap halaman cukup index scan mundur dari posisi cursor, tanpa OFFSET
+    op.create_index(
+        'ix_p2h_reports_keyset',
+        'p2h_reports',
+        ['submission_date', 'submission_time', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_p2h_reports_keyset', table_name='p2h_reports')
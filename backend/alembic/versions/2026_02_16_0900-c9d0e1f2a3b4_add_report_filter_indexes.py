@@ -0,0 +1,68 @@
+"""add indexes for /p2h/reports server-side filters
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-02-16 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d0e1f2a3b4'
+down_revision: Union[str, None] = 'b8c9d0e1f2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1. Filter unit/pemeriksa/status + urutan keyset (submission_date, submission_time, id)
+    op.create_index(
+        'ix_p2h_reports_vehicle_keyset',
+        'p2h_reports',
+        ['vehicle_id', 'submission_date', 'submission_time', 'id']
+    )
+    op.create_index(
+        'ix_p2h_reports_user_keyset',
+        'p2h_reports',
+        ['user_id', 'submission_date', 'submission_time', 'id']
+    )
+    op.create_index(
+        'ix_p2h_reports_status_keyset',
+        'p2h_reports',
+        ['overall_status', 'submission_date', 'submission_time', 'id']
+    )
+
+    # 2. Filter kategori pengguna & tipe kendaraan (kolom join)
+    op.create_index('ix_users_kategori_pengguna', 'users', ['kategori_pengguna'])
+    op.create_index('ix_vehicles_vehicle_type', 'vehicles', ['vehicle_type'])
+
+    # 3. Pencarian ILIKE '%...%' butuh index trigram
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_vehicles_plat_nomor_trgm',
+        'vehicles',
+        ['plat_nomor'],
+        postgresql_using='gin',
+        postgresql_ops={'plat_nomor': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_users_full_name_trgm',
+        'users',
+        ['full_name'],
+        postgresql_using='gin',
+        postgresql_ops={'full_name': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_full_name_trgm', table_name='users')
+    op.drop_index('ix_vehicles_plat_nomor_trgm', table_name='vehicles')
+    op.drop_index('ix_vehicles_vehicle_type', table_name='vehicles')
+    op.drop_index('ix_users_kategori_pengguna', table_name='users')
+    op.drop_index('ix_p2h_reports_status_keyset', table_name='p2h_reports')
+    op.drop_index('ix_p2h_reports_user_keyset', table_name='p2h_reports')
+    op.drop_index('ix_p2h_reports_vehicle_keyset', table_name='p2h_reports')
@@ -0,0 +1,46 @@
+"""add composite indexes for report date/status and p2h_details access paths
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-02-17 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd0e1f2a3b4c5'
+down_revision: Union[str, None] = 'c9d0e1f2a3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1. Statistik & kartu dashboard: submission_date BETWEEN ... AND overall_status = ...
+    #    ((vehicle_id, submission_date) sudah dilayani ix_p2h_reports_vehicle_keyset)
+    op.create_index(
+        'ix_p2h_reports_date_status',
+        'p2h_reports',
+        ['submission_date', 'overall_status']
+    )
+
+    # 2. p2h_details belum punya index sama sekali: setiap load detail laporan = seq scan
+    op.create_index(
+        'ix_p2h_details_report_status',
+        'p2h_details',
+        ['report_id', 'status']
+    )
+    op.create_index(
+        'ix_p2h_details_checklist_item_status',
+        'p2h_details',
+        ['checklist_item_id', 'status']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_p2h_details_checklist_item_status', table_name='p2h_details')
+    op.drop_index('ix_p2h_details_report_status', table_name='p2h_details')
+    op.drop_index('ix_p2h_reports_date_status', table_name='p2h_reports')
@@ -0,0 +1,74 @@
+"""make p2h_reports read indexes partial and replace vehicle indexes with partial ones
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-02-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f2a3b4c5d6'
+down_revision: Union[str, None] = 'd0e1f2a3b4c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Index baca p2h_reports: semua query list/statistik memfilter is_deleted = false
+REPORT_INDEXES = [
+    ('ix_p2h_reports_keyset', ['submission_date', 'submission_time', 'id']),
+    ('ix_p2h_reports_vehicle_keyset', ['vehicle_id', 'submission_date', 'submission_time', 'id']),
+    ('ix_p2h_reports_user_keyset', ['user_id', 'submission_date', 'submission_time', 'id']),
+    ('ix_p2h_reports_status_keyset', ['overall_status', 'submission_date', 'submission_time', 'id']),
+    ('ix_p2h_reports_date_status', ['submission_date', 'overall_status']),
+]
+
+
+def upgrade() -> None:
+    # 1. Ganti index penuh p2h_reports dengan versi partial (tanpa baris soft delete)
+    for name, columns in REPORT_INDEXES:
+        op.drop_index(name, table_name='p2h_reports')
+        op.create_index(name, 'p2h_reports', columns, postgresql_where=sa.text('is_deleted = false'))
+
+    # 2. Kendaraan aktif: pencarian plat (scan lambung/plat, daftar kendaraan)
+    #    dan urutan created_at (kartu detail dashboard). Index trigram penuh dari
+    #    c9d0e1f2a3b4 diganti versi partial; pencarian plat unit non-aktif (histori
+    #    laporan, export) membaca tabel vehicles yang kecil secara sequential.
+    #    users & master data tidak diubah: lookup user aktif sudah memakai unique
+    #    index phone/email, pencarian nama juga mencakup pemeriksa non-aktif, dan
+    #    tabel master data hanya puluhan baris.
+    op.drop_index('ix_vehicles_plat_nomor_trgm', table_name='vehicles')
+    op.create_index(
+        'ix_vehicles_active_plat_nomor_trgm',
+        'vehicles',
+        ['plat_nomor'],
+        postgresql_using='gin',
+        postgresql_ops={'plat_nomor': 'gin_trgm_ops'},
+        postgresql_where=sa.text('is_active')
+    )
+    op.create_index(
+        'ix_vehicles_active_created_at',
+        'vehicles',
+        ['created_at'],
+        postgresql_where=sa.text('is_active')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vehicles_active_created_at', table_name='vehicles')
+    op.drop_index('ix_vehicles_active_plat_nomor_trgm', table_name='vehicles')
+    op.create_index(
+        'ix_vehicles_plat_nomor_trgm',
+        'vehicles',
+        ['plat_nomor'],
+        postgresql_using='gin',
+        postgresql_ops={'plat_nomor': 'gin_trgm_ops'}
+    )
+
+    for name, columns in REPORT_INDEXES:
+        op.drop_index(name, table_name='p2h_reports')
+        op.create_index(name, 'p2h_reports', columns)
@@ -0,0 +1,49 @@
+"""create p2h_daily_stats aggregate table and backfill it
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-02-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a3b4c5d6e7'
+down_revision: Union[str, None] = 'e1f2a3b4c5d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1. Tabel agregat harian: satu baris per (tanggal, tipe, kategori, shift, status)
+    #    Enum dipakai ulang dari tabel vehicles / users / p2h_reports
+    op.create_table(
+        'p2h_daily_stats',
+        sa.Column('stat_date', sa.Date(), nullable=False),
+        sa.Column('vehicle_type', postgresql.ENUM(name='vehicletype', create_type=False), nullable=False),
+        sa.Column('kategori', postgresql.ENUM(name='userkategori', create_type=False), nullable=False),
+        sa.Column('shift_number', sa.Integer(), nullable=False),
+        sa.Column('overall_status', postgresql.ENUM(name='inspectionstatus', create_type=False), nullable=False),
+        sa.Column('report_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('stat_date', 'vehicle_type', 'kategori', 'shift_number', 'overall_status'),
+    )
+
+    # 2. Backfill dari seluruh histori laporan yang belum dihapus
+    op.execute("""
+        INSERT INTO p2h_daily_stats (stat_date, vehicle_type, kategori, shift_number, overall_status, report_count)
+        SELECT r.submission_date, v.vehicle_type, u.kategori_pengguna, r.shift_number, r.overall_status, count(*)
+        FROM p2h_reports r
+        JOIN vehicles v ON v.id = r.vehicle_id
+        JOIN users u ON u.id = r.user_id
+        WHERE r.is_deleted = false
+        GROUP BY r.submission_date, v.vehicle_type, u.kategori_pengguna, r.shift_number, r.overall_status
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('p2h_daily_stats')
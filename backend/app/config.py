@@ -32,6 +32,10 @@ class Settings(BaseSettings):
     APP_VERSION: str = "1.0.0"
     TIMEZONE: str = "Asia/Makassar" # WITA - Sesuai lokasi Bontang
     
+    # Jam reset tanggal operasional P2H (jendela shift ada di tabel shift_configs)
+    SHIFT_DAY_RESET_HOUR: int = 5      # Shift & Long Shift
+    NON_SHIFT_DAY_RESET_HOUR: int = 0  # Non-Shift
+    
     # CORS - Support both JSON array and comma-separated string
     CORS_ORIGINS: str = '["http://localhost:5173","http://127.0.0.1:5173"]'
     
@@ -68,6 +72,22 @@ class Settings(BaseSettings):
         
         return False
     
+    # Kompresi response (gzip, brotli jika modul brotli terpasang)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # Byte; body lebih kecil dikirim apa adanya
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_CONTENT_TYPES: str = "application/json,text/csv,text/plain"
+
+    @property
+    def compression_content_types_list(self) -> List[str]:
+        """Parse COMPRESSION_CONTENT_TYPES (comma-separated)"""
+        return [t.strip() for t in self.COMPRESSION_CONTENT_TYPES.split(",") if t.strip()]
+    
+    # Cache hasil dashboard (statistik, grafik bulanan, status per tipe, laporan terbaru)
+    DASHBOARD_CACHE_TTL_SECONDS: int = 30  # Batas umur entry; submit/hapus laporan langsung invalidasi
+    DASHBOARD_CACHE_MAX_ENTRIES: int = 256  # Kombinasi filter yang disimpan sekaligus
+    
     # Environment
     ENVIRONMENT: str = "development"
     
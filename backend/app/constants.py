@@ -132,6 +132,18 @@ class P2HSettings:
     
     # Maximum items per P2H checklist
     MAX_CHECKLIST_ITEMS = 100
+    
+    # Label shift di checklist_templates.applicable_shifts
+    CHECKLIST_SHIFT_LABELS = ["Long Shift", "No Shift", "Shift 1", "Shift 2", "Shift 3"]
+    
+    # Batch/offline submit (/p2h/submit-batch)
+    MAX_BATCH_SIZE = 50
+    MAX_OFFLINE_DAYS = 7  # Laporan offline lebih lama dari ini ditolak
+    CLOCK_SKEW_MINUTES = 5  # Toleransi jam perangkat yang lebih cepat dari server
+    
+    # Cursor pagination /p2h/reports
+    REPORTS_PAGE_SIZE = 50
+    REPORTS_MAX_PAGE_SIZE = 500
 
 
 # Cache Settings (if using Redis)
@@ -1,12 +1,15 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Tuple
 import uuid
 
 from app.database import get_db
+from app.exceptions import NotModifiedException
 from app.models.user import User, UserRole
+from app.utils.cache import VersionedCache
 from app.utils.jwt import decode_access_token
+from app.utils.response import is_not_modified
 
 # Security scheme tetap dipertahankan agar ikon gembok di Swagger tetap muncul
 # auto_error=False agar kita bisa menangani error secara kustom (misal jika token ada di cookie)
@@ -84,6 +87,35 @@ def get_current_user(
     return user
 
 
+def conditional_get(
+    cache: VersionedCache,
+    roles: Tuple[UserRole, ...] = (),
+    cache_control: str = "private, no-cache"
+):
+    """
+    Dependency factory untuk GET yang body-nya mengikuti versi `cache`.
+    Pasang di `dependencies=[...]` decorator agar dijalankan sebelum get_db dan
+    get_current_user: jika token valid (dan role di token termasuk `roles`, bila
+    diisi) serta If-None-Match/If-Modified-Since masih cocok, request langsung
+    dijawab 304 tanpa query ke database.
+    Selain itu request dibiarkan lewat, agar ditolak/dilayani dependency biasa.
+    """
+    allowed = {r.value for r in roles}
+
+    def checker(
+        request: Request,
+        credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+    ) -> None:
+        token = credentials.credentials if credentials else request.cookies.get("access_token")
+        payload = decode_access_token(token) if token else None
+        if payload is None or (allowed and payload.get("role") not in allowed):
+            return
+        if is_not_modified(request, cache.etag, cache.modified_at):
+            raise NotModifiedException(cache.etag, cache.modified_at, cache_control)
+
+    return checker
+
+
 def require_role(*allowed_roles: UserRole):
     """
     Dependency factory untuk membatasi akses berdasarkan Role.
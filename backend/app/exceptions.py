@@ -59,6 +59,15 @@ class InternalServerException(BaseAPIException):
         super().__init__(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, message=message, detail=detail)
 
 
+class NotModifiedException(Exception):
+    """Conditional GET: validator client masih berlaku, dijawab 304 tanpa body"""
+    def __init__(self, etag: str, last_modified=None, cache_control: str = "private, no-cache"):
+        super().__init__(etag)
+        self.etag = etag
+        self.last_modified = last_modified
+        self.cache_control = cache_control
+
+
 # Specific domain exceptions
 class UserNotFoundException(NotFoundException):
     """User not found exception"""
@@ -12,7 +12,9 @@ from sqlalchemy.exc import OperationalError
 
 from app.config import settings
 from app.database import engine
-from app.utils.response import base_response
+from app.utils.response import base_response, not_modified_response
+from app.exceptions import NotModifiedException
+from app.utils.compression import CompressionMiddleware
 
 # Alembic Imports
 from alembic.config import Config
@@ -222,6 +224,15 @@ async def lifespan(app: FastAPI):
     # Migration runs BEFORE app starts
     run_alembic_migration()
 
+    # Kalender shift dari tabel shift_configs (fallback ke jam default)
+    from app.database import SessionLocal
+    from app.utils.shift_clock import shift_clock
+    db = SessionLocal()
+    try:
+        shift_clock.load(db)
+    finally:
+        db.close()
+
     # Scheduler
     try:
         from app.scheduler.scheduler import start_scheduler
@@ -230,10 +241,18 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"❌ Failed to start scheduler: {str(e)}")
 
+    # Outbox dispatcher (notifikasi Telegram P2H di luar request path)
+    from app.services.notification_dispatcher import notification_dispatcher
+    notification_dispatcher.start()
+
     yield
 
     # ---------------- SHUTDOWN ----------------
     logger.info("🛑 Shutting down P2H System API...")
+    # Tutup stream SSE live dashboard agar shutdown tidak menunggu koneksi terbuka
+    from app.services.live_events import live_events
+    live_events.close()
+    await notification_dispatcher.stop()
 
 # =========================================================
 # FASTAPI APP
@@ -308,6 +327,15 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        content_types=settings.compression_content_types_list,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
 # =========================================================
 # EXCEPTION HANDLERS
 # =========================================================
@@ -323,6 +351,10 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         status_code=422
     )
 
+@app.exception_handler(NotModifiedException)
+async def not_modified_handler(request: Request, exc: NotModifiedException):
+    return not_modified_response(exc.etag, exc.cache_control, exc.last_modified)
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     message = exc.detail
@@ -392,6 +424,8 @@ app.include_router(vehicle_type.router)
 app.include_router(p2h.router, prefix="/p2h", tags=["P2H Inspection"])
 app.include_router(master_data.router, prefix="/master-data", tags=["Master Data"])
 app.include_router(dashboard.router, tags=["Dashboard"])
+app.include_router(dashboard.conditional_router)
+app.include_router(dashboard.stream_router)
 app.include_router(bulk_upload.router)
 app.include_router(export_router)
 app.include_router(health_router, prefix="/health", tags=["Health"])
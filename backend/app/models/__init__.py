@@ -12,6 +12,7 @@ from app.models.p2h import (
     P2HReport, 
     P2HDetail, 
     P2HDailyTracker, 
+    P2HDailyStat, 
     InspectionStatus, 
     FinalStatus
 )
@@ -22,6 +23,9 @@ from app.models.notification import TelegramNotification
 # Model untuk multi-user Telegram subscribers
 from app.models.telegram_subscriber import TelegramSubscriber
 
+# Kalender shift (dibaca oleh ShiftClock)
+from app.models.shift_config import ShiftConfig
+
 # __all__ memastikan bahwa saat kita import * dari models, 
 # semua class ini akan ikut terbawa.
 __all__ = [
@@ -32,8 +36,10 @@ __all__ = [
     "P2HReport",
     "P2HDetail",
     "P2HDailyTracker",
+    "P2HDailyStat",
     "InspectionStatus",
     "FinalStatus",
     "TelegramNotification",
-    "TelegramSubscriber"
+    "TelegramSubscriber",
+    "ShiftConfig"
 ]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, Enum as SQLEnum, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, Boolean, Enum as SQLEnum, DateTime, ForeignKey, Text, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -19,13 +19,27 @@ class NotificationType(str, enum.Enum):
     KIR_EXPIRY = "kir_expiry"
 
 
+# Batas percobaan kirim outbox P2H; baris yang sudah habis percobaannya keluar dari index pending
+OUTBOX_MAX_ATTEMPTS = 5
+
+
 class TelegramNotification(Base):
     """
     Model untuk mencatat setiap pesan yang dikirim (atau gagal dikirim) ke Telegram.
     Berfungsi sebagai audit log untuk memastikan alert sampai ke stakeholder.
+    
+    Untuk alert P2H tabel ini juga berfungsi sebagai outbox: baris ditulis (is_sent=False)
+    di transaksi yang sama dengan laporan, lalu dikirim oleh NotificationDispatcher.
     """
     __tablename__ = "telegram_notifications"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Antrean outbox yang masih bisa dikirim (dipindai NotificationDispatcher per poll)
+        Index(
+            'ix_telegram_notifications_pending', 'created_at',
+            postgresql_where=text(f'is_sent = false AND attempt_count < {OUTBOX_MAX_ATTEMPTS}')
+        ),
+        {'extend_existing': True}
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
@@ -39,13 +53,18 @@ class TelegramNotification(Base):
     report_id = Column(UUID(as_uuid=True), ForeignKey("p2h_reports.id"), nullable=True)
     
     # Isi pesan yang dikirimkan ke Telegram
-    message = Column(Text, nullable=False)
+    # Null untuk baris outbox P2H yang belum dirender oleh dispatcher
+    message = Column(Text, nullable=True)
     
     # Status Pengiriman
     is_sent = Column(Boolean, default=False, nullable=False)
     sent_at = Column(DateTime, nullable=True) # Kapan pesan berhasil terkirim
     error_message = Column(Text, nullable=True) # Catatan jika terjadi error (misal: bot diblokir)
     
+    # Outbox: jumlah percobaan kirim & kapan boleh dicoba lagi (juga berfungsi sebagai lease)
+    attempt_count = Column(Integer, default=0, nullable=False, server_default='0')
+    next_attempt_at = Column(DateTime, nullable=True)
+    
     # Audit Trail
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
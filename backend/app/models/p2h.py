@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Date, Time, Boolean, Enum as SQLEnum, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, Date, Time, Boolean, Enum as SQLEnum, DateTime, ForeignKey, Text, UniqueConstraint, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -6,6 +6,8 @@ import uuid
 import enum
 
 from app.database import Base
+from app.models.user import UserKategori
+from app.models.vehicle import VehicleType
 
 # --- 1. ENUMS ---
 
@@ -23,13 +25,28 @@ class FinalStatus(str, enum.Enum):
 
 # --- 2. MODELS ---
 
+# Predicate index partial untuk laporan yang belum di-soft delete
+ACTIVE_REPORT = text("is_deleted = false")
+
 class P2HReport(Base):
     """
     Header Laporan P2H. 
     Menyimpan informasi utama siapa, kapan, dan kendaraan apa.
     """
     __tablename__ = "p2h_reports"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Semua index baca bersifat partial (WHERE is_deleted = false): setiap query
+        # list/statistik memfilter laporan aktif, baris soft delete tidak ikut di index
+        # Kunci urutan keyset pagination /p2h/reports (dipindai mundur untuk urutan DESC)
+        Index('ix_p2h_reports_keyset', 'submission_date', 'submission_time', 'id', postgresql_where=ACTIVE_REPORT),
+        # Filter /p2h/reports per unit, pemeriksa, dan status dengan urutan yang sama
+        Index('ix_p2h_reports_vehicle_keyset', 'vehicle_id', 'submission_date', 'submission_time', 'id', postgresql_where=ACTIVE_REPORT),
+        Index('ix_p2h_reports_user_keyset', 'user_id', 'submission_date', 'submission_time', 'id', postgresql_where=ACTIVE_REPORT),
+        Index('ix_p2h_reports_status_keyset', 'overall_status', 'submission_date', 'submission_time', 'id', postgresql_where=ACTIVE_REPORT),
+        # Kartu/statistik dashboard: rentang tanggal + status
+        Index('ix_p2h_reports_date_status', 'submission_date', 'overall_status', postgresql_where=ACTIVE_REPORT),
+        {'extend_existing': True},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     vehicle_id = Column(UUID(as_uuid=True), ForeignKey("vehicles.id"), nullable=False, index=True)
@@ -43,6 +60,9 @@ class P2HReport(Base):
     submission_date = Column(Date, nullable=False, index=True) 
     submission_time = Column(Time, nullable=False)
     
+    # Idempotency-Key dari client (retry submit di jaringan lemah mengembalikan laporan yang sama)
+    idempotency_key = Column(String(100), nullable=True, unique=True, index=True)
+    
     # --- AUDIT TRAIL & SOFT DELETE ---
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -61,7 +81,13 @@ class P2HDetail(Base):
     Menyimpan jawaban 'BAIK' atau 'RUSAK' untuk setiap poin pertanyaan.
     """
     __tablename__ = "p2h_details"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Ambil detail per laporan (selectinload) + hitung abnormal/warning per laporan
+        Index('ix_p2h_details_report_status', 'report_id', 'status'),
+        # Statistik per item checklist (item mana yang sering abnormal)
+        Index('ix_p2h_details_checklist_item_status', 'checklist_item_id', 'status'),
+        {'extend_existing': True}
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     report_id = Column(UUID(as_uuid=True), ForeignKey("p2h_reports.id", ondelete="CASCADE"), nullable=False)
@@ -83,7 +109,11 @@ class P2HDailyTracker(Base):
     Mencegah query berat ke p2h_reports untuk pengecekan status harian.
     """
     __tablename__ = "p2h_daily_tracker"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Satu tracker per unit per tanggal operasional (target ON CONFLICT saat klaim shift)
+        UniqueConstraint('vehicle_id', 'date', name='uq_p2h_daily_tracker_vehicle_date'),
+        {'extend_existing': True}
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     vehicle_id = Column(UUID(as_uuid=True), ForeignKey("vehicles.id"), nullable=False, index=True)
@@ -107,3 +137,25 @@ class P2HDailyTracker(Base):
 
     # Relationship
     vehicle = relationship("Vehicle", back_populates="daily_trackers")
+
+class P2HDailyStat(Base):
+    """
+    Agregat harian laporan P2H untuk dashboard.
+    Satu baris per (tanggal, tipe kendaraan, kategori pengguna, shift, status)
+    berisi jumlah laporan aktif. Dipelihara di transaksi yang sama dengan submit
+    dan soft delete laporan (DailyStatsRepository), sehingga statistik dashboard
+    sebanding jumlah hari, bukan jumlah laporan.
+    """
+    __tablename__ = "p2h_daily_stats"
+    __table_args__ = {'extend_existing': True}
+    
+    stat_date = Column(Date, primary_key=True) # Tanggal operasional (submission_date)
+    vehicle_type = Column(
+        SQLEnum(VehicleType, values_callable=lambda x: [e.value for e in x]),
+        primary_key=True
+    )
+    kategori = Column(SQLEnum(UserKategori), primary_key=True) # kategori_pengguna pemeriksa
+    shift_number = Column(Integer, primary_key=True)
+    overall_status = Column(SQLEnum(InspectionStatus), primary_key=True)
+    
+    report_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,41 @@
+# app/models/shift_config.py
+
+from sqlalchemy import Column, String, Integer, Boolean, Time, DateTime, Enum as SQLEnum, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+
+from app.database import Base
+from app.models.vehicle import ShiftType
+
+
+class ShiftConfig(Base):
+    """
+    Kalender shift: jendela jam submit P2H per tipe shift kendaraan.
+    
+    - start_time: jam mulai jendela submit (sudah termasuk toleransi)
+    - end_time: jam selesai (eksklusif); end_time <= start_time berarti melewati tengah malam
+    - nominal_start: jam mulai shift resmi untuk tampilan (misal 07:00 untuk Shift 1)
+    
+    SHIFT dan LONG_SHIFT harus menutup 24 jam tanpa celah; NON_SHIFT hanya satu
+    jendela, di luar jendela P2H tidak bisa diisi. Dibaca oleh ShiftClock.
+    """
+    __tablename__ = "shift_configs"
+    __table_args__ = (
+        UniqueConstraint('shift_type', 'shift_number', name='uq_shift_configs_type_number'),
+        {'extend_existing': True}
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # VARCHAR (bukan enum Postgres) agar tidak bergantung pada isi tipe shifttype di database
+    shift_type = Column(SQLEnum(ShiftType, native_enum=False, length=20), nullable=False, index=True)
+    shift_number = Column(Integer, nullable=False)
+    name = Column(String(50), nullable=False)
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+    nominal_start = Column(Time, nullable=True)
+    is_active = Column(Boolean, default=True, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<ShiftConfig {self.shift_type.value} {self.shift_number}: {self.start_time}-{self.end_time}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Date, Boolean, Enum as SQLEnum, DateTime, ForeignKey
+from sqlalchemy import Column, String, Date, Boolean, Enum as SQLEnum, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -63,7 +63,12 @@ class WorkStatus(SoftDeleteMixin, Base):
 
 class User(Base):
     __tablename__ = "users"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Pencarian ILIKE '%...%' nama pemeriksa (butuh extension pg_trgm)
+        Index('ix_users_full_name_trgm', 'full_name', postgresql_using='gin', postgresql_ops={'full_name': 'gin_trgm_ops'}),
+        Index('ix_users_kategori_pengguna', 'kategori_pengguna'),
+        {'extend_existing': True}
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     full_name = Column(String(100), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Date, Boolean, Enum as SQLEnum, DateTime, ForeignKey
+from sqlalchemy import Column, String, Date, Boolean, Enum as SQLEnum, DateTime, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -33,7 +33,17 @@ class UnitKategori(enum.Enum):
 
 class Vehicle(Base):
     __tablename__ = "vehicles"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('ix_vehicles_vehicle_type', 'vehicle_type'),
+        # Pencarian ILIKE '%...%' plat nomor (butuh extension pg_trgm).
+        # Partial (WHERE is_active): daftar/scan kendaraan hanya membaca unit aktif
+        Index(
+            'ix_vehicles_active_plat_nomor_trgm', 'plat_nomor',
+            postgresql_using='gin', postgresql_ops={'plat_nomor': 'gin_trgm_ops'}, postgresql_where=text('is_active')
+        ),
+        Index('ix_vehicles_active_created_at', 'created_at', postgresql_where=text('is_active')),
+        {'extend_existing': True}
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     no_lambung = Column(String(50), unique=True, nullable=True, index=True)
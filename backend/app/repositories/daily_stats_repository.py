@@ -0,0 +1,309 @@
+"""
+Daily Stats Repository - Database operations for the p2h_daily_stats aggregate
+
+Pure database queries - NO business logic
+"""
+
+from collections import Counter
+from datetime import date
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Date, cast, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.p2h import P2HDailyStat, P2HReport, InspectionStatus
+from app.models.user import User, UserKategori
+from app.models.vehicle import Vehicle, VehicleType
+
+# (stat_date, vehicle_type, kategori, shift_number, overall_status)
+StatKey = Tuple[date, VehicleType, UserKategori, int, InspectionStatus]
+
+KEY_COLUMNS = ("stat_date", "vehicle_type", "kategori", "shift_number", "overall_status")
+
+
+class DailyStatsRepository:
+    """Repository for p2h_daily_stats (incrementally maintained report counts)"""
+
+    @staticmethod
+    def stat_key(report: P2HReport, vehicle_type, kategori) -> StatKey:
+        """
+        Aggregate key for one report.
+
+        Args:
+            report: P2H report (submission_date, shift_number, overall_status are read)
+            vehicle_type: Type of the report's vehicle
+            kategori: kategori_pengguna of the report's user
+
+        Returns:
+            StatKey tuple
+        """
+        return (
+            report.submission_date,
+            VehicleType(vehicle_type),
+            UserKategori(kategori),
+            report.shift_number,
+            InspectionStatus(report.overall_status),
+        )
+
+    def apply(self, db: Session, keys: Iterable[StatKey], delta: int = 1) -> None:
+        """
+        Add `delta` to the count of every key (one statement, same transaction as the caller).
+
+        Args:
+            db: Database session
+            keys: One key per report (duplicates are summed)
+            delta: +1 for new reports, -1 for soft-deleted reports
+        """
+        self.apply_counts(db, {key: count * delta for key, count in Counter(keys).items()})
+
+    def apply_counts(self, db: Session, counts: Mapping[StatKey, int]) -> None:
+        """
+        Upsert count deltas: INSERT ... ON CONFLICT DO UPDATE SET report_count = report_count + delta.
+
+        Rows are written in key order so concurrent transactions lock them in the same order.
+
+        Args:
+            db: Database session
+            counts: Delta per key
+        """
+        rows = [
+            dict(zip(KEY_COLUMNS, key), report_count=delta)
+            for key, delta in sorted(counts.items(), key=lambda item: _sort_key(item[0]))
+            if delta
+        ]
+        if not rows:
+            return
+
+        stmt = pg_insert(P2HDailyStat).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(KEY_COLUMNS),
+            set_={"report_count": P2HDailyStat.report_count + stmt.excluded.report_count}
+        )
+        db.execute(stmt)
+
+    def rebuild(self, db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+        """
+        Recompute the aggregate from p2h_reports (backfill / repair), inclusive date range.
+
+        The table is locked (EXCLUSIVE) until the caller commits, so concurrent
+        submits wait instead of being counted twice or lost.
+
+        Args:
+            db: Database session
+            start_date: Optional first date to rebuild (default: all history)
+            end_date: Optional last date to rebuild (default: all history)
+
+        Returns:
+            Number of aggregate rows written
+        """
+        db.execute(text(f"LOCK TABLE {P2HDailyStat.__tablename__} IN EXCLUSIVE MODE"))
+
+        delete = P2HDailyStat.__table__.delete().where(
+            *self._date_range(P2HDailyStat.stat_date, start_date, end_date)
+        )
+        db.execute(delete)
+
+        source = select(
+            P2HReport.submission_date,
+            Vehicle.vehicle_type,
+            User.kategori_pengguna,
+            P2HReport.shift_number,
+            P2HReport.overall_status,
+            func.count()
+        ).join(
+            Vehicle, P2HReport.vehicle_id == Vehicle.id
+        ).join(
+            User, P2HReport.user_id == User.id
+        ).where(
+            P2HReport.is_deleted == False,
+            *self._date_range(P2HReport.submission_date, start_date, end_date)
+        ).group_by(
+            P2HReport.submission_date,
+            Vehicle.vehicle_type,
+            User.kategori_pengguna,
+            P2HReport.shift_number,
+            P2HReport.overall_status
+        )
+        result = db.execute(
+            insert(P2HDailyStat).from_select([*KEY_COLUMNS, "report_count"], source)
+        )
+        return result.rowcount
+
+    def move_subject(
+        self,
+        db: Session,
+        vehicle_id: Optional[UUID] = None,
+        user_id: Optional[UUID] = None,
+        new_vehicle_type=None,
+        new_kategori=None
+    ) -> None:
+        """
+        Re-key the counts of one vehicle (type changed) or one user (kategori changed).
+
+        Must run before the new value is assigned to the vehicle/user object (the
+        read autoflushes): counts are read with the values still stored in the
+        database, subtracted there and added under the new value. Callers that
+        change vehicle_type / kategori_pengguna (vehicles, users, bulk upload)
+        call this and bump dashboard_cache after commit.
+
+        Args:
+            db: Database session
+            vehicle_id: Vehicle whose vehicle_type changes
+            user_id: User whose kategori_pengguna changes
+            new_vehicle_type: New vehicle type (with vehicle_id)
+            new_kategori: New kategori (with user_id)
+        """
+        query = select(
+            P2HReport.submission_date,
+            Vehicle.vehicle_type,
+            User.kategori_pengguna,
+            P2HReport.shift_number,
+            P2HReport.overall_status,
+            func.count()
+        ).join(
+            Vehicle, P2HReport.vehicle_id == Vehicle.id
+        ).join(
+            User, P2HReport.user_id == User.id
+        ).where(P2HReport.is_deleted == False)
+
+        if vehicle_id is not None:
+            query = query.where(P2HReport.vehicle_id == vehicle_id)
+        if user_id is not None:
+            query = query.where(P2HReport.user_id == user_id)
+
+        query = query.group_by(
+            P2HReport.submission_date,
+            Vehicle.vehicle_type,
+            User.kategori_pengguna,
+            P2HReport.shift_number,
+            P2HReport.overall_status
+        )
+
+        counts: Dict[StatKey, int] = Counter()
+        for stat_date, vehicle_type, kategori, shift_number, status, total in db.execute(query):
+            old_key = (stat_date, VehicleType(vehicle_type), UserKategori(kategori), shift_number, status)
+            new_key = (
+                stat_date,
+                VehicleType(new_vehicle_type) if vehicle_id is not None else old_key[1],
+                UserKategori(new_kategori) if user_id is not None else old_key[2],
+                shift_number,
+                status,
+            )
+            counts[old_key] -= total
+            counts[new_key] += total
+
+        self.apply_counts(db, counts)
+
+    def count_by_status(
+        self,
+        db: Session,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        vehicle_type: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Report counts per status from the aggregate.
+
+        Args:
+            db: Database session
+            start_date: Optional inclusive start date
+            end_date: Optional inclusive end date
+            vehicle_type: Optional vehicle type filter
+
+        Returns:
+            {"normal": int, "abnormal": int, "warning": int}
+        """
+        query = select(
+            P2HDailyStat.overall_status,
+            func.sum(P2HDailyStat.report_count)
+        ).where(
+            *self.filter_clauses(start_date, end_date, vehicle_type)
+        ).group_by(P2HDailyStat.overall_status)
+
+        counts = {status.value: 0 for status in InspectionStatus}
+        for status, total in db.execute(query):
+            counts[InspectionStatus(status).value] = int(total or 0)
+        return counts
+
+    def count_by_month_and_status(
+        self,
+        db: Session,
+        start_date: date,
+        end_date: date,
+        vehicle_type: Optional[str] = None
+    ) -> Dict[date, Dict[str, int]]:
+        """
+        Report counts per month and status from the aggregate.
+
+        Args:
+            db: Database session
+            start_date: Inclusive range start (first day of a month)
+            end_date: Exclusive range end (first day of a month)
+            vehicle_type: Optional vehicle type filter
+
+        Returns:
+            Dict keyed by first day of every month in the range (gap-filled with zeros):
+            {month_start: {"normal": int, "abnormal": int, "warning": int}}
+        """
+        month = cast(func.date_trunc('month', P2HDailyStat.stat_date), Date).label('month')
+        query = select(
+            month,
+            P2HDailyStat.overall_status,
+            func.sum(P2HDailyStat.report_count)
+        ).where(
+            P2HDailyStat.stat_date >= start_date,
+            P2HDailyStat.stat_date < end_date,
+            *self.filter_clauses(vehicle_type=vehicle_type)
+        ).group_by(month, P2HDailyStat.overall_status)
+
+        counts = {}
+        cursor = date(start_date.year, start_date.month, 1)
+        while cursor < end_date:
+            counts[cursor] = {status.value: 0 for status in InspectionStatus}
+            cursor = date(cursor.year + 1, 1, 1) if cursor.month == 12 else date(cursor.year, cursor.month + 1, 1)
+
+        for month_start, status, total in db.execute(query):
+            counts[month_start][InspectionStatus(status).value] = int(total or 0)
+        return counts
+
+    def filter_clauses(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        vehicle_type: Optional[str] = None
+    ) -> list:
+        """
+        WHERE clauses on p2h_daily_stats for the dashboard filters.
+
+        Args:
+            start_date: Optional inclusive start date
+            end_date: Optional inclusive end date
+            vehicle_type: Optional vehicle type filter
+
+        Returns:
+            List of SQLAlchemy boolean clauses
+        """
+        clauses = self._date_range(P2HDailyStat.stat_date, start_date, end_date)
+        if vehicle_type:
+            clauses.append(P2HDailyStat.vehicle_type == vehicle_type)
+        return clauses
+
+    @staticmethod
+    def _date_range(column, start_date: Optional[date], end_date: Optional[date]) -> list:
+        clauses = []
+        if start_date is not None:
+            clauses.append(column >= start_date)
+        if end_date is not None:
+            clauses.append(column <= end_date)
+        return clauses
+
+
+def _sort_key(key: StatKey) -> tuple:
+    stat_date, vehicle_type, kategori, shift_number, status = key
+    return (stat_date, vehicle_type.value, kategori.value, shift_number, status.value)
+
+
+# Singleton instance
+daily_stats_repository = DailyStatsRepository()
@@ -5,14 +5,16 @@ Pure database queries - NO business logic
 """
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract, and_
-from typing import Optional, Dict, Any
-from datetime import date
+from sqlalchemy import func, extract, and_, select, distinct, exists, tuple_
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import date, datetime, time
 from uuid import UUID
 
-from app.models.p2h import P2HReport
+from app.models.p2h import P2HReport, P2HDailyStat, InspectionStatus
+from app.models.user import User
 from app.models.vehicle import Vehicle
 from .p2h_repository import P2HRepository
+from .daily_stats_repository import daily_stats_repository
 
 
 class DashboardRepository:
@@ -26,43 +28,63 @@ class DashboardRepository:
         db: Session,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
-        vehicle_type: Optional[str] = None
+        vehicle_type: Optional[str] = None,
+        reported_on: Optional[date] = None
     ) -> Dict[str, int]:
         """
         Get dashboard statistics with optional date and vehicle type filters.
         
+        Report counts are summed from p2h_daily_stats (O(days), not O(reports)).
+        All card values come from a single statement: the vehicle count and the
+        reported vehicles are scalar subqueries, status counts use SUM(...) FILTER (WHERE ...).
+        
         Args:
             db: Database session
             start_date: Start date for filtering (already parsed date object)
             end_date: End date for filtering (already parsed date object)
             vehicle_type: Optional vehicle type filter
+            reported_on: Optional date for counting distinct vehicles that already
+                submitted P2H (ignores start_date/end_date, honours vehicle_type)
             
         Returns:
-            Dictionary with statistics
+            Dictionary with statistics (plus "vehicles_reported" when reported_on is given)
         """
         # Total vehicles with optional vehicle_type filter
-        vehicle_query = db.query(func.count(Vehicle.id))
+        total_vehicles = select(func.count(Vehicle.id))
         if vehicle_type:
-            vehicle_query = vehicle_query.filter(Vehicle.vehicle_type == vehicle_type)
-        total_vehicles = vehicle_query.scalar() or 0
-        
-        # P2H counts by status with date and vehicle_type filter
-        total_normal = self.p2h_repo.count_by_status(db, 'normal', start_date, end_date, vehicle_type)
-        total_abnormal = self.p2h_repo.count_by_status(db, 'abnormal', start_date, end_date, vehicle_type)
-        total_warning = self.p2h_repo.count_by_status(db, 'warning', start_date, end_date, vehicle_type)
-        
-        # Total completed P2H with vehicle_type filter
-        total_completed = self.p2h_repo.get_reports_query(
-            db, start_date, end_date, vehicle_type
-        ).count() or 0
-        
-        return {
-            "total_vehicles": total_vehicles,
-            "total_normal": total_normal,
-            "total_abnormal": total_abnormal,
-            "total_warning": total_warning,
-            "total_completed_p2h": total_completed,
-        }
+            total_vehicles = total_vehicles.where(Vehicle.vehicle_type == vehicle_type)
+        
+        def sum_reports(*conditions):
+            total = func.sum(P2HDailyStat.report_count)
+            if conditions:
+                total = total.filter(and_(*conditions))
+            return func.coalesce(total, 0)
+        
+        columns = [
+            total_vehicles.scalar_subquery().label("total_vehicles"),
+            sum_reports(P2HDailyStat.overall_status == InspectionStatus.NORMAL).label("total_normal"),
+            sum_reports(P2HDailyStat.overall_status == InspectionStatus.ABNORMAL).label("total_abnormal"),
+            sum_reports(P2HDailyStat.overall_status == InspectionStatus.WARNING).label("total_warning"),
+            sum_reports().label("total_completed_p2h"),
+        ]
+        if reported_on is not None:
+            # Unit yang sudah P2H butuh vehicle_id: dihitung dari p2h_reports untuk satu tanggal
+            reported = select(func.count(distinct(P2HReport.vehicle_id))).where(
+                P2HReport.submission_date == reported_on,
+                P2HReport.is_deleted == False
+            )
+            if vehicle_type:
+                reported = reported.join(Vehicle, P2HReport.vehicle_id == Vehicle.id).where(
+                    Vehicle.vehicle_type == vehicle_type
+                )
+            columns.append(reported.scalar_subquery().label("vehicles_reported"))
+        
+        query = select(*columns).select_from(P2HDailyStat).where(
+            *daily_stats_repository.filter_clauses(start_date, end_date, vehicle_type)
+        )
+        
+        row = db.execute(query).one()
+        return {key: int(value) for key, value in row._mapping.items()}
     
     def get_monthly_reports(
         self,
@@ -86,13 +108,14 @@ class DashboardRepository:
             "Juli", "Agustus", "September", "Oktober", "November", "Desember"
         ]
         
-        monthly_data = {}
+        # Satu query GROUP BY bulan & status atas agregat harian untuk [1 Jan, 1 Jan tahun berikutnya)
+        monthly_counts = daily_stats_repository.count_by_month_and_status(
+            db, date(year, 1, 1), date(year + 1, 1, 1), vehicle_type
+        )
         
-        for month_num in range(1, 13):
-            counts = self.p2h_repo.get_monthly_counts(
-                db, year, month_num, vehicle_type
-            )
-            month_name = month_names[month_num - 1]
+        monthly_data = {}
+        for month_start, counts in monthly_counts.items():
+            month_name = month_names[month_start.month - 1]
             monthly_data[month_name] = [
                 counts["normal"],
                 counts["abnormal"],
@@ -120,28 +143,157 @@ class DashboardRepository:
         Returns:
             Dictionary with counts by status
         """
-        # Base query with vehicle type join
-        query = db.query(P2HReport).join(Vehicle).filter(
-            Vehicle.vehicle_type == vehicle_type
-        )
+        # Satu GROUP BY status atas agregat harian
+        return daily_stats_repository.count_by_status(db, start_date, end_date, vehicle_type)
+    
+    def get_card_reports(
+        self,
+        db: Session,
+        status: Optional[InspectionStatus] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        limit: int = 10,
+        after: Optional[Tuple[date, time, UUID]] = None
+    ) -> List:
+        """
+        Flat projection of reports of active vehicles for dashboard card details, newest first.
         
-        # Apply date filters
-        if start_date is not None:
-            query = query.filter(func.date(P2HReport.submission_date) >= start_date)
+        Vehicle and operator fields are joined in the same statement, so no
+        ORM objects (and no per-row lazy loads) are created.
+        
+        Args:
+            db: Database session
+            status: Optional overall status filter
+            start_date: Optional inclusive start date
+            end_date: Optional inclusive end date
+            limit: Maximum rows to return
+            after: Keyset position (submission_date, submission_time, id) of the previous page
+            
+        Returns:
+            List of Row objects
+        """
+        query = select(
+            P2HReport.id,
+            P2HReport.submission_date,
+            P2HReport.submission_time,
+            P2HReport.overall_status,
+            Vehicle.no_lambung,
+            Vehicle.plat_nomor,
+            Vehicle.vehicle_type,
+            Vehicle.merk,
+            User.full_name.label("operator")
+        ).join(
+            Vehicle, P2HReport.vehicle_id == Vehicle.id
+        ).outerjoin(
+            User, P2HReport.user_id == User.id
+        ).where(*self._card_report_clauses(status, start_date, end_date))
+        
+        if after is not None:
+            query = query.where(
+                tuple_(P2HReport.submission_date, P2HReport.submission_time, P2HReport.id) < tuple_(*after)
+            )
         
+        return db.execute(query.order_by(*P2HRepository.REPORT_ORDER).limit(limit)).all()
+    
+    def count_card_reports(
+        self,
+        db: Session,
+        status: Optional[InspectionStatus] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> int:
+        """
+        Number of rows get_card_reports pages through.
+        
+        Args:
+            db: Database session
+            status: Optional overall status filter
+            start_date: Optional inclusive start date
+            end_date: Optional inclusive end date
+            
+        Returns:
+            Count of reports
+        """
+        query = select(func.count()).select_from(P2HReport).join(
+            Vehicle, P2HReport.vehicle_id == Vehicle.id
+        ).where(*self._card_report_clauses(status, start_date, end_date))
+        return db.execute(query).scalar() or 0
+    
+    def get_card_vehicles(
+        self,
+        db: Session,
+        pending_on: Optional[date] = None,
+        limit: int = 10,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List:
+        """
+        Flat projection of active vehicles for dashboard card details, newest first.
+        
+        Args:
+            db: Database session
+            pending_on: Only vehicles without an active report on this date
+            limit: Maximum rows to return
+            after: Keyset position (created_at, id) of the previous page
+            
+        Returns:
+            List of Row objects
+        """
+        query = select(
+            Vehicle.id,
+            Vehicle.created_at,
+            Vehicle.no_lambung,
+            Vehicle.plat_nomor,
+            Vehicle.vehicle_type,
+            Vehicle.merk
+        ).where(*self._card_vehicle_clauses(pending_on))
+        
+        if after is not None:
+            query = query.where(tuple_(Vehicle.created_at, Vehicle.id) < tuple_(*after))
+        
+        return db.execute(query.order_by(Vehicle.created_at.desc(), Vehicle.id.desc()).limit(limit)).all()
+    
+    def count_card_vehicles(self, db: Session, pending_on: Optional[date] = None) -> int:
+        """
+        Number of rows get_card_vehicles pages through.
+        
+        Args:
+            db: Database session
+            pending_on: Only vehicles without an active report on this date
+            
+        Returns:
+            Count of vehicles
+        """
+        query = select(func.count(Vehicle.id)).where(*self._card_vehicle_clauses(pending_on))
+        return db.execute(query).scalar() or 0
+    
+    @staticmethod
+    def _card_report_clauses(
+        status: Optional[InspectionStatus],
+        start_date: Optional[date],
+        end_date: Optional[date]
+    ) -> list:
+        clauses = [
+            Vehicle.is_active == True,  # Only active vehicles
+            P2HReport.is_deleted == False
+        ]
+        if status is not None:
+            clauses.append(P2HReport.overall_status == status)
+        if start_date is not None:
+            clauses.append(P2HReport.submission_date >= start_date)
         if end_date is not None:
-            query = query.filter(func.date(P2HReport.submission_date) <= end_date)
-        
-        # Count by status
-        normal = query.filter(P2HReport.overall_status == 'normal').count() or 0
-        abnormal = query.filter(P2HReport.overall_status == 'abnormal').count() or 0
-        warning = query.filter(P2HReport.overall_status == 'warning').count() or 0
-        
-        return {
-            "normal": normal,
-            "abnormal": abnormal,
-            "warning": warning
-        }
+            clauses.append(P2HReport.submission_date <= end_date)
+        return clauses
+    
+    @staticmethod
+    def _card_vehicle_clauses(pending_on: Optional[date]) -> list:
+        clauses = [Vehicle.is_active == True]
+        if pending_on is not None:
+            clauses.append(~exists().where(
+                P2HReport.vehicle_id == Vehicle.id,
+                P2HReport.submission_date == pending_on,
+                P2HReport.is_deleted == False
+            ))
+        return clauses
     
     def get_vehicle_types(self, db: Session) -> list:
         """
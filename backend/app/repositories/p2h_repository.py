@@ -4,19 +4,30 @@ P2H Repository - Database operations for P2H reports
 Pure database queries - NO business logic
 """
 
-from sqlalchemy.orm import Session, Query
-from sqlalchemy import func, and_, extract
-from typing import Optional, List
-from datetime import date
+from sqlalchemy.orm import Session, Query, joinedload, selectinload, contains_eager
+from sqlalchemy import func, and_, or_, case, literal, false, select, Integer, tuple_, true, cast, Date
+from sqlalchemy.dialects.postgresql import insert as pg_insert, array as pg_array, ARRAY
+from typing import Optional, List, Dict, Tuple
+from datetime import date, datetime, time
 from uuid import UUID
+import uuid
 
-from app.models.p2h import P2HReport, P2HDetail, P2HDailyTracker
+from app.models.p2h import P2HReport, P2HDetail, P2HDailyTracker, InspectionStatus
+from app.models.user import User, UserKategori
+from app.models.vehicle import Vehicle, ShiftType, VehicleType
 from .base import BaseRepository
 
 
 class P2HRepository(BaseRepository[P2HReport]):
     """Repository for P2H Report database operations"""
     
+    # Newest first; id breaks ties so keyset positions are unique
+    REPORT_ORDER = (
+        P2HReport.submission_date.desc(),
+        P2HReport.submission_time.desc(),
+        P2HReport.id.desc()
+    )
+    
     def __init__(self):
         super().__init__(P2HReport)
     
@@ -43,14 +54,14 @@ class P2HRepository(BaseRepository[P2HReport]):
         Returns:
             SQLAlchemy Query object
         """
-        query = db.query(P2HReport)
+        query = db.query(P2HReport).filter(P2HReport.is_deleted == False)
         
-        # Apply filters directly - no conditional checking
+        # submission_date sudah bertipe Date: bandingkan langsung agar index terpakai
         if start_date is not None:
-            query = query.filter(func.date(P2HReport.submission_date) >= start_date)
+            query = query.filter(P2HReport.submission_date >= start_date)
         
         if end_date is not None:
-            query = query.filter(func.date(P2HReport.submission_date) <= end_date)
+            query = query.filter(P2HReport.submission_date <= end_date)
         
         if vehicle_id is not None:
             query = query.filter(P2HReport.vehicle_id == vehicle_id)
@@ -64,6 +75,183 @@ class P2HRepository(BaseRepository[P2HReport]):
         
         return query
     
+    def report_filter_clauses(
+        self,
+        kategori: Optional[UserKategori] = None,
+        status: Optional[InspectionStatus] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        search: Optional[str] = None,
+        vehicle_id: Optional[UUID] = None,
+        user_id: Optional[UUID] = None,
+        vehicle_type: Optional[VehicleType] = None
+    ) -> List:
+        """
+        Build WHERE clauses for report list/export filters.
+        
+        Clauses on kategori, search and vehicle_type reference User/Vehicle, so the
+        query must join both tables (all report list queries here do).
+        
+        Args:
+            kategori: Submitter category (User.kategori_pengguna)
+            status: Overall report status
+            start_date: Inclusive lower bound on submission_date
+            end_date: Inclusive upper bound on submission_date
+            search: Case-insensitive substring of plat nomor or submitter name
+            vehicle_id: Filter by vehicle
+            user_id: Filter by submitter
+            vehicle_type: Filter by vehicle type
+            
+        Returns:
+            List of SQL expressions (empty if no filter is set)
+        """
+        clauses = []
+        if kategori is not None:
+            clauses.append(User.kategori_pengguna == kategori)
+        if status is not None:
+            clauses.append(P2HReport.overall_status == status)
+        if start_date is not None:
+            clauses.append(P2HReport.submission_date >= start_date)
+        if end_date is not None:
+            clauses.append(P2HReport.submission_date <= end_date)
+        if search:
+            # Didukung index trigram (pg_trgm) di users.full_name; vehicles kecil, plat dibaca sequential
+            pattern = f"%{search}%"
+            clauses.append(or_(Vehicle.plat_nomor.ilike(pattern), User.full_name.ilike(pattern)))
+        if vehicle_id is not None:
+            clauses.append(P2HReport.vehicle_id == vehicle_id)
+        if user_id is not None:
+            clauses.append(P2HReport.user_id == user_id)
+        if vehicle_type is not None:
+            clauses.append(Vehicle.vehicle_type == vehicle_type)
+        return clauses
+    
+    def _report_list_query(self, db: Session, *entities) -> Query:
+        """Active reports joined to vehicle and user (targets of the list filters)"""
+        query = db.query(*entities) if entities else db.query(P2HReport)
+        return query.select_from(P2HReport).join(
+            Vehicle, Vehicle.id == P2HReport.vehicle_id
+        ).join(
+            User, User.id == P2HReport.user_id
+        ).filter(P2HReport.is_deleted == False)
+    
+    def get_reports_page(
+        self,
+        db: Session,
+        limit: int,
+        offset: int = 0,
+        after: Optional[Tuple[date, time, UUID]] = None,
+        filters: Optional[List] = None
+    ) -> List[P2HReport]:
+        """
+        Page of active reports, newest first.
+        
+        Ordered by (submission_date, submission_time, id) DESC. With `after`, rows
+        are filtered with a row-value comparison against the last key of the
+        previous page, so the composite index ix_p2h_reports_keyset serves every
+        page at the same cost. Callers fetch page_size + 1 rows to tell whether a
+        next page exists.
+        
+        Args:
+            db: Database session
+            limit: Maximum reports to return
+            offset: Rows to skip (legacy skip/limit mode)
+            after: (submission_date, submission_time, id) of the previous page's last row
+            filters: Clauses from report_filter_clauses
+            
+        Returns:
+            Reports with vehicle, user and details loaded
+        """
+        query = self._keyset(self._report_list_query(db), after)
+        if filters:
+            query = query.filter(and_(*filters))
+        return query.options(
+            contains_eager(P2HReport.vehicle),
+            contains_eager(P2HReport.user),
+            # selectinload: detail tidak menggandakan baris halaman (LIMIT tetap di tabel laporan)
+            selectinload(P2HReport.details).joinedload(P2HDetail.checklist_item)
+        ).order_by(*self.REPORT_ORDER).offset(offset).limit(limit).all()
+    
+    def count_reports(self, db: Session, filters: Optional[List] = None) -> int:
+        """
+        Exact number of active reports matching the list filters.
+        
+        Args:
+            db: Database session
+            filters: Clauses from report_filter_clauses
+            
+        Returns:
+            Report count
+        """
+        query = self._report_list_query(db, func.count(P2HReport.id))
+        if filters:
+            query = query.filter(and_(*filters))
+        return query.scalar() or 0
+    
+    def get_report_summaries(
+        self,
+        db: Session,
+        limit: int,
+        offset: int = 0,
+        after: Optional[Tuple[date, time, UUID]] = None,
+        filters: Optional[List] = None
+    ) -> List:
+        """
+        Flat projection of active reports for list views, newest first.
+        
+        Selects header columns, vehicle/user display fields and per-report
+        abnormal/warning counts in one query. Counts come from a LATERAL
+        aggregate over p2h_details, so no detail or checklist rows are returned
+        and no ORM objects are built.
+        
+        Args:
+            db: Database session
+            limit: Maximum rows to return
+            offset: Rows to skip (legacy skip/limit mode)
+            after: Keyset position, same as get_reports_page
+            filters: Clauses from report_filter_clauses
+            
+        Returns:
+            List of Row objects
+        """
+        detail_counts = select(
+            func.count().filter(P2HDetail.status == InspectionStatus.ABNORMAL).label("abnormal_count"),
+            func.count().filter(P2HDetail.status == InspectionStatus.WARNING).label("warning_count")
+        ).where(P2HDetail.report_id == P2HReport.id).lateral("detail_counts")
+        
+        query = self._report_list_query(
+            db,
+            P2HReport.id,
+            P2HReport.vehicle_id,
+            P2HReport.user_id,
+            P2HReport.shift_number,
+            P2HReport.overall_status,
+            P2HReport.submission_date,
+            P2HReport.submission_time,
+            P2HReport.created_at,
+            Vehicle.no_lambung,
+            Vehicle.plat_nomor,
+            Vehicle.vehicle_type,
+            Vehicle.warna_no_lambung,
+            User.full_name.label("user_full_name"),
+            User.kategori_pengguna,
+            detail_counts.c.abnormal_count,
+            detail_counts.c.warning_count
+        ).join(detail_counts, true())
+        if filters:
+            query = query.filter(and_(*filters))
+        
+        return self._keyset(query, after).order_by(*self.REPORT_ORDER).offset(offset).limit(limit).all()
+    
+    @staticmethod
+    def _keyset(query: Query, after: Optional[Tuple[date, time, UUID]]) -> Query:
+        """Apply the keyset position (rows strictly after `after` in REPORT_ORDER)"""
+        if after is None:
+            return query
+        return query.filter(
+            tuple_(P2HReport.submission_date, P2HReport.submission_time, P2HReport.id) < tuple_(*after)
+        )
+    
     def count_by_status(
         self,
         db: Session,
@@ -88,6 +276,57 @@ class P2HRepository(BaseRepository[P2HReport]):
         query = self.get_reports_query(db, start_date, end_date, status=status, vehicle_type=vehicle_type)
         return query.count() or 0
     
+    def count_by_month_and_status(
+        self,
+        db: Session,
+        start_date: date,
+        end_date: date,
+        vehicle_type: Optional[str] = None
+    ) -> Dict[date, Dict[str, int]]:
+        """
+        Count P2H reports per month and status in one GROUP BY query.
+        
+        Args:
+            db: Database session
+            start_date: Inclusive range start (first day of a month)
+            end_date: Exclusive range end (first day of a month)
+            vehicle_type: Optional vehicle type filter
+            
+        Returns:
+            Dict keyed by first day of every month in the range (gap-filled with zeros):
+            {month_start: {"normal": int, "abnormal": int, "warning": int}}
+        """
+        # Range [start, end) langsung di submission_date agar index terpakai;
+        # date_trunc hanya dipakai untuk pengelompokan
+        month = cast(func.date_trunc('month', P2HReport.submission_date), Date).label('month')
+        query = db.query(
+            month,
+            P2HReport.overall_status,
+            func.count().label('total')
+        ).filter(
+            P2HReport.submission_date >= start_date,
+            P2HReport.submission_date < end_date,
+            P2HReport.is_deleted == False
+        )
+        
+        if vehicle_type is not None:
+            query = query.join(Vehicle, P2HReport.vehicle_id == Vehicle.id).filter(
+                Vehicle.vehicle_type == vehicle_type
+            )
+        
+        rows = query.group_by(month, P2HReport.overall_status).all()
+        
+        counts = {}
+        cursor = date(start_date.year, start_date.month, 1)
+        while cursor < end_date:
+            counts[cursor] = {status.value: 0 for status in InspectionStatus}
+            cursor = date(cursor.year + 1, 1, 1) if cursor.month == 12 else date(cursor.year, cursor.month + 1, 1)
+        
+        for row in rows:
+            counts[row.month][InspectionStatus(row.overall_status).value] = row.total
+        
+        return counts
+    
     def get_monthly_counts(
         self,
         db: Session,
@@ -107,30 +346,9 @@ class P2HRepository(BaseRepository[P2HReport]):
         Returns:
             Dict with counts: {"normal": int, "abnormal": int, "warning": int}
         """
-        from app.models.vehicle import Vehicle
-        
-        # Base query with month/year filter
-        query = db.query(P2HReport).filter(
-            and_(
-                extract('year', P2HReport.submission_date) == year,
-                extract('month', P2HReport.submission_date) == month
-            )
-        )
-        
-        # Join with vehicle if vehicle_type filter is provided
-        if vehicle_type is not None:
-            query = query.join(Vehicle).filter(Vehicle.vehicle_type == vehicle_type)
-        
-        # Count by status
-        normal = query.filter(P2HReport.overall_status == 'normal').count() or 0
-        abnormal = query.filter(P2HReport.overall_status == 'abnormal').count() or 0
-        warning = query.filter(P2HReport.overall_status == 'warning').count() or 0
-        
-        return {
-            "normal": normal,
-            "abnormal": abnormal,
-            "warning": warning
-        }
+        month_start = date(year, month, 1)
+        next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return self.count_by_month_and_status(db, month_start, next_month, vehicle_type)[month_start]
     
     def get_vehicles_reported_on_date(self, db: Session, report_date: date) -> int:
         """
@@ -144,9 +362,44 @@ class P2HRepository(BaseRepository[P2HReport]):
             Count of distinct vehicles
         """
         return db.query(func.count(func.distinct(P2HReport.vehicle_id))).filter(
-            func.date(P2HReport.submission_date) == report_date
+            P2HReport.submission_date == report_date,
+            P2HReport.is_deleted == False
         ).scalar() or 0
     
+    def get_report_with_details(self, db: Session, report_id: UUID) -> Optional[P2HReport]:
+        """
+        Get single report with vehicle, user, details and checklist items eager-loaded.
+        
+        Args:
+            db: Database session
+            report_id: Report UUID
+            
+        Returns:
+            P2HReport or None
+        """
+        return db.query(P2HReport).options(
+            joinedload(P2HReport.vehicle),
+            joinedload(P2HReport.user),
+            selectinload(P2HReport.details).joinedload(P2HDetail.checklist_item)
+        ).filter(P2HReport.id == report_id).first()
+    
+    def get_by_idempotency_key(self, db: Session, idempotency_key: str) -> Optional[P2HReport]:
+        """
+        Get report by client idempotency key with relations eager-loaded.
+        
+        Args:
+            db: Database session
+            idempotency_key: Idempotency-Key header or client_submission_id
+            
+        Returns:
+            P2HReport or None
+        """
+        return db.query(P2HReport).options(
+            joinedload(P2HReport.vehicle),
+            joinedload(P2HReport.user),
+            selectinload(P2HReport.details).joinedload(P2HDetail.checklist_item)
+        ).filter(P2HReport.idempotency_key == idempotency_key).first()
+    
     def get_daily_tracker(
         self,
         db: Session,
@@ -171,6 +424,138 @@ class P2HRepository(BaseRepository[P2HReport]):
             )
         ).first()
     
+    def count_reports_by_shift(
+        self,
+        db: Session,
+        vehicle_id: UUID,
+        submission_date: date
+    ) -> Dict[int, int]:
+        """
+        Count active (not soft-deleted) reports per shift_number for a vehicle on a date.
+        
+        Args:
+            db: Database session
+            vehicle_id: Vehicle UUID
+            submission_date: Operational date
+            
+        Returns:
+            Mapping shift_number -> report count
+        """
+        rows = db.query(P2HReport.shift_number, func.count(P2HReport.id)).filter(
+            and_(
+                P2HReport.vehicle_id == vehicle_id,
+                P2HReport.submission_date == submission_date,
+                P2HReport.is_deleted == False
+            )
+        ).group_by(P2HReport.shift_number).all()
+        return {shift_number: count for shift_number, count in rows}
+    
+    def get_fleet_status_rows(
+        self,
+        db: Session,
+        shift_date: date,
+        non_shift_date: date,
+        vehicle_ids: Optional[List[UUID]] = None
+    ) -> List:
+        """
+        P2H shift completion and color for many vehicles in one grouped query.
+        
+        Each vehicle is matched against its own operational date (non_shift_date for
+        NON_SHIFT, shift_date for SHIFT/LONG_SHIFT). Shifts come from active reports,
+        falling back to the daily tracker when the vehicle has no active report,
+        the same rule as the single-vehicle status. Color and shifts_completed are
+        computed with CASE expressions over the aggregated row.
+        
+        Args:
+            db: Database session
+            shift_date: Operational date for SHIFT/LONG_SHIFT (reset 05:00)
+            non_shift_date: Operational date for NON_SHIFT (reset 00:00)
+            vehicle_ids: Limit to these vehicles (default: all active vehicles)
+            
+        Returns:
+            Rows with id, no_lambung, plat_nomor, warna_no_lambung, shift_type,
+            color_code and shifts_completed
+        """
+        op_date = case(
+            (Vehicle.shift_type == ShiftType.NON_SHIFT, literal(non_shift_date)),
+            else_=literal(shift_date)
+        )
+        has_reports = func.count(P2HReport.id) > 0
+        
+        def shift_done(number: int, tracker_column):
+            return case(
+                (has_reports, func.coalesce(func.bool_or(P2HReport.shift_number == number), false())),
+                else_=func.coalesce(func.bool_or(tracker_column), false())
+            ).label(f"shift_{number}_done")
+        
+        grouped = (
+            select(
+                Vehicle.id,
+                Vehicle.no_lambung,
+                Vehicle.plat_nomor,
+                Vehicle.warna_no_lambung,
+                Vehicle.shift_type,
+                shift_done(1, P2HDailyTracker.shift_1_done),
+                shift_done(2, P2HDailyTracker.shift_2_done),
+                shift_done(3, P2HDailyTracker.shift_3_done),
+            )
+            .select_from(Vehicle)
+            .outerjoin(
+                P2HReport,
+                and_(
+                    P2HReport.vehicle_id == Vehicle.id,
+                    P2HReport.submission_date == op_date,
+                    P2HReport.is_deleted == False
+                )
+            )
+            .outerjoin(
+                P2HDailyTracker,
+                and_(
+                    P2HDailyTracker.vehicle_id == Vehicle.id,
+                    P2HDailyTracker.date == op_date
+                )
+            )
+            .group_by(Vehicle.id)
+        )
+        if vehicle_ids is not None:
+            grouped = grouped.where(Vehicle.id.in_(vehicle_ids))
+        else:
+            grouped = grouped.where(Vehicle.is_active == True)
+        grouped = grouped.subquery()
+        
+        s1, s2, s3 = grouped.c.shift_1_done, grouped.c.shift_2_done, grouped.c.shift_3_done
+        is_non_shift = grouped.c.shift_type == ShiftType.NON_SHIFT
+        is_long_shift = grouped.c.shift_type == ShiftType.LONG_SHIFT
+        
+        color_code = case(
+            (is_non_shift, case((s1, "green"), else_="red")),
+            (is_long_shift, case((and_(s1, s2), "green"), (or_(s1, s2), "yellow"), else_="red")),
+            else_=case((and_(s1, s2, s3), "green"), (or_(s1, s2, s3), "yellow"), else_="red")
+        ).label("color_code")
+        
+        # NON_SHIFT hanya slot 1, LONG_SHIFT slot 1-2, SHIFT slot 1-3
+        shifts_completed = func.array_remove(
+            pg_array([
+                case((s1, 1)),
+                case((and_(~is_non_shift, s2), 2)),
+                case((and_(~is_non_shift, ~is_long_shift, s3), 3)),
+            ]),
+            None,
+            type_=ARRAY(Integer)
+        ).label("shifts_completed")
+        
+        stmt = select(
+            grouped.c.id,
+            grouped.c.no_lambung,
+            grouped.c.plat_nomor,
+            grouped.c.warna_no_lambung,
+            grouped.c.shift_type,
+            color_code,
+            shifts_completed
+        ).order_by(grouped.c.no_lambung.nulls_last(), grouped.c.plat_nomor)
+        
+        return db.execute(stmt).all()
+    
     def create_daily_tracker(
         self,
         db: Session,
@@ -195,6 +580,56 @@ class P2HRepository(BaseRepository[P2HReport]):
         )
         return self.create(db, tracker)
 
+    
+    def claim_tracker_shift(
+        self,
+        db: Session,
+        vehicle_id: UUID,
+        tracker_date: date,
+        shift_slot: int,
+        report_id: UUID
+    ) -> bool:
+        """
+        Atomically mark a shift as done on the daily tracker.
+        
+        Single statement: INSERT ... ON CONFLICT (vehicle_id, date) DO UPDATE
+        ... WHERE shift_N_done IS NOT TRUE RETURNING id. Relies on the unique
+        constraint uq_p2h_daily_tracker_vehicle_date. Does NOT commit.
+        
+        Args:
+            db: Database session
+            vehicle_id: Vehicle UUID
+            tracker_date: Operational date
+            shift_slot: Tracker slot to claim (1, 2 or 3)
+            report_id: Report that fills the slot
+            
+        Returns:
+            True if the slot was claimed, False if it was already done
+        """
+        table = P2HDailyTracker.__table__
+        done_column = f"shift_{shift_slot}_done"
+        report_column = f"shift_{shift_slot}_report_id"
+        
+        stmt = pg_insert(table).values(
+            id=uuid.uuid4(),
+            vehicle_id=vehicle_id,
+            date=tracker_date,
+            submission_count=1,
+            **{done_column: True, report_column: report_id}
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_p2h_daily_tracker_vehicle_date",
+            set_={
+                done_column: True,
+                report_column: report_id,
+                "submission_count": func.coalesce(table.c.submission_count, 0) + 1,
+                "updated_at": datetime.utcnow()
+            },
+            where=table.c[done_column].isnot(True)
+        ).returning(table.c.id)
+        
+        return db.execute(stmt).first() is not None
+
 
 # Singleton instance
 p2h_repository = P2HRepository()
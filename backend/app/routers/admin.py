@@ -4,6 +4,8 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User, UserRole, UserKategori
 from app.utils.password import hash_password
+from app.utils.cache import dashboard_cache
+from app.repositories.daily_stats_repository import daily_stats_repository
 from datetime import date
 import logging
 
@@ -95,6 +97,9 @@ def seed_users_endpoint(
                 user.email = data["email"]
                 user.birth_date = data["birth_date"]
                 user.role = data["role"]
+                if data["kategori_pengguna"] != user.kategori_pengguna:
+                    # Agregat p2h_daily_stats dipindah sebelum kategori baru di-assign
+                    daily_stats_repository.move_subject(db, user_id=user.id, new_kategori=data["kategori_pengguna"])
                 user.kategori_pengguna = data["kategori_pengguna"]
                 updated_users.append({
                     "name": data["full_name"],
@@ -105,6 +110,7 @@ def seed_users_endpoint(
                 logger.info(f"🔄 Updated existing user: {data['full_name']}")
         
         db.commit()
+        dashboard_cache.bump()
         
         return {
             "status": "success",
@@ -10,6 +10,7 @@ from app.dependencies import require_role
 from app.models.user import User, UserRole
 from app.utils.password import hash_password
 from app.utils.response import base_response
+from app.utils.compression import compression_stats
 
 router = APIRouter(
     prefix="/admin-tools",
@@ -130,3 +131,24 @@ async def get_all_user_credentials(db: Session = Depends(get_db)):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error getting credentials: {str(e)}"
         )
+
+
+@router.get("/compression-stats")
+async def get_compression_stats(reset: bool = False):
+    """
+    Statistik kompresi response per route: jumlah response, yang dikompres
+    (gzip/br), byte asli vs byte terkirim, dan byte yang dihemat.
+    
+    reset=true mengosongkan counter setelah snapshot diambil.
+    """
+    routes = compression_stats.snapshot()
+    if reset:
+        compression_stats.reset()
+
+    return base_response(
+        message=f"Statistik kompresi untuk {len(routes)} route",
+        payload={
+            "routes": routes,
+            "bytes_saved": sum(r["bytes_saved"] for r in routes)
+        }
+    )
@@ -15,7 +15,10 @@ from app.models.vehicle import Vehicle, ShiftType, UnitKategori
 from app.schemas.bulk_upload import BulkUploadResponse, BulkUploadError
 from app.utils.password import hash_password
 from app.utils.response import base_response
+from app.utils.cache import vehicles_cache, dashboard_cache
+from app.repositories.daily_stats_repository import daily_stats_repository
 from app.repositories.vehicle_type_repository import VehicleTypeRepository
+from app.services.p2h_status_cache import p2h_status_cache
 
 router = APIRouter(
     prefix="/bulk-upload",
@@ -317,6 +320,9 @@ async def bulk_upload_users(
                     existing_deleted_user.email = email
                     existing_deleted_user.birth_date = birth_date
                     existing_deleted_user.role = role
+                    if kategori != existing_deleted_user.kategori_pengguna:
+                        # Agregat p2h_daily_stats dipindah sebelum kategori baru di-assign
+                        daily_stats_repository.move_subject(db, user_id=existing_deleted_user.id, new_kategori=kategori)
                     existing_deleted_user.kategori_pengguna = kategori
                     existing_deleted_user.department_id = department_id
                     existing_deleted_user.position_id = position_id
@@ -382,6 +388,8 @@ async def bulk_upload_users(
         
         # Commit all changes (reactivations + new inserts)
         db.commit()
+        if reactivated_count > 0:
+            dashboard_cache.bump()
         
         # Prepare response
         response_data = BulkUploadResponse(
@@ -1052,6 +1060,9 @@ async def bulk_upload_vehicles(
                     # Update vehicle_type if valid
                     type_str = str(row['tipe_kendaraan']).strip()
                     if type_str in valid_type_names:
+                        if type_str != getattr(existing_vehicle.vehicle_type, "value", existing_vehicle.vehicle_type):
+                            # Agregat p2h_daily_stats dipindah sebelum tipe baru di-assign
+                            daily_stats_repository.move_subject(db, vehicle_id=existing_vehicle.id, new_vehicle_type=type_str)
                         existing_vehicle.vehicle_type = type_str
                     
                     # Update kategori and shift_type
@@ -1247,6 +1258,10 @@ async def bulk_upload_vehicles(
         # Commit all successful inserts
         if success_count > 0:
             db.commit()
+            vehicles_cache.bump()
+            dashboard_cache.bump()
+            # shift_type/no_lambung unit bisa berubah: status P2H dimuat ulang
+            p2h_status_cache.clear()
         
         # Prepare response
         response_data = BulkUploadResponse(
@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional
 
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.models.user import User, UserRole
-from app.dependencies import get_current_user, require_role
-from app.utils.response import base_response
+from app.dependencies import get_current_user, require_role, conditional_get, security
+from app.utils.cache import dashboard_cache, vehicles_cache
+from app.utils.response import (
+    base_response, body_etag, cached_response, render_base_response, versioned_response
+)
 from app.utils.datetime import get_current_datetime
+from app.constants import P2HSettings
 from app.services.dashboard_service import dashboard_service
+from app.services.live_events import live_events
 from app.repositories.dashboard_repository import dashboard_repository
 
 router = APIRouter(
@@ -17,9 +24,37 @@ router = APIRouter(
     dependencies=[Depends(require_role(UserRole.admin, UserRole.superadmin))]
 )
 
+# Endpoint dengan conditional GET: dependency router di atas selalu dijalankan lebih
+# dulu (query user), jadi cek 304 dipasang per route sebelum require_role.
+DASHBOARD_ROLES = (UserRole.admin, UserRole.superadmin)
+conditional_router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+# Stream SSE: tanpa get_db agar koneksi database tidak ditahan selama stream terbuka
+stream_router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+def dashboard_response(request: Request, key: tuple, render: Callable[[], bytes]):
+    """
+    Body dashboard dari dashboard_cache untuk filter yang sudah dinormalisasi.
+    Viewer dengan filter sama berbagi satu perhitungan; submit / hapus laporan
+    serta router kendaraan / user yang memindahkan agregat p2h_daily_stats
+    mem-bump cache sehingga hasil lama tidak pernah dikirim setelahnya.
+    """
+    _, (body, etag) = dashboard_cache.get_or_set(key, lambda: _with_etag(render()))
+    return cached_response(request, body, etag)
+
+
+def _with_etag(body: bytes) -> tuple:
+    return body, body_etag(body)
+
+
+def _normalize_vehicle_type(vehicle_type: Optional[str]) -> Optional[str]:
+    return (vehicle_type.strip() or None) if vehicle_type else None
+
 
 @router.get("/statistics")
 async def get_dashboard_statistics(
+    request: Request,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     vehicle_type: Optional[str] = None,
@@ -58,25 +93,34 @@ async def get_dashboard_statistics(
                 detail=f"Invalid end_date format: {end_date}. Expected YYYY-MM-DD"
             )
     
-    # Service layer: Business logic & orchestration
-    stats = dashboard_service.get_dashboard_statistics(db, start_dt, end_dt, vehicle_type)
+    vehicle_type = _normalize_vehicle_type(vehicle_type)
     
-    # Controller layer: Format response
-    return base_response(
-        message="Statistik dashboard berhasil diambil",
-        payload={
-            **stats,
-            "filters": {
-                "start_date": start_date,
-                "end_date": end_date,
-                "vehicle_type": vehicle_type
+    def render():
+        # Service layer: Business logic & orchestration
+        stats = dashboard_service.get_dashboard_statistics(db, start_dt, end_dt, vehicle_type)
+        
+        # Controller layer: Format response
+        return render_base_response(
+            message="Statistik dashboard berhasil diambil",
+            payload={
+                **stats,
+                "filters": {
+                    "start_date": start_dt.isoformat() if start_dt else None,
+                    "end_date": end_dt.isoformat() if end_dt else None,
+                    "vehicle_type": vehicle_type
+                }
             }
-        }
-    )
+        )
+    
+    # Unit pending dihitung terhadap hari ini dan jumlah kendaraan: keduanya ikut di key
+    today = get_current_datetime().date()
+    key = ("statistics", start_dt, end_dt, vehicle_type, today, vehicles_cache.version)
+    return dashboard_response(request, key, render)
 
 
 @router.get("/monthly-reports")
 async def get_monthly_reports(
+    request: Request,
     year: Optional[int] = None,
     vehicle_type: Optional[str] = None,
     db: Session = Depends(get_db),
@@ -103,22 +147,34 @@ async def get_monthly_reports(
             detail=f"Invalid year: {year}. Must be between 2020 and {current_year + 5}"
         )
     
-    # Service layer: Business logic & orchestration
-    result = dashboard_service.get_monthly_report_summary(db, year, vehicle_type)
+    vehicle_type = _normalize_vehicle_type(vehicle_type)
     
-    # Controller layer: Format response
-    return base_response(
-        message="Data bulanan berhasil diambil",
-        payload={
-            "year": year,
-            "vehicle_type": vehicle_type or "all",
-            **result
-        }
-    )
+    def render():
+        # Service layer: Business logic & orchestration
+        result = dashboard_service.get_monthly_report_summary(db, year, vehicle_type)
+        
+        # Controller layer: Format response
+        return render_base_response(
+            message="Data bulanan berhasil diambil",
+            payload={
+                "year": year,
+                "vehicle_type": vehicle_type or "all",
+                **result
+            }
+        )
+    
+    return dashboard_response(request, ("monthly-reports", year, vehicle_type, vehicles_cache.version), render)
 
 
-@router.get("/vehicle-types")
+@conditional_router.get(
+    "/vehicle-types",
+    dependencies=[
+        Depends(conditional_get(vehicles_cache, roles=DASHBOARD_ROLES)),
+        Depends(require_role(*DASHBOARD_ROLES)),
+    ]
+)
 async def get_vehicle_types(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -126,27 +182,32 @@ async def get_vehicle_types(
     Get list of unique vehicle types from vehicles table.
     
     IMPROVED: Using repository pattern
+    Body di-cache per versi vehicles_cache (di-bump setiap tulis kendaraan);
+    If-None-Match yang cocok dijawab 304 sebelum query apa pun.
     """
+    def render():
+        # Get data from repository
+        vehicle_types = dashboard_repository.get_vehicle_types(db)
+        
+        # Business logic: extract enum values and sort
+        vehicle_type_list = [
+            vt.value if hasattr(vt, 'value') else str(vt) 
+            for vt in vehicle_types
+        ]
+        
+        return render_base_response(
+            message="Tipe kendaraan berhasil diambil",
+            payload={
+                "vehicle_types": sorted(vehicle_type_list)
+            }
+        )
     
-    # Get data from repository
-    vehicle_types = dashboard_repository.get_vehicle_types(db)
-    
-    # Business logic: extract enum values and sort
-    vehicle_type_list = [
-        vt.value if hasattr(vt, 'value') else str(vt) 
-        for vt in vehicle_types
-    ]
-    
-    return base_response(
-        message="Tipe kendaraan berhasil diambil",
-        payload={
-            "vehicle_types": sorted(vehicle_type_list)
-        }
-    )
+    return versioned_response(request, vehicles_cache, "vehicle_types", render)
 
 
 @router.get("/vehicle-type-status")
 async def get_vehicle_type_status(
+    request: Request,
     vehicle_type: str,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
@@ -162,6 +223,7 @@ async def get_vehicle_type_status(
     """
     
     # Validate required parameter
+    vehicle_type = _normalize_vehicle_type(vehicle_type)
     if not vehicle_type:
         raise HTTPException(
             status_code=400,
@@ -190,26 +252,30 @@ async def get_vehicle_type_status(
                 detail=f"Invalid end_date format: {end_date}"
             )
     
-    # Get data from repository with clean parameters
-    status_counts = dashboard_repository.get_vehicle_type_status(
-        db, vehicle_type, start_dt, end_dt
-    )
-    
-    # Calculate total (business logic)
-    total = sum(status_counts.values())
+    def render():
+        # Get data from repository with clean parameters
+        status_counts = dashboard_repository.get_vehicle_type_status(
+            db, vehicle_type, start_dt, end_dt
+        )
+        
+        # Calculate total (business logic)
+        total = sum(status_counts.values())
+        
+        return render_base_response(
+            message=f"Status untuk tipe kendaraan {vehicle_type} berhasil diambil",
+            payload={
+                "vehicle_type": vehicle_type,
+                **status_counts,
+                "total": total
+            }
+        )
     
-    return base_response(
-        message=f"Status untuk tipe kendaraan {vehicle_type} berhasil diambil",
-        payload={
-            "vehicle_type": vehicle_type,
-            **status_counts,
-            "total": total
-        }
-    )
+    return dashboard_response(request, ("vehicle-type-status", vehicle_type, start_dt, end_dt, vehicles_cache.version), render)
 
 
 @router.get("/recent-reports")
 async def get_recent_reports(
+    request: Request,
     limit: int = 10,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -220,37 +286,43 @@ async def get_recent_reports(
     
     from app.models.p2h import P2HReport
     
-    reports = db.query(P2HReport).order_by(
-        P2HReport.submission_date.desc(),
-        P2HReport.submission_time.desc()
-    ).limit(limit).all()
-    
-    report_data = {
-        "reports": [
-            {
-                "id": str(report.id),
-                "submission_date": report.submission_date.isoformat() if report.submission_date else None,
-                "submission_time": report.submission_time.isoformat() if report.submission_time else None,
-                "overall_status": report.overall_status,
-                "vehicle": {
-                    "no_lambung": report.vehicle.no_lambung,
-                    "plat_nomor": report.vehicle.plat_nomor,
-                    "vehicle_type": report.vehicle.vehicle_type,
-                    "merk": report.vehicle.merk
-                } if report.vehicle else None,
-                "user": {
-                    "full_name": report.user.full_name,
-                    "email": report.user.email
-                } if report.user else None
-            }
-            for report in reports
-        ]
-    }
+    def render():
+        reports = db.query(P2HReport).filter(
+            P2HReport.is_deleted == False
+        ).order_by(
+            P2HReport.submission_date.desc(),
+            P2HReport.submission_time.desc()
+        ).limit(limit).all()
+        
+        report_data = {
+            "reports": [
+                {
+                    "id": str(report.id),
+                    "submission_date": report.submission_date.isoformat() if report.submission_date else None,
+                    "submission_time": report.submission_time.isoformat() if report.submission_time else None,
+                    "overall_status": report.overall_status,
+                    "vehicle": {
+                        "no_lambung": report.vehicle.no_lambung,
+                        "plat_nomor": report.vehicle.plat_nomor,
+                        "vehicle_type": report.vehicle.vehicle_type,
+                        "merk": report.vehicle.merk
+                    } if report.vehicle else None,
+                    "user": {
+                        "full_name": report.user.full_name,
+                        "email": report.user.email
+                    } if report.user else None
+                }
+                for report in reports
+            ]
+        }
+        
+        return render_base_response(
+            message="Laporan terbaru berhasil diambil",
+            payload=report_data
+        )
     
-    return base_response(
-        message="Laporan terbaru berhasil diambil",
-        payload=report_data
-    )
+    # Data kendaraan ikut ditampilkan: versi vehicles_cache ikut di key
+    return dashboard_response(request, ("recent-reports", limit, vehicles_cache.version), render)
 
 
 @router.get("/card-details/{card_type}")
@@ -258,7 +330,9 @@ async def get_card_details(
     card_type: str,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    limit: int = 10,
+    limit: int = Query(10, ge=1, le=P2HSettings.REPORTS_MAX_PAGE_SIZE, description="Jumlah baris per halaman"),
+    cursor: Optional[str] = Query(None, description="next_cursor dari halaman sebelumnya"),
+    with_total: bool = Query(True, description="Hitung total baris (hanya di halaman pertama)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -272,11 +346,11 @@ async def get_card_details(
     - total_warning: Vehicles with warning status
     - total_completed: Vehicles that have completed P2H
     - total_pending: Vehicles pending P2H
-    """
-    from app.models.p2h import P2HReport
-    from app.models.vehicle import Vehicle
-    from sqlalchemy import func, distinct
     
+    Keyset pagination: payload {items, count, next_cursor, has_more, total}.
+    Kirim next_cursor sebagai `cursor` untuk halaman berikutnya; `total` hanya
+    dihitung di halaman pertama (null di halaman berikutnya).
+    """
     # Parse dates if provided
     start_dt = None
     end_dt = None
@@ -293,118 +367,68 @@ async def get_card_details(
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid end_date format: {end_date}")
     
-    result_list = []
-    
-    if card_type == "total_vehicles":
-        # Get all active vehicles (both IMM and TRAVEL)
-        vehicles = db.query(Vehicle).filter(
-            Vehicle.is_active == True
-        ).order_by(Vehicle.created_at.desc()).limit(limit).all()
-        result_list = [
-            {
-                "no_lambung": v.no_lambung or "-",
-                "plat_nomor": v.plat_nomor or "-",
-                "vehicle_type": v.vehicle_type.value if hasattr(v.vehicle_type, 'value') else str(v.vehicle_type) if v.vehicle_type else None,
-                "merk": v.merk or "-",
-                "status": "registered"
-            }
-            for v in vehicles
-        ]
-        
-    elif card_type in ["total_normal", "total_abnormal", "total_warning"]:
-        # Get reports by status
-        status_map = {
-            "total_normal": "normal",
-            "total_abnormal": "abnormal",
-            "total_warning": "warning"
-        }
-        status = status_map[card_type]
-        
-        query = db.query(P2HReport).join(Vehicle).filter(
-            P2HReport.overall_status == status,
-            Vehicle.is_active == True  # Only active vehicles
-        )
-        
-        if start_dt:
-            query = query.filter(func.date(P2HReport.submission_date) >= start_dt)
-        if end_dt:
-            query = query.filter(func.date(P2HReport.submission_date) <= end_dt)
-        
-        reports = query.order_by(P2HReport.submission_date.desc()).limit(limit).all()
-        
-        result_list = [
-            {
-                "no_lambung": r.vehicle.no_lambung if r.vehicle else "-",
-                "plat_nomor": r.vehicle.plat_nomor if r.vehicle else "-",
-                "vehicle_type": r.vehicle.vehicle_type.value if (r.vehicle and hasattr(r.vehicle.vehicle_type, 'value')) else str(r.vehicle.vehicle_type) if (r.vehicle and r.vehicle.vehicle_type) else None,
-                "merk": r.vehicle.merk if r.vehicle else "-",
-                "status": r.overall_status,
-                "submission_date": r.submission_date.isoformat() if r.submission_date else None,
-                "operator": r.user.full_name if r.user else None
-            }
-            for r in reports
-        ]
-        
-    elif card_type == "total_completed":
-        # Get vehicles that completed P2H
-        query = db.query(P2HReport).join(Vehicle).filter(
-            Vehicle.is_active == True  # Only active vehicles
+    try:
+        page = dashboard_service.get_card_details(
+            db, card_type, start_dt, end_dt,
+            page_size=limit, cursor=cursor, with_total=with_total
         )
-        
-        if start_dt:
-            query = query.filter(func.date(P2HReport.submission_date) >= start_dt)
-        if end_dt:
-            query = query.filter(func.date(P2HReport.submission_date) <= end_dt)
-        
-        reports = query.order_by(P2HReport.submission_date.desc()).limit(limit).all()
-        
-        result_list = [
-            {
-                "no_lambung": r.vehicle.no_lambung if r.vehicle else "-",
-                "plat_nomor": r.vehicle.plat_nomor if r.vehicle else "-",
-                "vehicle_type": r.vehicle.vehicle_type.value if (r.vehicle and hasattr(r.vehicle.vehicle_type, 'value')) else str(r.vehicle.vehicle_type) if (r.vehicle and r.vehicle.vehicle_type) else None,
-                "merk": r.vehicle.merk if r.vehicle else "-",
-                "status": r.overall_status,
-                "submission_date": r.submission_date.isoformat() if r.submission_date else None,
-                "operator": r.user.full_name if r.user else None
-            }
-            for r in reports
-        ]
-        
-    elif card_type == "total_pending":
-        # Get vehicles without P2H today (or in date range)
-        today = get_current_datetime().date()
-        check_date = end_dt if end_dt else today
-        
-        # Get vehicles that have NOT submitted P2H on check_date
-        subquery = db.query(distinct(P2HReport.vehicle_id)).filter(
-            func.date(P2HReport.submission_date) == check_date
-        ).subquery()
-        
-        vehicles = db.query(Vehicle).filter(
-            ~Vehicle.id.in_(subquery),
-            Vehicle.is_active == True  # Only active vehicles
-        ).order_by(Vehicle.created_at.desc()).limit(limit).all()
-        
-        result_list = [
-            {
-                "no_lambung": v.no_lambung or "-",
-                "plat_nomor": v.plat_nomor or "-",
-                "vehicle_type": v.vehicle_type.value if hasattr(v.vehicle_type, 'value') else str(v.vehicle_type) if v.vehicle_type else None,
-                "merk": v.merk or "-",
-                "status": "pending"
-            }
-            for v in vehicles
-        ]
-    
-    else:
-        raise HTTPException(status_code=400, detail=f"Invalid card_type: {card_type}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return base_response(
         message=f"Detail untuk {card_type} berhasil diambil",
         payload={
             "card_type": card_type,
-            "count": len(result_list),
-            "items": result_list
+            "count": len(page["items"]),
+            "items": page["items"],
+            "next_cursor": page["next_cursor"],
+            "has_more": page["next_cursor"] is not None,
+            "total": page["total"]
         }
     )
+
+
+@stream_router.get("/stream")
+async def stream_dashboard_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+):
+    """
+    Server-Sent Events untuk live dashboard (pengganti polling recent-reports/statistik).
+    
+    Event:
+    - p2h_submitted / p2h_deleted: {report_id, vehicle_id, no_lambung, vehicle_type,
+      kategori, shift_number, status, submission_date, submission_time}
+    - resync: ada event yang terlewat, muat ulang statistik sekali
+    
+    Token dibaca dari header Authorization atau cookie access_token (EventSource
+    browser memakai cookie). Saat reconnect, header Last-Event-ID dipakai untuk
+    mengirim ulang event yang terlewat.
+    """
+    # Sesi database hanya untuk autentikasi, ditutup sebelum stream dimulai
+    db = SessionLocal()
+    try:
+        current_user = get_current_user(request, credentials, db)
+    finally:
+        db.close()
+    
+    if current_user.role not in DASHBOARD_ROLES:
+        raise HTTPException(
+            status_code=403,
+            detail=f"Akses ditolak. Peran yang diizinkan: {', '.join([r.value for r in DASHBOARD_ROLES])}"
+        )
+    
+    if live_events.is_full():
+        raise HTTPException(status_code=503, detail="Terlalu banyak koneksi live dashboard, coba lagi nanti")
+    
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_id = None
+    
+    return StreamingResponse(
+        live_events.stream(last_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -23,7 +23,8 @@ from app.database import get_db
 from app.dependencies import get_current_user, require_role
 from app.models.user import User, UserRole, UserKategori
 from app.models.vehicle import Vehicle, UnitKategori, ShiftType
-from app.models.p2h import P2HReport, InspectionStatus
+from app.models.p2h import P2HReport
+from app.services.p2h_service import p2h_service
 
 logger = logging.getLogger(__name__)
 
@@ -505,57 +506,17 @@ async def export_p2h_reports(
         contains_eager(P2HReport.user)
     )
     
-    # Apply filters
-    filters = []
-    
-    # Filter by User.kategori_pengguna (to match frontend filtering logic)
-    if kategori:
-        kategori_upper = kategori.upper()
-        if kategori_upper == 'PT':
-            kategori_upper = 'IMM'
-        try:
-            filters.append(User.kategori_pengguna == UserKategori(kategori_upper))
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid kategori: {kategori}"
-            )
-    
-    if report_status:
-        try:
-            filters.append(P2HReport.overall_status == InspectionStatus(report_status.lower()))
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid status: {report_status}"
-            )
-    
-    if start_date:
-        try:
-            start = datetime.strptime(start_date, "%Y-%m-%d").date()
-            filters.append(P2HReport.submission_date >= start)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Format start_date tidak valid. Gunakan YYYY-MM-DD"
-            )
-    
-    if end_date:
-        try:
-            end = datetime.strptime(end_date, "%Y-%m-%d").date()
-            filters.append(P2HReport.submission_date <= end)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Format end_date tidak valid. Gunakan YYYY-MM-DD"
-            )
-    
-    if search:
-        search_filter = or_(
-            Vehicle.plat_nomor.ilike(f"%{search}%"),
-            User.full_name.ilike(f"%{search}%")
+    # Apply filters (validasi & klausa sama dengan /p2h/reports)
+    try:
+        filters = p2h_service.build_report_filters(
+            kategori=kategori,
+            report_status=report_status,
+            start_date=start_date,
+            end_date=end_date,
+            search=search
         )
-        filters.append(search_filter)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     if filters:
         query = query.filter(and_(*filters))
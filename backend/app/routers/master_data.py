@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
 
 from app.database import get_db
 from app.models.user import User, UserRole, Company, Department, Position, WorkStatus
-from app.dependencies import require_role, get_current_user
-from app.utils.response import base_response
+from app.dependencies import require_role, get_current_user, conditional_get
+from app.utils.cache import companies_cache, departments_cache, positions_cache, work_statuses_cache
+from app.utils.response import base_response, render_base_response, versioned_response
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -47,15 +48,23 @@ class WorkStatusResponse(WorkStatusBase):
 
 
 # --- COMPANIES ENDPOINTS ---
-@router.get("/companies")
+@router.get("/companies", dependencies=[Depends(conditional_get(companies_cache))])
 async def get_companies(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)  # All authenticated users can read
 ):
-    """Get all active companies (soft delete aware) - accessible by all authenticated users"""
-    companies = db.query(Company).filter(Company.is_active == True).all()
-    payload = [CompanyResponse.model_validate(c).model_dump(mode='json') for c in companies]
-    return base_response(message="Data perusahaan berhasil diambil", payload=payload)
+    """Get all active companies (soft delete aware) - accessible by all authenticated users
+
+    Body di-cache per versi companies_cache (ETag/Last-Modified); If-None-Match yang cocok
+    dijawab 304 sebelum query apa pun.
+    """
+    def render():
+        companies = db.query(Company).filter(Company.is_active == True).all()
+        payload = [CompanyResponse.model_validate(c).model_dump(mode='json') for c in companies]
+        return render_base_response(message="Data perusahaan berhasil diambil", payload=payload)
+
+    return versioned_response(request, companies_cache, "active", render)
 
 @router.post("/companies", status_code=status.HTTP_201_CREATED)
 async def create_company(
@@ -67,6 +76,7 @@ async def create_company(
     company = Company(**company_data.model_dump())
     db.add(company)
     db.commit()
+    companies_cache.bump()
     db.refresh(company)
     return base_response(
         message="Perusahaan berhasil ditambahkan",
@@ -89,6 +99,7 @@ async def update_company(
         setattr(company, key, value)
     
     db.commit()
+    companies_cache.bump()
     db.refresh(company)
     return base_response(
         message="Perusahaan berhasil diupdate",
@@ -112,19 +123,28 @@ async def delete_company(
     # Soft delete: update is_active and deleted_at
     company.soft_delete()
     db.commit()
+    companies_cache.bump()
     return base_response(message="Perusahaan berhasil dihapus", payload=None)
 
 
 # --- DEPARTMENTS ENDPOINTS ---
-@router.get("/departments")
+@router.get("/departments", dependencies=[Depends(conditional_get(departments_cache))])
 async def get_departments(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)  # All authenticated users can read
 ):
-    """Get all active departments (soft delete aware) - accessible by all authenticated users"""
-    departments = db.query(Department).filter(Department.is_active == True).all()
-    payload = [DepartmentResponse.model_validate(d).model_dump(mode='json') for d in departments]
-    return base_response(message="Data departemen berhasil diambil", payload=payload)
+    """Get all active departments (soft delete aware) - accessible by all authenticated users
+
+    Body di-cache per versi departments_cache (ETag/Last-Modified); If-None-Match yang cocok
+    dijawab 304 sebelum query apa pun.
+    """
+    def render():
+        departments = db.query(Department).filter(Department.is_active == True).all()
+        payload = [DepartmentResponse.model_validate(d).model_dump(mode='json') for d in departments]
+        return render_base_response(message="Data departemen berhasil diambil", payload=payload)
+
+    return versioned_response(request, departments_cache, "active", render)
 
 @router.post("/departments", status_code=status.HTTP_201_CREATED)
 async def create_department(
@@ -136,6 +156,7 @@ async def create_department(
     dept = Department(**dept_data.model_dump())
     db.add(dept)
     db.commit()
+    departments_cache.bump()
     db.refresh(dept)
     return base_response(
         message="Departemen berhasil ditambahkan",
@@ -156,6 +177,7 @@ async def update_department(
     
     dept.nama_department = dept_data.nama_department
     db.commit()
+    departments_cache.bump()
     db.refresh(dept)
     return base_response(
         message="Departemen berhasil diupdate",
@@ -179,19 +201,28 @@ async def delete_department(
     # Soft delete
     dept.soft_delete()
     db.commit()
+    departments_cache.bump()
     return base_response(message="Departemen berhasil dihapus", payload=None)
 
 
 # --- POSITIONS ENDPOINTS ---
-@router.get("/positions")
+@router.get("/positions", dependencies=[Depends(conditional_get(positions_cache))])
 async def get_positions(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)  # All authenticated users can read
 ):
-    """Get all active positions (soft delete aware) - accessible by all authenticated users"""
-    positions = db.query(Position).filter(Position.is_active == True).all()
-    payload = [PositionResponse.model_validate(p).model_dump(mode='json') for p in positions]
-    return base_response(message="Data posisi berhasil diambil", payload=payload)
+    """Get all active positions (soft delete aware) - accessible by all authenticated users
+
+    Body di-cache per versi positions_cache (ETag/Last-Modified); If-None-Match yang cocok
+    dijawab 304 sebelum query apa pun.
+    """
+    def render():
+        positions = db.query(Position).filter(Position.is_active == True).all()
+        payload = [PositionResponse.model_validate(p).model_dump(mode='json') for p in positions]
+        return render_base_response(message="Data posisi berhasil diambil", payload=payload)
+
+    return versioned_response(request, positions_cache, "active", render)
 
 @router.post("/positions", status_code=status.HTTP_201_CREATED)
 async def create_position(
@@ -203,6 +234,7 @@ async def create_position(
     pos = Position(**pos_data.model_dump())
     db.add(pos)
     db.commit()
+    positions_cache.bump()
     db.refresh(pos)
     return base_response(
         message="Posisi berhasil ditambahkan",
@@ -223,6 +255,7 @@ async def update_position(
     
     pos.nama_posisi = pos_data.nama_posisi
     db.commit()
+    positions_cache.bump()
     db.refresh(pos)
     return base_response(
         message="Posisi berhasil diupdate",
@@ -246,19 +279,28 @@ async def delete_position(
     # Soft delete
     pos.soft_delete()
     db.commit()
+    positions_cache.bump()
     return base_response(message="Posisi berhasil dihapus", payload=None)
 
 
 # --- WORK STATUSES ENDPOINTS ---
-@router.get("/work-statuses")
+@router.get("/work-statuses", dependencies=[Depends(conditional_get(work_statuses_cache))])
 async def get_work_statuses(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)  # All authenticated users can read
 ):
-    """Get all active work statuses (soft delete aware) - accessible by all authenticated users"""
-    statuses = db.query(WorkStatus).filter(WorkStatus.is_active == True).all()
-    payload = [WorkStatusResponse.model_validate(s).model_dump(mode='json') for s in statuses]
-    return base_response(message="Data status kerja berhasil diambil", payload=payload)
+    """Get all active work statuses (soft delete aware) - accessible by all authenticated users
+
+    Body di-cache per versi work_statuses_cache (ETag/Last-Modified); If-None-Match yang cocok
+    dijawab 304 sebelum query apa pun.
+    """
+    def render():
+        statuses = db.query(WorkStatus).filter(WorkStatus.is_active == True).all()
+        payload = [WorkStatusResponse.model_validate(s).model_dump(mode='json') for s in statuses]
+        return render_base_response(message="Data status kerja berhasil diambil", payload=payload)
+
+    return versioned_response(request, work_statuses_cache, "active", render)
 
 @router.post("/work-statuses", status_code=status.HTTP_201_CREATED)
 async def create_work_status(
@@ -270,6 +312,7 @@ async def create_work_status(
     work_status = WorkStatus(**status_data.model_dump())
     db.add(work_status)
     db.commit()
+    work_statuses_cache.bump()
     db.refresh(work_status)
     return base_response(
         message="Status kerja berhasil ditambahkan",
@@ -290,6 +333,7 @@ async def update_work_status(
     
     work_status.nama_status = status_data.nama_status
     db.commit()
+    work_statuses_cache.bump()
     db.refresh(work_status)
     return base_response(
         message="Status kerja berhasil diupdate",
@@ -313,4 +357,5 @@ async def delete_work_status(
     # Soft delete
     work_status.soft_delete()
     db.commit()
+    work_statuses_cache.bump()
     return base_response(message="Status kerja berhasil dihapus", payload=None)
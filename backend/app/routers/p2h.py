@@ -1,24 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks, Header, Request
 from sqlalchemy.orm import Session
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from uuid import UUID
 from datetime import time, datetime
 
 from app.database import get_db
 from app.models.user import User, UserRole
-from app.models.vehicle import VehicleType
+from app.models.vehicle import VehicleType, ShiftType
+from app.models.shift_config import ShiftConfig
 from app.models.checklist import ChecklistTemplate
 from app.schemas.p2h import (
     ChecklistItemResponse,
     ChecklistItemCreate,  # Pastikan sudah ada di schemas
     P2HReportSubmit,
+    P2HBatchSubmit,
+    FleetStatusRequest,
+    ShiftConfigResponse,
+    ShiftConfigUpdate,
     P2HReportResponse,
-    P2HReportListResponse
+    P2HReportListResponse,
+    P2HReportSummaryResponse
 )
 from app.services.p2h_service import p2h_service
+from app.repositories.p2h_repository import p2h_repository
 from app.dependencies import get_current_user, require_role
-from app.utils.response import base_response
-from app.utils.datetime import get_current_time, get_shift_number
+from app.utils.response import base_response, render_base_response, body_etag, cached_response
+from app.utils.cache import checklist_cache
+from app.utils.serializers import list_response, page_response
+from app.constants import P2HSettings
+from app.utils.shift_clock import shift_clock, ShiftClock, windows_from_rows
 
 router = APIRouter()
 
@@ -27,70 +39,109 @@ router = APIRouter()
 async def get_current_shift():
     """
     Endpoint untuk menentukan shift berdasarkan waktu sekarang.
-    Shift 1: 07:00 - 15:00
+    Memakai jendela yang sama dengan validasi submit (ShiftClock / shift_configs):
+    Shift 1: 07:00 - 15:00 (mulai 06:00)
     Shift 2: 15:00 - 23:00
-    Shift 3: 23:00 - 07:00
+    Shift 3: 23:00 - 07:00 (sampai 06:00)
     """
-    current_time = get_current_time()
-    
-    shift_1_start = time(7, 0)   # 07:00
-    shift_1_end = time(15, 0)    # 15:00
-    shift_2_start = time(15, 0)  # 15:00
-    shift_2_end = time(23, 0)    # 23:00
-    
-    if shift_1_start <= current_time < shift_1_end:
-        shift_num = 1
-        shift = "shift_1"
-        shift_name = "Shift 1"
-        time_range = "07:00 - 15:00"
-        tolerance_start = "06:30"
-    elif shift_2_start <= current_time < shift_2_end:
-        shift_num = 2
-        shift = "shift_2"
-        shift_name = "Shift 2"
-        time_range = "15:00 - 23:00"
-        tolerance_start = "14:30"
-    else:
-        shift_num = 3
-        shift = "shift_3"
-        shift_name = "Shift 3"
-        time_range = "23:00 - 07:00"
-        tolerance_start = "22:30"
+    now = shift_clock.now()
+    window = shift_clock.window_at(ShiftType.SHIFT, now.time())
     
     return base_response(
         message="Shift saat ini berhasil dideteksi",
         payload={
-            "current_shift": shift_num,
-            "current_time": current_time.strftime("%H:%M:%S"),
+            "current_shift": window.shift_number,
+            "current_time": now.strftime("%H:%M:%S"),
             "shift_info": {
-                "name": shift_name,
-                "time_range": time_range,
-                "tolerance_start": tolerance_start
-            }
+                "name": window.name,
+                "time_range": window.label,
+                "tolerance_start": f"{window.start:%H:%M}"
+            },
+            "next_change": shift_clock.next_boundary(now).isoformat()
         }
     )
 
+@router.get("/shift-config")
+async def get_shift_config(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Kalender shift (jendela submit P2H per tipe shift).
+    """
+    rows = db.query(ShiftConfig).order_by(ShiftConfig.shift_type, ShiftConfig.shift_number).all()
+    return base_response(
+        message="Konfigurasi shift berhasil diambil",
+        payload=[ShiftConfigResponse.model_validate(row).model_dump(mode='json') for row in rows]
+    )
+
+@router.put("/shift-config/{config_id}")
+async def update_shift_config(
+    config_id: UUID,
+    config_data: ShiftConfigUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role(UserRole.superadmin))
+):
+    """
+    Ubah jendela shift (Superadmin). Perubahan ditolak jika jendela SHIFT/LONG_SHIFT
+    tidak lagi menutup 24 jam atau saling tumpang tindih.
+    """
+    row = db.query(ShiftConfig).filter(ShiftConfig.id == config_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Konfigurasi shift tidak ditemukan")
+    
+    for field, value in config_data.model_dump(exclude_unset=True).items():
+        setattr(row, field, value)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Konfigurasi shift tidak valid atau bentrok dengan shift lain")
+    
+    # Validasi seluruh kalender sebelum commit
+    active_rows = db.query(ShiftConfig).filter(ShiftConfig.is_active == True).all()
+    try:
+        ShiftClock(windows_from_rows(active_rows))
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    db.commit()
+    shift_clock.load(db)
+    
+    return base_response(
+        message="Konfigurasi shift berhasil diperbarui",
+        payload=ShiftConfigResponse.model_validate(row).model_dump(mode='json')
+    )
+
 # --- ENDPOINT BARU: TAMBAH PERTANYAAN DARI FE ---
 
 @router.get("/checklist-items")
 async def get_all_checklist_items(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Endpoint untuk mendapatkan semua checklist items (pertanyaan P2H).
     Digunakan oleh frontend untuk filter berdasarkan vehicle_tags.
-    """
-    items = db.query(ChecklistTemplate).filter(
-        ChecklistTemplate.is_active == True
-    ).order_by(ChecklistTemplate.item_order).all()
     
-    payload = [ChecklistItemResponse.model_validate(item).model_dump(mode='json') for item in items]
+    Body JSON di-cache per versi checklist (ETag = hash body); kirim If-None-Match untuk 304.
+    """
+    def load():
+        items = db.query(ChecklistTemplate).filter(
+            ChecklistTemplate.is_active == True
+        ).order_by(ChecklistTemplate.item_order).all()
+        
+        payload = [ChecklistItemResponse.model_validate(item).model_dump(mode='json') for item in items]
+        body = render_base_response(
+            message="Semua checklist items berhasil diambil",
+            payload=payload
+        )
+        return body_etag(body), body
     
-    return base_response(
-        message="Semua checklist items berhasil diambil",
-        payload=payload
-    )
+    _, (etag, body) = checklist_cache.get_or_set("all", load)
+    return cached_response(request, body, etag=etag)
 
 @router.post("/checklist", status_code=status.HTTP_201_CREATED)
 async def add_checklist_item(
@@ -113,6 +164,7 @@ async def add_checklist_item(
     )
     db.add(new_item)
     db.commit()
+    checklist_cache.bump()
     db.refresh(new_item)
     
     return base_response(
@@ -153,6 +205,7 @@ async def update_checklist_item(
     item.item_order = item_data.item_order
     
     db.commit()
+    checklist_cache.bump()
     db.refresh(item)
     
     return base_response(
@@ -187,6 +240,7 @@ async def delete_checklist_item(
     item.is_active = False
     
     db.commit()
+    checklist_cache.bump()
     
     return base_response(
         message="Checklist item berhasil dihapus",
@@ -203,27 +257,55 @@ async def delete_checklist_item(
 @router.get("/checklist/{vehicle_type}")
 async def get_checklist(
     vehicle_type: str, # Menggunakan str agar bisa fleksibel dengan tagging
+    request: Request,
+    shift: Optional[str] = Query(None, description="Label shift, misal 'Shift 1', 'Long Shift', 'No Shift'"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get checklist items yang ter-tag untuk tipe kendaraan tertentu.
+    
+    - shift (opsional): hanya item yang berlaku untuk shift tersebut. Item tanpa
+      applicable_shifts dianggap berlaku untuk semua shift.
+    - Body JSON di-cache per (versi checklist, vehicle_type, shift); kirim If-None-Match untuk 304.
+      Hanya vehicle_type yang dipakai sebagai tag checklist aktif yang di-cache, agar path
+      acak tidak menambah entry cache tanpa batas.
     """
-    # Mencari item yang kolom vehicle_tags-nya mengandung vehicle_type
-    checklist_items = db.query(ChecklistTemplate).filter(
-        ChecklistTemplate.vehicle_tags.any(vehicle_type),
-        ChecklistTemplate.is_active == True
-    ).order_by(
-        ChecklistTemplate.section_name,
-        ChecklistTemplate.item_order
-    ).all()
+    if shift is not None and shift not in P2HSettings.CHECKLIST_SHIFT_LABELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Shift tidak valid. Pilihan: {', '.join(P2HSettings.CHECKLIST_SHIFT_LABELS)}"
+        )
     
-    payload = [ChecklistItemResponse.model_validate(item).model_dump(mode='json') for item in checklist_items]
+    def load():
+        # Array containment (vehicle_tags @> ARRAY[...]) memakai GIN index
+        query = db.query(ChecklistTemplate).filter(
+            ChecklistTemplate.vehicle_tags.contains([vehicle_type]),
+            ChecklistTemplate.is_active == True
+        )
+        if shift is not None:
+            query = query.filter(or_(
+                ChecklistTemplate.applicable_shifts.contains([shift]),
+                ChecklistTemplate.applicable_shifts == [],
+                ChecklistTemplate.applicable_shifts.is_(None)
+            ))
+        checklist_items = query.order_by(
+            ChecklistTemplate.section_name,
+            ChecklistTemplate.item_order
+        ).all()
+        
+        payload = [ChecklistItemResponse.model_validate(item).model_dump(mode='json') for item in checklist_items]
+        body = render_base_response(
+            message=f"Checklist untuk tipe {vehicle_type} berhasil diambil",
+            payload=payload
+        )
+        return body_etag(body), body
     
-    return base_response(
-        message=f"Checklist untuk tipe {vehicle_type} berhasil diambil",
-        payload=payload
-    )
+    if p2h_service.is_known_checklist_tag(db, vehicle_type):
+        _, (etag, body) = checklist_cache.get_or_set(("vehicle_type", vehicle_type, shift), load)
+    else:
+        etag, body = load()
+    return cached_response(request, body, etag=etag)
 
 @router.get("/vehicle/{vehicle_id}/status")
 async def get_vehicle_p2h_status(
@@ -240,9 +322,39 @@ async def get_vehicle_p2h_status(
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@router.get("/fleet-status")
+async def get_fleet_p2h_status(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Status warna P2H (red/yellow/green) semua unit aktif dalam satu query.
+    """
+    fleet = p2h_service.get_fleet_p2h_status(db)
+    return base_response(
+        message=f"Status P2H {len(fleet)} unit",
+        payload=fleet
+    )
+
+@router.post("/fleet-status")
+async def get_fleet_p2h_status_by_ids(
+    request: FleetStatusRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Status warna P2H untuk daftar vehicle_ids tertentu dalam satu query.
+    """
+    fleet = p2h_service.get_fleet_p2h_status(db, vehicle_ids=request.vehicle_ids)
+    return base_response(
+        message=f"Status P2H {len(fleet)} unit",
+        payload=fleet
+    )
+
 @router.post("/submit", status_code=status.HTTP_201_CREATED)
 async def submit_p2h(
     submission: P2HReportSubmit,
+    idempotency_key: Optional[str] = Header(None, max_length=100, description="Key unik per submit untuk retry yang aman"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -253,6 +365,10 @@ async def submit_p2h(
     Validasi:
     - Viewer tidak boleh submit
     - Shift number harus sesuai dengan jam saat ini
+    
+    Idempotensi:
+    - Kirim header Idempotency-Key (atau client_submission_id di body)
+    - Retry dengan key yang sama mengembalikan laporan asli (200) tanpa validasi ulang
     """
     # Authorization: Viewer tidak boleh submit P2H
     if current_user.role == UserRole.viewer:
@@ -261,18 +377,28 @@ async def submit_p2h(
             detail="Viewer tidak memiliki akses untuk mengisi P2H. Silakan login sebagai User."
         )
     
-    # Validasi waktu submit sesuai shift
-    from app.utils.datetime import validate_shift_time
-    is_valid, error_msg = validate_shift_time(submission.shift_number)
-    if not is_valid:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=error_msg
-        )
+    key = idempotency_key or (str(submission.client_submission_id) if submission.client_submission_id else None)
     
     try:
-        report = await p2h_service.submit_p2h(db, current_user, submission)
-        db.refresh(report)
+        # Replay: kembalikan laporan asli sebelum validasi shift, tracker, dan notifikasi
+        if key:
+            existing = p2h_service.get_report_by_idempotency_key(db, current_user, key)
+            if existing is not None:
+                return _replayed_response(existing)
+        
+        # Validasi waktu submit sesuai shift
+        from app.utils.datetime import validate_shift_time
+        is_valid, error_msg = validate_shift_time(submission.shift_number)
+        if not is_valid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=error_msg
+            )
+        
+        report, created = await p2h_service.submit_p2h(db, current_user, submission, idempotency_key=key)
+        if not created:
+            return _replayed_response(report)
+        
         payload = P2HReportResponse.model_validate(report).model_dump(mode='json')
         return base_response(
             message="Laporan P2H berhasil disubmit",
@@ -282,44 +408,152 @@ async def submit_p2h(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+
+@router.post("/submit-batch")
+async def submit_p2h_batch(
+    batch: P2HBatchSubmit,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Submit beberapa laporan P2H offline sekaligus
+    [USER, ADMIN, SUPERADMIN ONLY - Viewer tidak boleh submit]
+    
+    - Setiap laporan membawa captured_at (waktu pemeriksaan di perangkat)
+    - Validasi shift, tanggal operasional, dan kuota mengikuti captured_at
+    - client_submission_id per laporan membuat upload ulang aman (di-replay)
+    - Item yang ditolak tidak menggagalkan item lain; lihat hasil per item
+    """
+    if current_user.role == UserRole.viewer:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Viewer tidak memiliki akses untuk mengisi P2H. Silakan login sebagai User."
+        )
+    
+    try:
+        results = await p2h_service.submit_p2h_batch(db, current_user, batch.reports)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    summary = {
+        key: sum(1 for r in results if r["status"] == key)
+        for key in ("created", "replayed", "rejected")
+    }
+    return base_response(
+        message=f"{summary['created']} laporan tersimpan, {summary['replayed']} sudah ada, {summary['rejected']} ditolak",
+        payload={"summary": summary, "results": results},
+        status_code=200
+    )
+
+
+def _replayed_response(report):
+    """Response untuk submit ulang dengan Idempotency-Key yang sama"""
+    response = base_response(
+        message="Laporan P2H sudah diterima sebelumnya",
+        payload=P2HReportResponse.model_validate(report).model_dump(mode='json'),
+        status_code=200
+    )
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
 @router.get("/reports")
 async def get_p2h_reports(
     skip: int = 0,
     limit: int = 5000,  # Increased from 100 to support large datasets
+    cursor: Optional[str] = Query(None, description="next_cursor dari halaman sebelumnya"),
+    page_size: Optional[int] = Query(None, ge=1, le=P2HSettings.REPORTS_MAX_PAGE_SIZE),
+    fields: str = Query("full", pattern="^(full|summary)$"),
+    kategori: Optional[str] = Query(None, description="Filter by kategori pengguna (IMM/TRAVEL)"),
+    report_status: Optional[str] = Query(None, description="Filter by status (normal/abnormal/warning)"),
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    search: Optional[str] = Query(None, max_length=100, description="Search by vehicle plat or user name"),
+    vehicle_id: Optional[UUID] = Query(None),
+    user_id: Optional[UUID] = Query(None),
+    vehicle_type: Optional[str] = Query(None, description="Filter by vehicle type (e.g. Light Vehicle)"),
+    with_total: bool = Query(True, description="Hitung total laporan yang cocok dengan filter"),
     db: Session = Depends(get_db)
 ):
-    from app.models.p2h import P2HReport, P2HDetail
-    from sqlalchemy.orm import joinedload
+    """
+    Daftar laporan P2H (terbaru dulu).
     
-    # Load with details untuk menampilkan keterangan
-    # Filter soft delete: hanya tampilkan data yang tidak dihapus
-    reports = db.query(P2HReport).filter(
-        P2HReport.is_deleted == False
-    ).options(
-        joinedload(P2HReport.vehicle),
-        joinedload(P2HReport.user),
-        joinedload(P2HReport.details).joinedload(P2HDetail.checklist_item)
-    ).order_by(
-        P2HReport.submission_date.desc(),
-        P2HReport.submission_time.desc()
-    ).offset(skip).limit(limit).all()
-    
-    # mode='json' converts UUID to string automatically
-    payload = [P2HReportListResponse.model_validate(r).model_dump(mode='json') for r in reports]
-    return base_response(message="Daftar laporan P2H berhasil diambil", payload=payload)
+    Dengan `cursor` atau `page_size`: keyset pagination, payload
+    {items, next_cursor, has_more, total}. Kirim next_cursor sebagai `cursor` untuk
+    halaman berikutnya; latensi tetap sama sedalam apa pun halaman yang diminta.
+    `total` hanya dihitung di halaman pertama (null di halaman berikutnya).
+    
+    Tanpa keduanya: perilaku lama (list dengan skip/limit) untuk client yang belum
+    migrasi; total dikirim lewat header X-Total-Count (COUNT hanya dijalankan jika
+    hasil mencapai `limit`).
+    
+    `fields=summary`: hanya kolom header, identitas unit/user dan jumlah item
+    abnormal/warning (satu query datar). Details diambil lewat /reports/{report_id}
+    saat baris dibuka.
+    
+    Filter (kategori, report_status, start_date, end_date, search) sama dengan
+    /export/p2h-reports, ditambah vehicle_id, user_id dan vehicle_type.
+    """
+    try:
+        filters = p2h_service.build_report_filters(
+            kategori=kategori,
+            report_status=report_status,
+            start_date=start_date,
+            end_date=end_date,
+            search=search,
+            vehicle_id=vehicle_id,
+            user_id=user_id,
+            vehicle_type=vehicle_type
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    summary = fields == "summary"
+    schema = P2HReportSummaryResponse if summary else P2HReportListResponse
+    
+    if cursor is not None or page_size is not None:
+        try:
+            reports, next_cursor = p2h_service.get_reports_page(
+                db, page_size or P2HSettings.REPORTS_PAGE_SIZE, cursor, summary=summary, filters=filters
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        
+        total = p2h_repository.count_reports(db, filters) if with_total and cursor is None else None
+        return page_response(
+            "Daftar laporan P2H berhasil diambil",
+            schema,
+            reports,
+            next_cursor=next_cursor,
+            has_more=next_cursor is not None,
+            total=total
+        )
+    
+    if summary:
+        reports = p2h_repository.get_report_summaries(db, limit, offset=skip, filters=filters)
+    else:
+        # Details di-selectinload: LIMIT berlaku ke baris laporan, bukan baris detail
+        reports = p2h_repository.get_reports_page(db, limit, offset=skip, filters=filters)
+    
+    # Validasi + encode seluruh list sekaligus lewat TypeAdapter
+    response = list_response("Daftar laporan P2H berhasil diambil", schema, reports)
+    if with_total:
+        # Halaman tidak penuh sudah memuat sisa laporan: total = skip + jumlah baris, tanpa COUNT
+        if len(reports) < limit and (reports or skip == 0):
+            total = skip + len(reports)
+        else:
+            total = p2h_repository.count_reports(db, filters)
+        response.headers["X-Total-Count"] = str(total)
+    return response
 
 @router.get("/reports/{report_id}")
 async def get_p2h_report(
     report_id: UUID,
     db: Session = Depends(get_db)
 ):
-    from app.models.p2h import P2HReport
+    # Details + checklist item di-eager-load (dipanggil saat baris tabel dibuka)
+    report = p2h_repository.get_report_with_details(db, report_id)
     # Filter soft delete: hanya tampilkan data yang tidak dihapus
-    report = db.query(P2HReport).filter(
-        P2HReport.id == report_id,
-        P2HReport.is_deleted == False
-    ).first()
-    if not report:
+    if not report or report.is_deleted:
         raise HTTPException(status_code=404, detail="Laporan P2H tidak ditemukan")
     
     payload = P2HReportResponse.model_validate(report).model_dump(mode='json')
@@ -349,11 +583,8 @@ async def delete_p2h_report(
             detail="Laporan P2H tidak ditemukan atau sudah dihapus"
         )
     
-    # Soft delete: set flag is_deleted dan timestamp
-    report.is_deleted = True
-    report.deleted_at = datetime.utcnow()
-    
-    db.commit()
+    # Soft delete: set flag is_deleted dan timestamp (status cache unit ikut diperbarui)
+    report = p2h_service.soft_delete_report(db, report)
     
     return base_response(
         message="Laporan P2H berhasil dihapus",
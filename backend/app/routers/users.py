@@ -10,6 +10,8 @@ from app.schemas.user import UserCreate, UserUpdate, UserResponse
 from app.services.auth_service import auth_service
 from app.dependencies import get_current_user, require_role
 from app.utils.response import base_response 
+from app.utils.cache import dashboard_cache
+from app.utils.serializers import list_response
 
 router = APIRouter()
 
@@ -63,6 +65,8 @@ async def update_current_user_profile(
         
         current_user.updated_at = datetime.utcnow()
         db.commit()
+        # Nama pemeriksa tampil di laporan terbaru dashboard
+        dashboard_cache.bump()
         db.refresh(current_user)
         
         return base_response(
@@ -125,12 +129,7 @@ async def get_users(
     """
     users = auth_service.get_all_users(db, skip=skip, limit=limit)
     # Data dikonversi ke UserResponse agar password_hash tidak ikut terkirim
-    payload = [UserResponse.model_validate(u).model_dump(mode='json') for u in users]
-    
-    return base_response(
-        message="Daftar user berhasil diambil",
-        payload=payload
-    )
+    return list_response("Daftar user berhasil diambil", UserResponse, users)
 
 @router.get("/{user_id}")
 async def get_user(
@@ -165,6 +164,8 @@ async def update_user(
     """
     try:
         user = auth_service.update_user(db, user_id, user_data)
+        # Nama / kategori pemeriksa dipakai di hasil dashboard
+        dashboard_cache.bump()
         return base_response(
             message="Data user berhasil diperbarui",
             payload=UserResponse.model_validate(user).model_dump(mode='json')
@@ -1,13 +1,13 @@
 """
 Router for Vehicle Type endpoints
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
 from typing import Optional
 from uuid import UUID
 
 from app.database import get_db
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, conditional_get
 from app.models.user import User
 from app.repositories.vehicle_type_repository import VehicleTypeRepository
 from app.services.vehicle_type_service import VehicleTypeService
@@ -17,7 +17,8 @@ from app.schemas.vehicle_type import (
     VehicleTypeResponse,
     VehicleTypeListResponse
 )
-from app.utils.response import base_response
+from app.utils.cache import vehicle_types_cache
+from app.utils.response import base_response, render_base_response, versioned_response
 
 
 router = APIRouter(prefix="/vehicle-types", tags=["vehicle-types"])
@@ -29,8 +30,13 @@ def get_vehicle_type_service(db: Session = Depends(get_db)) -> VehicleTypeServic
     return VehicleTypeService(repository)
 
 
-@router.get("/active", response_model=list[VehicleTypeResponse])
+@router.get(
+    "/active",
+    response_model=list[VehicleTypeResponse],
+    dependencies=[Depends(conditional_get(vehicle_types_cache))]
+)
 async def get_active_vehicle_types(
+    request: Request,
     service: VehicleTypeService = Depends(get_vehicle_type_service),
     current_user: User = Depends(get_current_user)
 ):
@@ -38,13 +44,15 @@ async def get_active_vehicle_types(
     Get all active vehicle types for dropdowns
     
     **Accessible by**: All authenticated users
+    **Caching**: ETag/Last-Modified per versi vehicle_types_cache, If-None-Match → 304 tanpa query
     """
-    vehicle_types = service.get_active_vehicle_types()
-    return base_response(
-        message="Tipe kendaraan aktif berhasil diambil",
-        payload=vehicle_types,
-        status_code=200
-    )
+    def render():
+        return render_base_response(
+            message="Tipe kendaraan aktif berhasil diambil",
+            payload=service.get_active_vehicle_types()
+        )
+
+    return versioned_response(request, vehicle_types_cache, "active", render)
 
 
 @router.get("", response_model=VehicleTypeListResponse)
@@ -101,6 +109,7 @@ async def create_vehicle_type(
     **Requires**: name (unique)
     """
     created = service.create_vehicle_type(vehicle_type, current_user.id)
+    vehicle_types_cache.bump()
     return base_response(
         message="Tipe kendaraan berhasil dibuat",
         payload=created,
@@ -121,6 +130,7 @@ async def update_vehicle_type(
     **Accessible by**: All authenticated users (page restricted to admin)
     """
     updated = service.update_vehicle_type(vehicle_type_id, vehicle_type)
+    vehicle_types_cache.bump()
     return base_response(
         message="Tipe kendaraan berhasil diupdate",
         payload=updated,
@@ -140,6 +150,7 @@ async def delete_vehicle_type(
     **Accessible by**: All authenticated users (page restricted to admin)
     """
     service.delete_vehicle_type(vehicle_type_id)
+    vehicle_types_cache.bump()
     return base_response(
         message="Tipe kendaraan berhasil dihapus",
         payload=None,
@@ -10,13 +10,28 @@ from app.models.vehicle import Vehicle, UnitKategori
 from app.schemas.vehicle import VehicleCreate, VehicleUpdate, VehicleResponse
 from app.dependencies import get_current_user, require_role
 from app.services.p2h_service import p2h_service
+from app.services.p2h_status_cache import p2h_status_cache
+from app.utils.cache import vehicles_cache, dashboard_cache
 from app.utils.response import base_response
+from app.utils.serializers import list_response
 from app.repositories.vehicle_repository import vehicle_repository 
+from app.repositories.daily_stats_repository import daily_stats_repository
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+
+def _move_daily_stats(db: Session, vehicle: Vehicle, new_vehicle_type) -> bool:
+    """
+    Pindahkan agregat p2h_daily_stats kendaraan jika tipe berubah.
+    Dipanggil sebelum tipe baru di-assign; True jika dashboard_cache perlu di-bump setelah commit.
+    """
+    if new_vehicle_type is None or new_vehicle_type == vehicle.vehicle_type:
+        return False
+    daily_stats_repository.move_subject(db, vehicle_id=vehicle.id, new_vehicle_type=new_vehicle_type)
+    return True
+
 # --- ENDPOINT PUBLIK (TANPA LOGIN) ---
 
 @router.get("/lambung/{no_lambung}")
@@ -64,7 +79,7 @@ async def get_vehicle_by_lambung(
         )
     
     # Mendapatkan status P2H hari ini (Shift, ketersediaan, dll)
-    p2h_status = p2h_service.get_vehicle_p2h_status(db, vehicle.id)
+    p2h_status = p2h_service.get_vehicle_p2h_status(db, vehicle.id, vehicle=vehicle)
     
     # Debug log untuk troubleshooting
     logger.info(f"🔍 [P2H Status Debug] Vehicle: {no_lambung}")
@@ -146,7 +161,9 @@ async def restore_or_create_travel_vehicle(
             logger.info(f"🔄 Restoring deleted vehicle with plat_nomor: {plat_nomor}")
             
             # Update semua field dari vehicle_data kecuali id, created_at
-            for field, value in vehicle_data.model_dump(exclude_unset=True).items():
+            update_data = vehicle_data.model_dump(exclude_unset=True)
+            stats_moved = _move_daily_stats(db, existing_vehicle, update_data.get('vehicle_type'))
+            for field, value in update_data.items():
                 if field not in ['id', 'created_at']:
                     setattr(existing_vehicle, field, value)
             
@@ -155,6 +172,11 @@ async def restore_or_create_travel_vehicle(
             existing_vehicle.updated_at = datetime.utcnow()
             
             db.commit()
+            
+            vehicles_cache.bump()
+            if stats_moved:
+                dashboard_cache.bump()
+            p2h_status_cache.invalidate_vehicle(existing_vehicle.id)
             db.refresh(existing_vehicle)
             
             logger.info(f"✅ Vehicle restored successfully: {plat_nomor}")
@@ -169,6 +191,7 @@ async def restore_or_create_travel_vehicle(
     vehicle = Vehicle(**vehicle_data.model_dump())
     db.add(vehicle)
     db.commit()
+    vehicles_cache.bump()
     db.refresh(vehicle)
     
     logger.info(f"✅ New vehicle created: {plat_nomor}")
@@ -222,7 +245,9 @@ async def restore_or_create_imm_vehicle(
             logger.info(f"🔄 Restoring deleted vehicle with no_lambung: {no_lambung}")
             
             # Update semua field dari vehicle_data kecuali id, created_at
-            for field, value in vehicle_data.model_dump(exclude_unset=True).items():
+            update_data = vehicle_data.model_dump(exclude_unset=True)
+            stats_moved = _move_daily_stats(db, existing_vehicle, update_data.get('vehicle_type'))
+            for field, value in update_data.items():
                 if field not in ['id', 'created_at']:
                     setattr(existing_vehicle, field, value)
             
@@ -231,6 +256,11 @@ async def restore_or_create_imm_vehicle(
             existing_vehicle.updated_at = datetime.utcnow()
             
             db.commit()
+            
+            vehicles_cache.bump()
+            if stats_moved:
+                dashboard_cache.bump()
+            p2h_status_cache.invalidate_vehicle(existing_vehicle.id)
             db.refresh(existing_vehicle)
             
             logger.info(f"✅ Vehicle restored successfully: {no_lambung}")
@@ -245,6 +275,7 @@ async def restore_or_create_imm_vehicle(
     vehicle = Vehicle(**vehicle_data.model_dump())
     db.add(vehicle)
     db.commit()
+    vehicles_cache.bump()
     db.refresh(vehicle)
     
     logger.info(f"✅ New vehicle created: {no_lambung}")
@@ -280,6 +311,7 @@ async def create_vehicle(
     vehicle = Vehicle(**vehicle_data.model_dump())
     db.add(vehicle)
     db.commit()
+    vehicles_cache.bump()
     db.refresh(vehicle)
     
     return base_response(
@@ -329,12 +361,7 @@ async def get_vehicles(
         # Apply pagination di database level
         vehicles = query.offset(skip).limit(limit).all()
         
-        payload = [VehicleResponse.model_validate(v).model_dump(mode='json') for v in vehicles]
-        
-        return base_response(
-            message="Daftar kendaraan berhasil diambil",
-            payload=payload
-        )
+        return list_response("Daftar kendaraan berhasil diambil", VehicleResponse, vehicles)
     except Exception as e:
         logger.error(f"Error fetching vehicles: {str(e)}")
         raise HTTPException(
@@ -396,10 +423,17 @@ async def update_vehicle(
                 detail=f"Nomor lambung {vehicle_data.no_lambung} sudah terdaftar"
             )
     
-    for field, value in vehicle_data.model_dump(exclude_unset=True).items():
+    update_data = vehicle_data.model_dump(exclude_unset=True)
+    stats_moved = _move_daily_stats(db, vehicle, update_data.get('vehicle_type'))
+    for field, value in update_data.items():
         setattr(vehicle, field, value)
     
     db.commit()
+    
+    vehicles_cache.bump()
+    if stats_moved:
+        dashboard_cache.bump()
+    p2h_status_cache.invalidate_vehicle(vehicle_id)
     db.refresh(vehicle)
     
     return base_response(
@@ -426,6 +460,8 @@ async def delete_vehicle(
     
     vehicle.is_active = False
     db.commit()
+    vehicles_cache.bump()
+    p2h_status_cache.invalidate_vehicle(vehicle_id)
     
     return base_response(
         message="Kendaraan berhasil dinonaktifkan",
@@ -480,6 +516,10 @@ async def bulk_delete_vehicles(
     
     db.commit()
     
+    vehicles_cache.bump()
+    for vehicle_id in vehicle_ids:
+        p2h_status_cache.invalidate_vehicle(vehicle_id)
+    
     return base_response(
         message=f"{deleted_count} vehicles successfully deleted",
         payload={
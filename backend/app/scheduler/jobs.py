@@ -102,6 +102,7 @@ async def check_expiry_dates():
 async def retry_failed_notifications():
     """
     Mencoba mengirim ulang notifikasi Telegram yang gagal (is_sent = False).
+    Notifikasi P2H tidak termasuk: outbox-nya dikirim ulang oleh NotificationDispatcher.
     """
     logger.info("🔄 Retrying failed Telegram notifications...")
     
@@ -111,6 +112,10 @@ async def retry_failed_notifications():
         failed_notifications = db.query(TelegramNotification).filter(
             and_(
                 TelegramNotification.is_sent == False,
+                TelegramNotification.notification_type.notin_([
+                    NotificationType.P2H_ABNORMAL,
+                    NotificationType.P2H_WARNING
+                ]),
                 TelegramNotification.created_at >= datetime.utcnow() - timedelta(hours=24)
             )
         ).all()
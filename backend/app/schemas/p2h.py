@@ -4,7 +4,9 @@ from typing import Optional, List
 from uuid import UUID
 
 from app.models.p2h import InspectionStatus
-from app.models.vehicle import VehicleType
+from app.models.vehicle import VehicleType, ShiftType
+from app.models.user import UserKategori
+from app.constants import P2HSettings
 
 
 # --- Checklist Schemas ---
@@ -69,6 +71,7 @@ class P2HReportSubmit(BaseModel):
     vehicle_id: UUID
     shift_number: Optional[int] = Field(None, ge=0, le=12, description="Shift: 0=non-shift, 1-3=regular shift, 11-12=long shift")
     details: List[P2HDetailSubmit] = Field(..., min_length=1, description="At least one checklist item required")
+    client_submission_id: Optional[UUID] = Field(None, description="UUID yang dibuat client, alternatif header Idempotency-Key")
     
     @field_validator('details')
     @classmethod
@@ -79,6 +82,52 @@ class P2HReportSubmit(BaseModel):
         return v
 
 
+class P2HBatchItemSubmit(P2HReportSubmit):
+    """Schema satu laporan offline di dalam batch submit"""
+    captured_at: datetime = Field(..., description="Waktu pemeriksaan di perangkat (ISO 8601). Tanpa timezone dianggap WITA")
+
+
+class P2HBatchSubmit(BaseModel):
+    """Schema for batch/offline P2H submission"""
+    reports: List[P2HBatchItemSubmit] = Field(..., min_length=1, max_length=P2HSettings.MAX_BATCH_SIZE)
+
+
+class FleetStatusRequest(BaseModel):
+    """Schema for fleet P2H status of selected vehicles"""
+    vehicle_ids: List[UUID] = Field(..., min_length=1, max_length=2000)
+
+
+class ShiftConfigResponse(BaseModel):
+    """Schema for shift calendar row"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: UUID
+    shift_type: ShiftType
+    shift_number: int
+    name: str
+    start_time: time
+    end_time: time
+    nominal_start: Optional[time] = None
+    is_active: bool
+
+
+class ShiftConfigUpdate(BaseModel):
+    """Schema for updating a shift window (jam dalam WITA)"""
+    name: Optional[str] = Field(None, min_length=1, max_length=50)
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+    nominal_start: Optional[time] = None
+    is_active: Optional[bool] = None
+    
+    @field_validator('name', 'start_time', 'end_time', 'is_active')
+    @classmethod
+    def validate_not_null(cls, v, info):
+        """Field boleh dihilangkan, tetapi tidak boleh dikirim null (kolom NOT NULL)"""
+        if v is None:
+            raise ValueError(f'{info.field_name} tidak boleh null')
+        return v
+
+
 class P2HReportResponse(BaseModel):
     """Schema for P2H report response"""
     model_config = ConfigDict(from_attributes=True)
@@ -110,6 +159,28 @@ class P2HReportListResponse(BaseModel):
     details: Optional[List[P2HDetailResponse]] = []
 
 
+class P2HReportSummaryResponse(BaseModel):
+    """Schema ringkas untuk tabel laporan (fields=summary), tanpa details"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: UUID
+    vehicle_id: UUID
+    user_id: UUID
+    shift_number: int
+    overall_status: InspectionStatus
+    submission_date: date
+    submission_time: time
+    created_at: datetime
+    no_lambung: Optional[str] = None
+    plat_nomor: str
+    vehicle_type: VehicleType
+    warna_no_lambung: Optional[str] = None
+    user_full_name: str
+    kategori_pengguna: UserKategori
+    abnormal_count: int = 0
+    warning_count: int = 0
+
+
 # Import for forward references
 from app.schemas.vehicle import VehicleResponse
 from app.schemas.user import UserResponse
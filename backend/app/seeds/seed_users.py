@@ -10,6 +10,7 @@ except ImportError:
     pass
 
 from app.utils.password import hash_password
+from app.repositories.daily_stats_repository import daily_stats_repository
 from datetime import date
 
 def seed_users():
@@ -68,6 +69,9 @@ def seed_users():
                 user.email = data["email"]
                 user.birth_date = data["birth_date"]
                 user.role = data["role"]
+                if data["kategori_pengguna"] != user.kategori_pengguna:
+                    # Agregat p2h_daily_stats dipindah sebelum kategori baru di-assign
+                    daily_stats_repository.move_subject(db, user_id=user.id, new_kategori=data["kategori_pengguna"])
                 user.kategori_pengguna = data["kategori_pengguna"]
                 print(f"[UPDATE] Akun ditemukan, data diperbarui: {data['full_name']}")
             
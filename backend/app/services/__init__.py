@@ -1,5 +1,7 @@
 # Services package
 from app.services.telegram_service import telegram_service
+from app.services.notification_dispatcher import notification_dispatcher
+from app.services.p2h_status_cache import p2h_status_cache
 from app.services.p2h_service import p2h_service
 
-__all__ = ['telegram_service', 'p2h_service']
+__all__ = ['telegram_service', 'notification_dispatcher', 'p2h_status_cache', 'p2h_service']
@@ -1,10 +1,11 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from typing import Optional, List
 from uuid import UUID
 from fastapi import HTTPException, status  # Import wajib untuk handle error API
 
 from app.models.user import User
 from app.models.vehicle import Vehicle
+from app.repositories.daily_stats_repository import daily_stats_repository
 from app.schemas.user import UserCreate, UserUpdate
 from app.utils.password import hash_password, verify_password, generate_username
 
@@ -133,7 +134,13 @@ class AuthService:
         """
         Get all active users with pagination.
         """
-        return db.query(User).filter(User.is_active == True).offset(skip).limit(limit).all()
+        # Relasi yang ikut di UserResponse dimuat per batch (bukan lazy load per user)
+        return db.query(User).options(
+            selectinload(User.company),
+            selectinload(User.department),
+            selectinload(User.position),
+            selectinload(User.work_status)
+        ).filter(User.is_active == True).offset(skip).limit(limit).all()
     
     @staticmethod
     def update_user(db: Session, user_id: UUID, user_data: UserUpdate) -> User:
@@ -187,6 +194,9 @@ class AuthService:
             user.role = user_data.role
         
         if user_data.kategori_pengguna is not None:
+            if user_data.kategori_pengguna != user.kategori_pengguna:
+                # Agregat p2h_daily_stats dipindah sebelum kategori baru di-assign
+                daily_stats_repository.move_subject(db, user_id=user.id, new_kategori=user_data.kategori_pengguna)
             user.kategori_pengguna = user_data.kategori_pengguna
         
         if user_data.is_active is not None:
@@ -8,7 +8,9 @@ from sqlalchemy.orm import Session
 from typing import Optional, Dict, Any
 from datetime import date
 
+from app.models.p2h import InspectionStatus
 from app.utils.datetime import get_current_datetime
+from app.utils.pagination import encode_cursor, decode_report_cursor, decode_vehicle_cursor
 from app.repositories.dashboard_repository import DashboardRepository
 from app.repositories.p2h_repository import P2HRepository
 from app.repositories.vehicle_repository import VehicleRepository
@@ -17,6 +19,15 @@ from app.repositories.vehicle_repository import VehicleRepository
 class DashboardService:
     """Service for dashboard business logic"""
     
+    # Kartu dashboard yang menampilkan laporan (None = semua status)
+    REPORT_CARDS = {
+        "total_normal": InspectionStatus.NORMAL,
+        "total_abnormal": InspectionStatus.ABNORMAL,
+        "total_warning": InspectionStatus.WARNING,
+        "total_completed": None,
+    }
+    VEHICLE_CARDS = ("total_vehicles", "total_pending")
+    
     def __init__(self):
         self.dashboard_repo = DashboardRepository()
         self.p2h_repo = P2HRepository()
@@ -32,7 +43,8 @@ class DashboardService:
         """
         Get comprehensive dashboard statistics with business logic.
         
-        This method orchestrates multiple repository calls and applies
+        All card values come from one repository query over the p2h_daily_stats
+        aggregate (kept in sync by submit and soft delete); this method applies
         business logic to calculate derived metrics.
         
         Args:
@@ -44,12 +56,14 @@ class DashboardService:
         Returns:
             Dictionary with complete statistics
         """
-        # Get base statistics from repository
-        stats = self.dashboard_repo.get_statistics(db, start_date, end_date, vehicle_type)
+        # Get base statistics (termasuk unit yang sudah P2H hari ini) dalam satu query
+        today = get_current_datetime().date()
+        stats = self.dashboard_repo.get_statistics(
+            db, start_date, end_date, vehicle_type, reported_on=today
+        )
         
         # Business logic: Calculate pending P2H
-        today = get_current_datetime().date()
-        vehicles_reported_today = self.p2h_repo.get_vehicles_reported_on_date(db, today)
+        vehicles_reported_today = stats.pop("vehicles_reported")
         total_pending_p2h = max(stats["total_vehicles"] - vehicles_reported_today, 0)
         
         # Add calculated field
@@ -140,6 +154,102 @@ class DashboardService:
             "health_score": round(health_score, 2)
         }
 
+    
+    def get_card_details(
+        self,
+        db: Session,
+        card_type: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        page_size: int = 10,
+        cursor: Optional[str] = None,
+        with_total: bool = True
+    ) -> Dict[str, Any]:
+        """
+        One page of the detail list behind a dashboard card (keyset pagination).
+        
+        Kartu laporan diurutkan terbaru dulu (tanggal, jam, id); kartu kendaraan
+        berdasarkan created_at. Setiap halaman satu query proyeksi (kendaraan &
+        operator di-join), total hanya dihitung di halaman pertama.
+        
+        Args:
+            db: Database session
+            card_type: total_vehicles, total_normal, total_abnormal, total_warning,
+                total_completed atau total_pending
+            start_date: Optional start date filter (kartu laporan)
+            end_date: Optional end date filter (kartu laporan; tanggal cek kartu pending)
+            page_size: Rows per page
+            cursor: next_cursor from the previous page
+            with_total: Count all matching rows on the first page
+            
+        Returns:
+            {"items": [...], "next_cursor": str | None, "total": int | None}
+            
+        Raises:
+            ValueError: card_type or cursor is invalid
+        """
+        first_page = cursor is None
+        
+        if card_type in self.REPORT_CARDS:
+            status = self.REPORT_CARDS[card_type]
+            after = decode_report_cursor(cursor) if cursor else None
+            rows = self.dashboard_repo.get_card_reports(
+                db, status, start_date, end_date, page_size + 1, after
+            )
+            total = self.dashboard_repo.count_card_reports(
+                db, status, start_date, end_date
+            ) if with_total and first_page else None
+            
+            page = rows[:page_size]
+            items = [
+                {
+                    "id": str(r.id),
+                    "no_lambung": r.no_lambung or "-",
+                    "plat_nomor": r.plat_nomor or "-",
+                    "vehicle_type": r.vehicle_type.value if r.vehicle_type else None,
+                    "merk": r.merk or "-",
+                    "status": r.overall_status,
+                    "submission_date": r.submission_date.isoformat() if r.submission_date else None,
+                    "operator": r.operator
+                }
+                for r in page
+            ]
+            next_cursor = encode_cursor(
+                page[-1].submission_date, page[-1].submission_time, page[-1].id
+            ) if len(rows) > page_size else None
+        
+        elif card_type in self.VEHICLE_CARDS:
+            # Kartu pending: unit tanpa P2H pada end_date (default hari ini)
+            pending_on = None
+            if card_type == "total_pending":
+                pending_on = end_date or get_current_datetime().date()
+            after = decode_vehicle_cursor(cursor) if cursor else None
+            rows = self.dashboard_repo.get_card_vehicles(db, pending_on, page_size + 1, after)
+            total = self.dashboard_repo.count_card_vehicles(
+                db, pending_on
+            ) if with_total and first_page else None
+            
+            page = rows[:page_size]
+            items = [
+                {
+                    "id": str(v.id),
+                    "no_lambung": v.no_lambung or "-",
+                    "plat_nomor": v.plat_nomor or "-",
+                    "vehicle_type": v.vehicle_type.value if v.vehicle_type else None,
+                    "merk": v.merk or "-",
+                    "status": "pending" if pending_on else "registered"
+                }
+                for v in page
+            ]
+            next_cursor = encode_cursor(
+                page[-1].created_at, page[-1].id
+            ) if len(rows) > page_size else None
+        
+        else:
+            raise ValueError(f"Invalid card_type: {card_type}")
+        
+        return {"items": items, "next_cursor": next_cursor, "total": total}
+
 
 # Singleton instance
 dashboard_service = DashboardService()
@@ -0,0 +1,178 @@
+"""
+Live Events - Broadcaster in-process untuk stream SSE dashboard (/dashboard/stream)
+
+Dashboard yang terbuka menerima event ringkas setiap kali laporan P2H di-commit
+(submit, batch offline, soft delete), sehingga counter bisa diperbarui secara
+inkremental tanpa polling seluruh query dashboard.
+
+P2HService memanggil publish() SETELAH commit. Setiap koneksi SSE punya antrean
+sendiri (dibatasi); koneksi yang tertinggal tidak memperlambat yang lain: jika
+antreannya penuh, isinya dibuang dan diganti satu event "resync" agar client
+memuat ulang statistik sekali.
+
+Event juga disimpan di ring buffer kecil, sehingga client yang reconnect dengan
+header Last-Event-ID menerima event yang terlewat (atau "resync" jika sudah
+terlalu jauh). Deployment memakai satu proses uvicorn, jadi satu broadcaster
+melihat semua penulisan lewat API.
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from app.utils.response import dumps
+
+logger = logging.getLogger(__name__)
+
+# Penanda akhir stream (shutdown aplikasi)
+_CLOSE = object()
+
+
+def encode_sse(event: str, data: dict, event_id: Optional[int] = None) -> bytes:
+    """Satu frame Server-Sent Events (data JSON satu baris)"""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\n".encode() + b"data: " + dumps(data) + b"\n\n"
+
+
+@dataclass(eq=False)
+class Subscription:
+    """Antrean event untuk satu koneksi SSE"""
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue
+
+
+class LiveEventBroadcaster:
+    """Fan-out event P2H ke semua koneksi SSE yang terbuka"""
+
+    QUEUE_SIZE = 256        # Event per koneksi sebelum diganti "resync"
+    REPLAY_SIZE = 500       # Event terakhir untuk Last-Event-ID
+    HEARTBEAT_SECONDS = 15  # Komentar SSE agar proxy tidak menutup koneksi idle
+    MAX_SUBSCRIBERS = 200
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self._last_id = 0
+        self._recent: deque = deque(maxlen=self.REPLAY_SIZE)
+        self._subscribers: Dict[Subscription, None] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def is_full(self) -> bool:
+        """Jumlah koneksi sudah mencapai MAX_SUBSCRIBERS (endpoint menjawab 503)"""
+        return len(self._subscribers) >= self.MAX_SUBSCRIBERS
+
+    def publish(self, event: str, data: dict) -> int:
+        """
+        Kirim event ke semua subscriber (aman dipanggil dari thread mana pun).
+        Returns: id event
+        """
+        with self._lock:
+            event_id = next(self._ids)
+            self._last_id = event_id
+            frame = encode_sse(event, data, event_id)
+            self._recent.append((event_id, frame))
+            subscribers = list(self._subscribers)
+
+        self._dispatch(subscribers, frame)
+        return event_id
+
+    def close(self) -> None:
+        """Akhiri semua stream (dipanggil saat shutdown agar uvicorn tidak menunggu)"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        self._dispatch(subscribers, _CLOSE)
+
+    def _dispatch(self, subscribers: list, frame) -> None:
+        """Satu callback per event loop (bukan per koneksi) untuk mengisi antrean"""
+        by_loop: Dict[asyncio.AbstractEventLoop, list] = {}
+        for subscription in subscribers:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, group in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(self._deliver_all, group, frame)
+            except RuntimeError:
+                # Event loop subscriber sudah ditutup
+                for subscription in group:
+                    self._unsubscribe(subscription)
+
+    def _deliver_all(self, subscriptions: list, frame) -> None:
+        for subscription in subscriptions:
+            self._deliver(subscription, frame)
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Tuple[Subscription, list]:
+        """
+        Daftarkan koneksi baru di event loop yang sedang berjalan.
+
+        Returns:
+            (subscription, frame yang terlewat sejak last_event_id)
+        """
+        subscription = Subscription(loop=asyncio.get_running_loop(), queue=asyncio.Queue(self.QUEUE_SIZE))
+        with self._lock:
+            self._subscribers[subscription] = None
+            backlog = self._backlog(last_event_id)
+        logger.info(f"📡 Live dashboard connected ({self.subscriber_count} koneksi)")
+        return subscription, backlog
+
+    def _backlog(self, last_event_id: Optional[int]) -> list:
+        if last_event_id is None or last_event_id == self._last_id:
+            return []
+        oldest = self._recent[0][0] if self._recent else self._last_id + 1
+        # Id dari proses sebelumnya (restart) atau sudah keluar dari ring buffer
+        if last_event_id > self._last_id or last_event_id < oldest - 1:
+            return [encode_sse("resync", {"reason": "missed_events"})]
+        return [frame for event_id, frame in self._recent if event_id > last_event_id]
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.pop(subscription, None)
+
+    def _deliver(self, subscription: Subscription, frame) -> None:
+        queue = subscription.queue
+        try:
+            queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Client terlalu lambat: buang antrean, minta muat ulang penuh
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(encode_sse("resync", {"reason": "slow_consumer"}))
+            if frame is _CLOSE:
+                queue.put_nowait(_CLOSE)
+
+    async def stream(self, last_event_id: Optional[int] = None) -> AsyncIterator[bytes]:
+        """
+        Generator body StreamingResponse: backlog, lalu event baru dan heartbeat
+        sampai aplikasi shutdown. Saat client menutup koneksi, StreamingResponse
+        membatalkan generator dan subscription dilepas di finally.
+        """
+        subscription, backlog = self.subscribe(last_event_id)
+        try:
+            yield b"retry: 5000\n\n"
+            for frame in backlog:
+                yield frame
+            queue = subscription.queue
+            while True:
+                if queue.empty():
+                    try:
+                        frame = await asyncio.wait_for(queue.get(), timeout=self.HEARTBEAT_SECONDS)
+                    except asyncio.TimeoutError:
+                        yield b": ping\n\n"
+                        continue
+                else:
+                    frame = queue.get_nowait()
+                if frame is _CLOSE:
+                    break
+                yield frame
+        finally:
+            self._unsubscribe(subscription)
+            logger.info(f"📡 Live dashboard disconnected ({self.subscriber_count} koneksi)")
+
+
+# Global instance (dipakai P2HService dan endpoint /dashboard/stream)
+live_events = LiveEventBroadcaster()
@@ -0,0 +1,225 @@
+"""
+Notification Dispatcher - Mengirim outbox telegram_notifications di luar request path
+
+submit_p2h hanya menulis baris outbox (is_sent=False) di transaksi yang sama dengan
+laporan P2H. Dispatcher ini berjalan sebagai asyncio task di proses API, mengklaim
+baris yang pending, merender pesan dari laporan (details di-eager-load), lalu
+mengirimkannya ke semua subscriber tanpa memegang sesi database selama kirim.
+Akses database berjalan di thread pool agar event loop tidak terblokir.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.database import SessionLocal
+from app.models.notification import TelegramNotification, NotificationType, OUTBOX_MAX_ATTEMPTS
+from app.models.p2h import P2HReport, P2HDetail
+from app.services.telegram_service import telegram_service
+
+logger = logging.getLogger(__name__)
+
+# Tipe notifikasi yang dikirim lewat outbox (alert dokumen tetap dikirim oleh scheduler)
+OUTBOX_NOTIFICATION_TYPES = [NotificationType.P2H_ABNORMAL, NotificationType.P2H_WARNING]
+
+
+class NotificationDispatcher:
+    """Background dispatcher untuk outbox notifikasi P2H"""
+
+    POLL_INTERVAL = 30          # detik, fallback jika tidak ada wake() (misal setelah restart)
+    BATCH_SIZE = 20
+    MAX_ATTEMPTS = OUTBOX_MAX_ATTEMPTS  # sama dengan predicate ix_telegram_notifications_pending
+    LEASE = timedelta(minutes=5)  # baris yang sedang dikirim tidak diambil worker lain
+    RETRY_BACKOFF = timedelta(minutes=1)
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        """Mulai loop dispatcher di event loop yang sedang berjalan"""
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("📮 Notification dispatcher started")
+
+    async def stop(self) -> None:
+        """Hentikan loop dispatcher"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("📮 Notification dispatcher stopped")
+
+    def wake(self) -> None:
+        """Dipanggil setelah commit outbox agar pengiriman tidak menunggu POLL_INTERVAL"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.dispatch_pending()
+            except Exception as e:
+                logger.error(f"❌ Notification dispatcher error: {str(e)}", exc_info=True)
+                processed = 0
+
+            # Masih ada antrean penuh satu batch -> langsung lanjut
+            if processed >= self.BATCH_SIZE:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _claim_batch(self, db) -> List[UUID]:
+        """
+        Klaim baris outbox pending dengan lease (FOR UPDATE SKIP LOCKED + UPDATE ... RETURNING),
+        sehingga beberapa worker tidak mengirim notifikasi yang sama.
+        """
+        now = datetime.utcnow()
+        pending = select(TelegramNotification.id).where(
+            and_(
+                TelegramNotification.is_sent == False,
+                TelegramNotification.notification_type.in_(OUTBOX_NOTIFICATION_TYPES),
+                TelegramNotification.attempt_count < self.MAX_ATTEMPTS,
+                or_(
+                    TelegramNotification.next_attempt_at.is_(None),
+                    TelegramNotification.next_attempt_at <= now
+                )
+            )
+        ).order_by(TelegramNotification.created_at).limit(self.BATCH_SIZE).with_for_update(skip_locked=True)
+
+        claimed = db.execute(
+            update(TelegramNotification)
+            .where(TelegramNotification.id.in_(pending.scalar_subquery()))
+            .values(
+                attempt_count=TelegramNotification.attempt_count + 1,
+                next_attempt_at=now + self.LEASE
+            )
+            .returning(TelegramNotification.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.commit()
+        return claimed
+
+    async def dispatch_pending(self) -> int:
+        """
+        Kirim satu batch outbox. Mengembalikan jumlah baris yang diproses.
+
+        Query dan penulisan hasil memakai SQLAlchemy sinkron, jadi dijalankan di
+        thread pool (asyncio.to_thread); hanya pengiriman Telegram yang berjalan
+        di event loop.
+
+        Baris dianggap terkirim (is_sent=True) jika pesan sampai ke minimal satu
+        subscriber, sama seperti TelegramService.send_p2h_notification. Chat yang gagal
+        hanya dicatat di error_message dan tidak dikirim ulang; baris baru
+        dicoba lagi (dengan backoff) jika tidak ada satu pun chat yang berhasil.
+        """
+        # 1. Klaim & render dengan sesi singkat
+        jobs, chat_ids = await asyncio.to_thread(self._prepare_batch)
+        if not jobs:
+            return 0
+
+        # 2. Kirim tanpa memegang sesi database
+        results = []
+        for notification_id, message in jobs:
+            if not message:
+                results.append((notification_id, message, None, "Laporan P2H tidak ditemukan"))
+                continue
+            if not chat_ids:
+                results.append((notification_id, message, None, "Tidak ada subscriber aktif"))
+                continue
+            result = await telegram_service.broadcast_to_chats(chat_ids, message)
+            results.append((notification_id, message, result, None))
+
+        # 3. Simpan hasil pengiriman
+        await asyncio.to_thread(self._record_results, results, chat_ids)
+
+        sent = sum(1 for _, _, r, _ in results if r is not None and r.success_count > 0)
+        logger.info(f"📤 Outbox dispatch: {sent}/{len(results)} notifikasi terkirim")
+        return len(results)
+
+    def _prepare_batch(self) -> Tuple[List[Tuple[UUID, Optional[str]]], List[str]]:
+        """
+        Klaim batch, render pesan (details di-eager-load) dan ambil subscriber aktif.
+
+        Returns:
+            (daftar (notification_id, message), daftar chat_id subscriber aktif)
+        """
+        db = SessionLocal()
+        try:
+            claimed_ids = self._claim_batch(db)
+            if not claimed_ids:
+                return [], []
+
+            notifications = db.query(TelegramNotification).options(
+                joinedload(TelegramNotification.vehicle),
+                joinedload(TelegramNotification.report).joinedload(P2HReport.user),
+                joinedload(TelegramNotification.report)
+                    .selectinload(P2HReport.details)
+                    .joinedload(P2HDetail.checklist_item)
+            ).filter(TelegramNotification.id.in_(claimed_ids)).all()
+
+            jobs = []
+            for notification in notifications:
+                message = notification.message
+                if not message and notification.report is not None:
+                    message = telegram_service.format_p2h_notification(
+                        notification.vehicle, notification.report, notification.report.overall_status
+                    )
+                jobs.append((notification.id, message))
+
+            return jobs, telegram_service._get_active_subscribers(db)
+        finally:
+            db.close()
+
+    def _record_results(self, results: list, chat_ids: List[str]) -> None:
+        """
+        Tulis status pengiriman setiap baris outbox dan tandai subscriber yang berhasil dikirimi.
+
+        Args:
+            results: daftar (notification_id, message, BroadcastResult | None, error)
+            chat_ids: subscriber aktif yang dipakai saat kirim
+        """
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            notified_chat_ids = set()
+            for notification_id, message, result, error in results:
+                values = {"message": message}
+                if result is not None and result.success_count > 0:
+                    values.update(is_sent=True, sent_at=now, next_attempt_at=None)
+                    notified_chat_ids.update(c for c in chat_ids if c not in result.failed_chat_ids)
+                    if result.failed_count > 0:
+                        error = f"Gagal kirim ke {result.failed_count} dari {result.total_subscribers} subscriber"
+                else:
+                    values["next_attempt_at"] = now + self.RETRY_BACKOFF
+                    if result is not None:
+                        error = f"Gagal kirim ke {result.failed_count} dari {result.total_subscribers} subscriber"
+                values["error_message"] = error
+
+                db.query(TelegramNotification).filter(
+                    TelegramNotification.id == notification_id
+                ).update(values, synchronize_session=False)
+
+            telegram_service.mark_subscribers_notified(db, list(notified_chat_ids))
+            db.commit()
+        finally:
+            db.close()
+
+
+# Global instance
+notification_dispatcher = NotificationDispatcher()
@@ -1,23 +1,38 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import Optional, Tuple, List
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from typing import Optional, Tuple, List, Dict, Union
 from uuid import UUID
+from datetime import datetime, date, timedelta
 import logging
+import uuid
 
-from app.models.user import User
+from app.models.user import User, UserKategori
 from app.models.p2h import P2HReport, P2HDetail, P2HDailyTracker, InspectionStatus
-from app.models.vehicle import Vehicle, ShiftType
+from app.models.vehicle import Vehicle, ShiftType, VehicleType
 from app.models.checklist import ChecklistTemplate
-from app.schemas.p2h import P2HReportSubmit, P2HDetailSubmit
+from app.schemas.p2h import P2HReportSubmit, P2HDetailSubmit, P2HBatchItemSubmit
+from app.repositories.p2h_repository import p2h_repository
+from app.repositories.daily_stats_repository import daily_stats_repository
 from app.utils.datetime import (
+    get_current_datetime,
     get_current_date_shift, 
     get_current_date_non_shift,
     get_current_time, 
     get_shift_number, 
     get_long_shift_number, 
-    is_within_non_shift_hours
+    is_within_non_shift_hours,
+    to_local_datetime,
+    validate_shift_time
 )
-from app.services.telegram_service import telegram_service
+from app.constants import P2HSettings
+from app.utils.cache import checklist_cache, dashboard_cache
+from app.utils.shift_clock import shift_clock
+from app.models.notification import TelegramNotification, NotificationType
+from app.services.notification_dispatcher import notification_dispatcher
+from app.services.p2h_status_cache import p2h_status_cache, ShiftState, VehicleSnapshot
+from app.services.live_events import live_events
+from app.utils.pagination import encode_cursor, decode_report_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -25,29 +40,13 @@ class P2HService:
     """Service for P2H (Pelaksanaan Pemeriksaan Harian) operations"""
     
     @staticmethod
-    def get_or_create_daily_tracker(db: Session, vehicle: Vehicle, current_date) -> P2HDailyTracker:
+    def get_daily_tracker(db: Session, vehicle: Vehicle, current_date) -> Optional[P2HDailyTracker]:
         """
-        Mendapatkan atau membuat tracker harian untuk unit tertentu.
-        Menggunakan tanggal yang sudah disesuaikan dengan tipe shift.
+        Mendapatkan tracker harian untuk unit tertentu (read-only).
+        Tracker dibuat/diklaim oleh submit_p2h via upsert atomik di transaksi yang sama
+        dengan laporan, sehingga pengecekan status tidak pernah melakukan commit sendiri.
         """
-        tracker = db.query(P2HDailyTracker).filter(
-            and_(
-                P2HDailyTracker.vehicle_id == vehicle.id,
-                P2HDailyTracker.date == current_date
-            )
-        ).first()
-        
-        if not tracker:
-            tracker = P2HDailyTracker(
-                vehicle_id=vehicle.id,
-                date=current_date,
-                submission_count=0
-            )
-            db.add(tracker)
-            db.commit()
-            db.refresh(tracker)
-        
-        return tracker
+        return p2h_repository.get_daily_tracker(db, vehicle.id, current_date)
     
     @staticmethod
     def can_submit_p2h(
@@ -62,60 +61,176 @@ class P2HService:
         - SHIFT (Kuning): 3x sehari, reset jam 05:00, validasi shift vs jam saat ini
         - NON_SHIFT (Hijau/Biru): 1x sehari, reset jam 00:00, hanya jam 06:00-16:00
         - LONG_SHIFT: 2x sehari, reset jam 05:00, validasi shift vs jam saat ini
+        
+        Kuota dibaca dari status cache (tanpa query jika entry masih berlaku).
         """
-        current_time = get_current_time()
+        now = get_current_datetime()
+        _, state = P2HService.get_shift_state(db, vehicle, now)
+        return P2HService.check_shift_quota(vehicle, selected_shift, state.tracker_done, now.time())
+    
+    @staticmethod
+    def check_shift_quota(
+        vehicle: Vehicle,
+        selected_shift: int,
+        tracker_done: Dict[int, bool],
+        current_time
+    ) -> Tuple[bool, str]:
+        """
+        Logika kuota shift murni (tanpa query) terhadap slot tracker yang sudah dibaca.
+        """
+        can_submit, message = P2HService.check_shift_window(vehicle, selected_shift, current_time)
+        if not can_submit:
+            return False, message
         
-        # Tentukan tanggal operasional berdasarkan tipe shift
-        if vehicle.shift_type == ShiftType.NON_SHIFT:
-            current_date = get_current_date_non_shift()  # Reset jam 00:00
-        else:
-            current_date = get_current_date_shift()  # Reset jam 05:00
+        slot = P2HService.get_tracker_slot(vehicle, selected_shift)
+        if tracker_done.get(slot):
+            return False, P2HService.get_quota_message(vehicle, slot)
         
-        tracker = P2HService.get_or_create_daily_tracker(db, vehicle, current_date)
+        return True, "P2H dapat diisi"
+    
+    @staticmethod
+    def check_shift_window(vehicle: Vehicle, selected_shift: int, current_time) -> Tuple[bool, str]:
+        """
+        Validasi jam submit terhadap tipe shift kendaraan (tanpa cek kuota).
         
+        - NON_SHIFT: hanya jam 06:00-16:00
+        - LONG_SHIFT / SHIFT: shift yang dipilih harus sesuai dengan jam saat ini
+        """
         # Logika Kendaraan Non-Shift (Hijau & Biru - Hanya 1x sehari, jam 06:00-16:00)
         if vehicle.shift_type == ShiftType.NON_SHIFT:
-            # Validasi jam kerja non-shift
             if not is_within_non_shift_hours(current_time):
-                return False, "P2H non-shift hanya dapat diisi pada jam 06:00-16:00"
-            
-            if tracker.shift_1_done:
-                return False, "P2H sudah diisi hari ini untuk kendaraan non-shift"
+                window = shift_clock.get_window(ShiftType.NON_SHIFT, 1)
+                return False, f"P2H non-shift hanya dapat diisi pada jam {window.window_label if window else '-'}"
             return True, "P2H dapat diisi"
         
         # Logika Kendaraan Long Shift (2x sehari, reset jam 05:00)
         if vehicle.shift_type == ShiftType.LONG_SHIFT:
             actual_long_shift = get_long_shift_number(current_time)
-            
-            # Validasi: Shift yang dipilih harus sesuai dengan jam saat ini
             if selected_shift != actual_long_shift:
                 return False, f"Saat ini adalah Long Shift {actual_long_shift} (bukan Long Shift {selected_shift}). Pilih shift yang sesuai."
-            
-            if selected_shift == 1:
-                if tracker.shift_1_done:
-                    return False, "P2H long shift 1 (06:00-19:00) sudah diisi hari ini"
-            else:  # selected_shift == 2
-                if tracker.shift_2_done:
-                    return False, "P2H long shift 2 (18:00-07:00) sudah diisi hari ini"
             return True, "P2H dapat diisi"
         
         # Logika Kendaraan Shift (Kuning - 3x sehari, reset jam 05:00)
         actual_shift = get_shift_number(current_time)
-        
-        # Validasi: Shift yang dipilih harus sesuai dengan jam saat ini
         if selected_shift != actual_shift:
             return False, f"Saat ini adalah Shift {actual_shift} (bukan Shift {selected_shift}). Pilih shift yang sesuai dengan jam saat ini."
+        return True, "P2H dapat diisi"
+    
+    @staticmethod
+    def get_operational_date(vehicle: Union[Vehicle, VehicleSnapshot], at: Optional[datetime] = None) -> date:
+        """
+        Tanggal operasional unit pada waktu `at` (default: sekarang).
+        NON_SHIFT reset jam 00:00, SHIFT & LONG_SHIFT reset jam 05:00.
+        """
+        if vehicle.shift_type == ShiftType.NON_SHIFT:
+            return get_current_date_non_shift(at)
+        return get_current_date_shift(at)
+    
+    @staticmethod
+    def resolve_shift_number(vehicle: Vehicle, selected_shift: Optional[int], current_time) -> int:
+        """
+        Shift yang dicatat di laporan: shift pilihan user dari dropdown,
+        atau shift otomatis dari jam jika tidak dipilih. Non-shift selalu shift 1.
+        """
+        if vehicle.shift_type == ShiftType.NON_SHIFT:
+            return 1
+        if vehicle.shift_type == ShiftType.LONG_SHIFT:
+            return selected_shift or get_long_shift_number(current_time)
+        return selected_shift or get_shift_number(current_time)
+    
+    @staticmethod
+    def get_tracker_slot(vehicle: Vehicle, shift_number: int) -> int:
+        """Kolom shift_N_done di tracker yang dipakai oleh submit ini (non-shift selalu slot 1)"""
+        if vehicle.shift_type == ShiftType.NON_SHIFT:
+            return 1
+        return shift_number
+    
+    @staticmethod
+    def get_quota_message(vehicle: Vehicle, slot: int) -> str:
+        """Pesan error ketika kuota shift pada tanggal operasional sudah terpakai"""
+        if vehicle.shift_type == ShiftType.NON_SHIFT:
+            return "P2H sudah diisi hari ini untuk kendaraan non-shift"
+        if vehicle.shift_type == ShiftType.LONG_SHIFT:
+            window = shift_clock.get_window(ShiftType.LONG_SHIFT, slot)
+            return f"P2H long shift {slot} ({window.window_label if window else '-'}) sudah diisi hari ini"
+        return f"P2H shift {slot} sudah diisi untuk unit ini hari ini"
+    
+    @staticmethod
+    def get_active_checklist_tags(db: Session) -> list:
+        """
+        Pasangan (id, vehicle_tags) semua checklist aktif.
+        Disimpan di checklist_cache, ikut ter-reset saat checklist diubah.
+        """
+        def load_active_tags():
+            rows = db.query(ChecklistTemplate.id, ChecklistTemplate.vehicle_tags).filter(
+                ChecklistTemplate.is_active == True
+            ).all()
+            return [(row.id, tuple(row.vehicle_tags or ())) for row in rows]
+        
+        _, active = checklist_cache.get_or_set("active_tags", load_active_tags)
+        return active
+    
+    @staticmethod
+    def is_known_checklist_tag(db: Session, vehicle_type: str) -> bool:
+        """Apakah vehicle_type dipakai sebagai tag oleh minimal satu checklist aktif"""
+        def load_tag_set():
+            return frozenset(tag for _, tags in P2HService.get_active_checklist_tags(db) for tag in tags)
         
-        shift_status = {
-            1: tracker.shift_1_done,
-            2: tracker.shift_2_done,
-            3: tracker.shift_3_done
-        }
+        _, tag_set = checklist_cache.get_or_set("active_tag_set", load_tag_set)
+        return vehicle_type in tag_set
+    
+    @staticmethod
+    def get_allowed_checklist_ids(db: Session, vehicle_type: str) -> frozenset:
+        """
+        ID checklist aktif yang ditampilkan form P2H untuk tipe kendaraan ini.
         
-        if shift_status.get(selected_shift):
-            return False, f"P2H shift {selected_shift} sudah diisi untuk unit ini hari ini"
+        Aturan sama dengan filter di form (p2h_form.vue): item dengan tag persis
+        vehicle_type; jika tidak ada, item dengan tag yang mirip (case-insensitive,
+        saling mengandung). Form tidak memfilter shift, jadi shift tidak dicek.
+        Disimpan di checklist_cache, ikut ter-reset saat checklist diubah.
+        """
+        def load_allowed():
+            active = P2HService.get_active_checklist_tags(db)
+            exact = frozenset(item_id for item_id, tags in active if vehicle_type in tags)
+            if exact:
+                return exact
+            needle = vehicle_type.lower()
+            return frozenset(
+                item_id for item_id, tags in active
+                if any(tag.lower() in needle or needle in tag.lower() for tag in tags)
+            )
         
-        return True, "P2H dapat diisi"
+        _, allowed = checklist_cache.get_or_set(("allowed_ids", vehicle_type), load_allowed)
+        return allowed
+    
+    @staticmethod
+    def validate_checklist_items(
+        db: Session,
+        vehicle: Vehicle,
+        details: List[P2HDetailSubmit]
+    ) -> Tuple[bool, str]:
+        """
+        Validasi checklist_item_id yang disubmit sebelum laporan ditulis:
+        tidak boleh duplikat dan harus item aktif untuk tipe kendaraan unit.
+        """
+        ids = [d.checklist_item_id for d in details]
+        if len(set(ids)) != len(ids):
+            seen, duplicates = set(), []
+            for item_id in ids:
+                if item_id in seen and item_id not in duplicates:
+                    duplicates.append(item_id)
+                seen.add(item_id)
+            return False, f"Item checklist dikirim lebih dari sekali: {', '.join(str(i) for i in duplicates[:5])}"
+        
+        vehicle_type = getattr(vehicle.vehicle_type, "value", vehicle.vehicle_type)
+        allowed = P2HService.get_allowed_checklist_ids(db, vehicle_type)
+        invalid = [item_id for item_id in ids if item_id not in allowed]
+        if invalid:
+            return False, (
+                f"{len(invalid)} item checklist tidak aktif atau tidak berlaku untuk tipe {vehicle_type}: "
+                f"{', '.join(str(i) for i in invalid[:5])}. Muat ulang form P2H."
+            )
+        return True, "OK"
     
     @staticmethod
     def calculate_overall_status(details: List[P2HDetailSubmit]) -> InspectionStatus:
@@ -145,10 +260,19 @@ class P2HService:
     async def submit_p2h(
         db: Session,
         user: User,
-        submission: P2HReportSubmit
-    ) -> P2HReport:
+        submission: P2HReportSubmit,
+        idempotency_key: Optional[str] = None
+    ) -> Tuple[P2HReport, bool]:
         """
         Memproses submit form P2H dari user.
+        
+        Header, klaim shift di tracker harian, dan seluruh detail ditulis dalam SATU
+        transaksi: detail di-insert sekaligus (bulk) dan commit hanya dilakukan sekali.
+        Kuota shift ditegakkan oleh klaim atomik di database, bukan read-modify-write.
+        
+        Returns:
+            (report, created). created=False jika idempotency_key sudah pernah dipakai
+            (retry bersamaan yang kalah di unique index) dan laporan asli dikembalikan.
         """
         logger.info(f"📝 Starting P2H submission for vehicle_id: {submission.vehicle_id}, user: {user.full_name}")
         
@@ -163,93 +287,406 @@ class P2HService:
         
         # 2. Ambil Waktu Operasional
         current_time = get_current_time()
+        current_date = P2HService.get_operational_date(vehicle)
         
-        # Tentukan tanggal operasional berdasarkan tipe shift
-        if vehicle.shift_type == ShiftType.NON_SHIFT:
-            current_date = get_current_date_non_shift()  # Reset jam 00:00
-        else:
-            current_date = get_current_date_shift()  # Reset jam 05:00
-        
-        # Tentukan shift number berdasarkan tipe kendaraan dan submission
         # submission.shift_number adalah shift yang dipilih user dari dropdown
-        if vehicle.shift_type == ShiftType.NON_SHIFT:
-            shift_number = 1  # Non-shift selalu shift 1
-        elif vehicle.shift_type == ShiftType.LONG_SHIFT:
-            shift_number = submission.shift_number or get_long_shift_number(current_time)
-        else:  # SHIFT
-            shift_number = submission.shift_number or get_shift_number(current_time)
-        
-        # 3. Cek Quota/Izin Submit dengan validasi shift yang dipilih
-        can_submit, message = P2HService.can_submit_p2h(db, vehicle, shift_number)
+        shift_number = P2HService.resolve_shift_number(vehicle, submission.shift_number, current_time)
+        
+        # 3. Validasi jam submit vs shift yang dipilih
+        # Kuota TIDAK dicek di sini: klaim shift dilakukan secara atomik di langkah 6
+        can_submit, message = P2HService.check_shift_window(vehicle, shift_number, current_time)
         if not can_submit:
             raise ValueError(message)
         
+        # Item checklist divalidasi di memori sebelum flush (bukan lewat FK error saat commit)
+        is_valid, message = P2HService.validate_checklist_items(db, vehicle, submission.details)
+        if not is_valid:
+            raise ValueError(message)
+        
         # 4. Hitung Status Keseluruhan
         overall_status = P2HService.calculate_overall_status(submission.details)
         logger.info(f"📊 Overall status calculated: {overall_status}")
         
         # 5. Simpan Header Laporan
+        # Semua langkah 5-7 berada dalam SATU transaksi, commit hanya sekali di akhir
         report = P2HReport(
+            id=uuid.uuid4(),
             vehicle_id=vehicle.id,
             user_id=user.id,
             shift_number=shift_number,
             overall_status=overall_status,
             submission_date=current_date,
-            submission_time=current_time
+            submission_time=current_time,
+            idempotency_key=idempotency_key
         )
         db.add(report)
-        db.flush() # Ambil ID report untuk detail
+        try:
+            db.flush() # Header harus ada sebelum klaim tracker & detail (FK report_id)
+        except IntegrityError:
+            db.rollback()
+            # Retry bersamaan dengan key yang sama: kembalikan laporan yang sudah tersimpan
+            existing = P2HService.get_report_by_idempotency_key(db, user, idempotency_key) if idempotency_key else None
+            if existing is None:
+                raise
+            return existing, False
         
         logger.info(f"💾 P2H Report created with ID: {report.id}")
         
-        # 6. Simpan Detail Pemeriksaan
-        for d in submission.details:
-            detail = P2HDetail(
-                report_id=report.id,
-                checklist_item_id=d.checklist_item_id,
-                status=d.status,
-                keterangan=d.keterangan
-            )
-            db.add(detail)
-        
-        # 7. Update Daily Tracker
-        tracker = P2HService.get_or_create_daily_tracker(db, vehicle, current_date)
-        tracker.submission_count += 1
-        
-        if shift_number == 1 or vehicle.shift_type == ShiftType.NON_SHIFT:
-            tracker.shift_1_done = True
-            tracker.shift_1_report_id = report.id
-        elif shift_number == 2:
-            tracker.shift_2_done = True
-            tracker.shift_2_report_id = report.id
-        elif shift_number == 3:
-            tracker.shift_3_done = True
-            tracker.shift_3_report_id = report.id
+        # 6. Klaim shift di Daily Tracker (INSERT ... ON CONFLICT ... WHERE NOT done)
+        # Dua submit bersamaan untuk unit & shift yang sama: hanya satu yang mendapat baris
+        slot = P2HService.get_tracker_slot(vehicle, shift_number)
+        claimed = p2h_repository.claim_tracker_shift(db, vehicle.id, current_date, slot, report.id)
+        if not claimed:
+            db.rollback()
+            raise ValueError(P2HService.get_quota_message(vehicle, slot))
         
-        db.commit()
-        db.refresh(report)
+        # 7. Simpan Detail Pemeriksaan (bulk insert, satu statement)
+        db.execute(insert(P2HDetail), P2HService.build_detail_rows(report.id, submission.details))
         
-        # 8. Notifikasi Telegram (Hanya jika bermasalah)
-        logger.info(f"🔔 Checking if telegram notification needed - Status: {overall_status}")
+        # 8. Outbox Notifikasi Telegram (Hanya jika bermasalah)
+        # Ditulis di transaksi yang sama; pengiriman dilakukan NotificationDispatcher
         if overall_status in [InspectionStatus.ABNORMAL, InspectionStatus.WARNING]:
-            try:
-                logger.info(f"📤 Sending telegram notification for report {report.id}")
-                notification = await telegram_service.send_p2h_notification(
-                    db, vehicle, report, overall_status
-                )
-                if notification and notification.is_sent:
-                    logger.info(f"✅ Telegram notification sent successfully")
-                else:
-                    logger.warning(f"⚠️ Telegram notification failed to send")
-            except Exception as e:
-                logger.error(f"❌ Telegram alert failed: {str(e)}", exc_info=True)
-        else:
-            logger.info(f"ℹ️ No telegram notification needed - Status is NORMAL")
+            P2HService.enqueue_p2h_notification(db, vehicle.id, report.id, overall_status)
+        
+        # 9. Agregat harian dashboard (p2h_daily_stats) di transaksi yang sama
+        daily_stats_repository.apply(
+            db, [daily_stats_repository.stat_key(report, vehicle.vehicle_type, user.kategori_pengguna)]
+        )
+        # Payload event live dashboard disusun sebelum commit (atribut ORM di-expire setelahnya)
+        live_event = P2HService.build_live_event(report, vehicle, user.kategori_pengguna)
+        
+        try:
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        p2h_status_cache.record_submit(vehicle.id, current_date, shift_number, slot)
+        dashboard_cache.bump()
+        live_events.publish("p2h_submitted", live_event)
+        
+        if overall_status in [InspectionStatus.ABNORMAL, InspectionStatus.WARNING]:
+            logger.info(f"📮 Telegram notification queued for report {report.id}")
+            notification_dispatcher.wake()
+        
+        # Muat ulang laporan beserta relasinya dalam satu query (tanpa lazy load per detail)
+        report = p2h_repository.get_report_with_details(db, report.id)
+        
+        return report, True
+    
+    @staticmethod
+    def build_detail_rows(report_id: UUID, details: List[P2HDetailSubmit]) -> List[dict]:
+        """Baris parameter untuk bulk insert P2HDetail"""
+        return [
+            {
+                "report_id": report_id,
+                "checklist_item_id": d.checklist_item_id,
+                "status": d.status,
+                "keterangan": d.keterangan
+            }
+            for d in details
+        ]
+    
+    @staticmethod
+    def validate_captured_at(captured_at: datetime, now: datetime) -> Tuple[bool, str]:
+        """
+        Validasi waktu pemeriksaan laporan offline: tidak boleh di masa depan
+        (di luar toleransi jam perangkat) dan tidak boleh lebih lama dari batas offline.
+        """
+        if captured_at > now + timedelta(minutes=P2HSettings.CLOCK_SKEW_MINUTES):
+            return False, "Waktu pemeriksaan berada di masa depan, periksa jam perangkat"
+        if captured_at < now - timedelta(days=P2HSettings.MAX_OFFLINE_DAYS):
+            return False, f"Laporan offline lebih dari {P2HSettings.MAX_OFFLINE_DAYS} hari tidak dapat disubmit"
+        return True, "OK"
+    
+    @staticmethod
+    async def submit_p2h_batch(
+        db: Session,
+        user: User,
+        items: List[P2HBatchItemSubmit]
+    ) -> List[dict]:
+        """
+        Submit beberapa laporan P2H yang tertunda di perangkat (offline) sekaligus.
+        
+        Setiap item divalidasi terhadap aturan shift pada WAKTU PEMERIKSAAN (captured_at),
+        bukan waktu upload: tanggal operasional, jendela jam shift, dan kuota tracker
+        dihitung dari captured_at. Semua item yang lolos ditulis dalam SATU transaksi:
+        - kendaraan & idempotency key dibaca dengan satu query masing-masing
+        - header laporan di-insert sekaligus, detail seluruh laporan dalam satu bulk insert
+        - kuota diklaim per item dengan upsert atomik; item yang kalah dibatalkan saja
         
+        Item yang gagal validasi tidak menggagalkan item lain.
+        
+        Returns:
+            Hasil per item (urutan sama dengan input):
+            {index, status: created|replayed|rejected, report_id, message}
+        """
+        logger.info(f"📦 Starting P2H batch submission: {len(items)} item, user: {user.full_name}")
+        
+        results: List[Optional[dict]] = [None] * len(items)
+        
+        def reject(index: int, message: str):
+            results[index] = {"index": index, "status": "rejected", "report_id": None, "message": message}
+        
+        # 1. Replay: item dengan client_submission_id yang sudah tersimpan
+        keys = {str(item.client_submission_id) for item in items if item.client_submission_id}
+        existing = {}
+        if keys:
+            rows = db.query(P2HReport.id, P2HReport.user_id, P2HReport.idempotency_key).filter(
+                P2HReport.idempotency_key.in_(keys)
+            ).all()
+            existing = {row.idempotency_key: row for row in rows}
+        
+        # 2. Semua kendaraan dalam satu query
+        vehicle_ids = {item.vehicle_id for item in items}
+        vehicles = {
+            v.id: v for v in db.query(Vehicle).filter(Vehicle.id.in_(vehicle_ids)).all()
+        }
+        
+        # 3. Validasi per item di memori (waktu, shift, duplikat dalam batch)
+        now = get_current_datetime()
+        accepted = []  # (index, item, vehicle, report)
+        seen_keys = set()
+        seen_slots = set()
+        for index, item in enumerate(items):
+            key = str(item.client_submission_id) if item.client_submission_id else None
+            if key and key in existing:
+                row = existing[key]
+                if row.user_id != user.id:
+                    reject(index, "client_submission_id sudah digunakan untuk laporan lain")
+                else:
+                    results[index] = {
+                        "index": index, "status": "replayed", "report_id": str(row.id),
+                        "message": "Laporan P2H sudah diterima sebelumnya"
+                    }
+                continue
+            if key and key in seen_keys:
+                reject(index, "client_submission_id duplikat di dalam batch")
+                continue
+            
+            vehicle = vehicles.get(item.vehicle_id)
+            if not vehicle:
+                reject(index, "Kendaraan tidak ditemukan")
+                continue
+            if not vehicle.is_active:
+                reject(index, "Kendaraan sedang dalam status non-aktif")
+                continue
+            
+            captured_at = to_local_datetime(item.captured_at)
+            is_valid, message = P2HService.validate_captured_at(captured_at, now)
+            if not is_valid:
+                reject(index, message)
+                continue
+            
+            captured_time = captured_at.time()
+            is_valid, message = validate_shift_time(item.shift_number, captured_time)
+            if not is_valid:
+                reject(index, message)
+                continue
+            
+            shift_number = P2HService.resolve_shift_number(vehicle, item.shift_number, captured_time)
+            can_submit, message = P2HService.check_shift_window(vehicle, shift_number, captured_time)
+            if not can_submit:
+                reject(index, message)
+                continue
+            
+            is_valid, message = P2HService.validate_checklist_items(db, vehicle, item.details)
+            if not is_valid:
+                reject(index, message)
+                continue
+            
+            operational_date = P2HService.get_operational_date(vehicle, captured_at)
+            slot = P2HService.get_tracker_slot(vehicle, shift_number)
+            if (vehicle.id, operational_date, slot) in seen_slots:
+                reject(index, P2HService.get_quota_message(vehicle, slot))
+                continue
+            
+            if key:
+                seen_keys.add(key)
+            seen_slots.add((vehicle.id, operational_date, slot))
+            report = P2HReport(
+                id=uuid.uuid4(),
+                vehicle_id=vehicle.id,
+                user_id=user.id,
+                shift_number=shift_number,
+                overall_status=P2HService.calculate_overall_status(item.details),
+                submission_date=operational_date,
+                submission_time=captured_time,
+                idempotency_key=key
+            )
+            accepted.append((index, item, vehicle, report))
+        
+        if not accepted:
+            return results
+        
+        # 4. Header laporan sekaligus (satu flush = insert multi-row)
+        db.add_all([report for _, _, _, report in accepted])
+        try:
+            db.flush()
+        except IntegrityError:
+            db.rollback()
+            # client_submission_id sedang disubmit request lain: retry batch akan di-replay
+            raise ValueError("Sebagian laporan sedang diproses oleh request lain, silakan kirim ulang batch")
+        
+        # 5. Klaim kuota shift per item (atomik); laporan yang kalah dihapus lagi
+        created = []
+        lost_report_ids = []
+        for index, item, vehicle, report in accepted:
+            slot = P2HService.get_tracker_slot(vehicle, report.shift_number)
+            claimed = p2h_repository.claim_tracker_shift(
+                db, vehicle.id, report.submission_date, slot, report.id
+            )
+            if claimed:
+                created.append((index, item, vehicle, report))
+            else:
+                lost_report_ids.append(report.id)
+                db.expunge(report)
+                reject(index, P2HService.get_quota_message(vehicle, slot))
+        
+        if lost_report_ids:
+            db.query(P2HReport).filter(P2HReport.id.in_(lost_report_ids)).delete(synchronize_session=False)
+        
+        # 6. Detail seluruh laporan dalam satu bulk insert + outbox notifikasi
+        has_alert = False
+        if created:
+            detail_rows = []
+            for _, item, vehicle, report in created:
+                detail_rows.extend(P2HService.build_detail_rows(report.id, item.details))
+                if report.overall_status in [InspectionStatus.ABNORMAL, InspectionStatus.WARNING]:
+                    P2HService.enqueue_p2h_notification(db, vehicle.id, report.id, report.overall_status)
+                    has_alert = True
+            db.execute(insert(P2HDetail), detail_rows)
+            daily_stats_repository.apply(db, [
+                daily_stats_repository.stat_key(report, vehicle.vehicle_type, user.kategori_pengguna)
+                for _, _, vehicle, report in created
+            ])
+        
+        # Hasil disusun sebelum commit (atribut ORM di-expire setelah commit)
+        cache_updates = []
+        created_events = []
+        for index, _, vehicle, report in created:
+            results[index] = {
+                "index": index, "status": "created", "report_id": str(report.id),
+                "message": "Laporan P2H berhasil disubmit"
+            }
+            cache_updates.append((
+                vehicle.id, report.submission_date, report.shift_number,
+                P2HService.get_tracker_slot(vehicle, report.shift_number)
+            ))
+            created_events.append(P2HService.build_live_event(report, vehicle, user.kategori_pengguna))
+        
+        try:
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        for vehicle_id, submission_date, shift_number, slot in cache_updates:
+            p2h_status_cache.record_submit(vehicle_id, submission_date, shift_number, slot)
+        if cache_updates:
+            dashboard_cache.bump()
+        for live_event in created_events:
+            live_events.publish("p2h_submitted", live_event)
+        
+        if has_alert:
+            notification_dispatcher.wake()
+        
+        logger.info(f"✅ P2H batch: {len(created)} created, {len(lost_report_ids)} lost quota, {len(items)} total")
+        return results
+    
+    @staticmethod
+    def get_report_by_idempotency_key(db: Session, user: User, idempotency_key: str) -> Optional[P2HReport]:
+        """
+        Cari laporan yang sudah disubmit dengan Idempotency-Key yang sama.
+        Key milik user lain ditolak agar laporan orang lain tidak bocor.
+        """
+        report = p2h_repository.get_by_idempotency_key(db, idempotency_key)
+        if report is not None and report.user_id != user.id:
+            raise ValueError("Idempotency-Key sudah digunakan untuk laporan lain")
         return report
 
     @staticmethod
-    def get_vehicle_p2h_status(db: Session, vehicle_id: UUID) -> dict:
+    def build_live_event(report: P2HReport, vehicle: Vehicle, kategori: UserKategori) -> dict:
+        """
+        Payload ringkas event live dashboard (/dashboard/stream) untuk satu laporan.
+        Berisi dimensi filter dashboard (tanggal, tipe, kategori, shift, status) agar
+        client bisa memperbarui counter tanpa query ulang.
+        """
+        return {
+            "report_id": str(report.id),
+            "vehicle_id": str(vehicle.id),
+            "no_lambung": vehicle.no_lambung,
+            "vehicle_type": VehicleType(vehicle.vehicle_type).value,
+            "kategori": UserKategori(kategori).value,
+            "shift_number": report.shift_number,
+            "status": InspectionStatus(report.overall_status).value,
+            "submission_date": report.submission_date.isoformat(),
+            "submission_time": report.submission_time.isoformat() if report.submission_time else None
+        }
+    
+    @staticmethod
+    def enqueue_p2h_notification(
+        db: Session,
+        vehicle_id: UUID,
+        report_id: UUID,
+        status: InspectionStatus
+    ) -> TelegramNotification:
+        """
+        Tulis baris outbox notifikasi P2H (tanpa commit).
+        Pesan dirender oleh dispatcher dari laporan yang sudah tersimpan.
+        """
+        notification = TelegramNotification(
+            notification_type=(
+                NotificationType.P2H_ABNORMAL
+                if status == InspectionStatus.ABNORMAL
+                else NotificationType.P2H_WARNING
+            ),
+            vehicle_id=vehicle_id,
+            report_id=report_id,
+            message=None,
+            is_sent=False
+        )
+        db.add(notification)
+        return notification
+
+    @staticmethod
+    def get_shift_state(
+        db: Session,
+        vehicle: Union[Vehicle, VehicleSnapshot],
+        now: datetime
+    ) -> Tuple[date, ShiftState]:
+        """
+        Status shift unit pada tanggal operasional saat ini.
+        Dibaca dari p2h_status_cache; jika belum ada/kedaluwarsa, dimuat dari
+        laporan aktif + tracker (2 query) lalu disimpan sampai batas reset berikutnya.
+        """
+        current_date = P2HService.get_operational_date(vehicle, now)
+        state = p2h_status_cache.get_state(vehicle.id, current_date, now)
+        if state is not None:
+            return current_date, state
+        
+        version = p2h_status_cache.version(vehicle.id)
+        state = ShiftState(expires_at=shift_clock.next_reset(vehicle.shift_type, now))
+        state.report_counts.update(
+            p2h_repository.count_reports_by_shift(db, vehicle.id, current_date)
+        )
+        tracker = p2h_repository.get_daily_tracker(db, vehicle.id, current_date)
+        if tracker:
+            state.tracker_done = {
+                1: bool(tracker.shift_1_done),
+                2: bool(tracker.shift_2_done),
+                3: bool(tracker.shift_3_done)
+            }
+        p2h_status_cache.put_state(vehicle.id, current_date, state, version, now)
+        
+        logger.info(
+            f"🔍 [P2H Status] Loaded {vehicle.no_lambung} for {current_date}: "
+            f"reports={dict(state.report_counts)}, tracker={state.tracker_done}"
+        )
+        return current_date, state
+
+    @staticmethod
+    def get_vehicle_p2h_status(db: Session, vehicle_id: UUID, vehicle: Optional[Vehicle] = None) -> dict:
         """
         Cek status warna (Merah/Hijau/Kuning) untuk unit di dashboard/scan.
         
@@ -257,81 +694,35 @@ class P2HService:
         - SHIFT (Kuning): Hijau jika semua shift done, Kuning jika sebagian, Merah jika kosong
         - NON_SHIFT (Hijau/Biru): Hijau jika done, Merah jika belum
         - LONG_SHIFT: Hijau jika kedua shift done, Kuning jika 1 done, Merah jika kosong
+        
+        Kirim `vehicle` jika sudah di-load (jalur scan) agar tidak query ulang.
+        Status shift diambil dari p2h_status_cache (lihat get_shift_state).
         """
-        vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
-        if not vehicle:
-            raise ValueError("Unit tidak terdaftar")
+        if vehicle is not None:
+            snapshot = p2h_status_cache.put_vehicle(vehicle)
+        else:
+            snapshot = p2h_status_cache.get_vehicle(vehicle_id)
+            if snapshot is None:
+                vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
+                if not vehicle:
+                    raise ValueError("Unit tidak terdaftar")
+                snapshot = p2h_status_cache.put_vehicle(vehicle)
         
-        current_time = get_current_time()
+        now = get_current_datetime()
+        current_time = now.time()
+        _, state = P2HService.get_shift_state(db, snapshot, now)
         
-        # Gunakan tanggal operasional yang sesuai dengan tipe shift
-        if vehicle.shift_type == ShiftType.NON_SHIFT:
-            current_date = get_current_date_non_shift()  # Reset jam 00:00
-        else:
-            current_date = get_current_date_shift()  # Reset jam 05:00
-        
-        logger.info(f"🔍 [P2H Service Debug] Vehicle: {vehicle.no_lambung}, shift_type: {vehicle.shift_type}")
-        logger.info(f"🔍 [P2H Service Debug] current_date (operational): {current_date}")
-        logger.info(f"🔍 [P2H Service Debug] current_time: {current_time}")
-        
-        # Cek LANGSUNG dari P2HReport (lebih akurat daripada tracker)
-        from app.models.p2h import P2HReport
-        today_reports = db.query(P2HReport).filter(
-            and_(
-                P2HReport.vehicle_id == vehicle_id,
-                P2HReport.submission_date == current_date,
-                P2HReport.is_deleted == False  # Exclude soft-deleted reports
-            )
-        ).all()
-        
-        logger.info(f"🔍 [P2H Service Debug] Found {len(today_reports)} P2H reports for today")
-        for report in today_reports:
-            logger.info(f"🔍 [P2H Service Debug] Report: submission_date={report.submission_date}, shift={report.shift_number}")
-        
-        # Jika tidak ada report hari ini, cek semua report untuk vehicle ini (untuk debugging)
-        if not today_reports:
-            all_reports = db.query(P2HReport).filter(
-                and_(
-                    P2HReport.vehicle_id == vehicle_id,
-                    P2HReport.is_deleted == False
-                )
-            ).order_by(P2HReport.submission_date.desc()).limit(5).all()
-            
-            logger.warning(f"⚠️ [P2H Service Debug] No reports found for current_date={current_date}")
-            logger.warning(f"⚠️ [P2H Service Debug] Recent reports for this vehicle:")
-            for r in all_reports:
-                logger.warning(f"   - submission_date={r.submission_date} (type: {type(r.submission_date)}), shift={r.shift_number}")
-        
-        # Tentukan shift yang sudah done dari reports
-        shifts_done = {1: False, 2: False, 3: False}
-        for report in today_reports:
-            if report.shift_number in [1, 2, 3]:
-                shifts_done[report.shift_number] = True
-        
-        # Jika data dari reports tidak ada, fallback ke tracker
-        if not today_reports:
-            tracker = db.query(P2HDailyTracker).filter(
-                and_(
-                    P2HDailyTracker.vehicle_id == vehicle_id,
-                    P2HDailyTracker.date == current_date
-                )
-            ).first()
-            
-            if tracker:
-                shifts_done = {
-                    1: tracker.shift_1_done,
-                    2: tracker.shift_2_done,
-                    3: tracker.shift_3_done
-                }
+        # Tentukan shift yang sudah done (laporan aktif, fallback ke tracker)
+        shifts_done = state.shifts_done
         
         # Tentukan shift number dan status warna
-        if vehicle.shift_type == ShiftType.NON_SHIFT:
+        if snapshot.shift_type == ShiftType.NON_SHIFT:
             shift_number = 1
             p2h_done = shifts_done[1]
             color = "green" if p2h_done else "red"
             shifts_completed = [1] if p2h_done else []
             
-        elif vehicle.shift_type == ShiftType.LONG_SHIFT:
+        elif snapshot.shift_type == ShiftType.LONG_SHIFT:
             shift_number = get_long_shift_number(current_time)
             shift_1_done = shifts_done[1]
             shift_2_done = shifts_done[2]
@@ -360,13 +751,175 @@ class P2HService:
             shifts_completed = [s for s in [1, 2, 3] if shifts_done[s]]
         
         return {
-            "no_lambung": vehicle.no_lambung,
-            "warna_no_lambung": vehicle.warna_no_lambung,
-            "shift_type": vehicle.shift_type.value,
+            "no_lambung": snapshot.no_lambung,
+            "warna_no_lambung": snapshot.warna_no_lambung,
+            "shift_type": snapshot.shift_type.value,
             "current_shift": shift_number,
             "status_p2h": "Lengkap" if color == "green" else "Belum Lengkap",
             "color_code": color,
             "shifts_completed": shifts_completed
         }
+    
+    @staticmethod
+    def get_fleet_p2h_status(db: Session, vehicle_ids: Optional[List[UUID]] = None) -> List[dict]:
+        """
+        Status warna P2H untuk banyak unit sekaligus (sidebar admin, pos gate).
+        
+        Satu query GROUP BY vehicle_id: shifts_completed & color_code dihitung di
+        database dengan aturan yang sama seperti get_vehicle_p2h_status, masing-masing
+        unit memakai tanggal operasionalnya sendiri (non-shift 00:00, shift 05:00).
+        """
+        now = get_current_datetime()
+        current_time = now.time()
+        rows = p2h_repository.get_fleet_status_rows(
+            db,
+            shift_date=get_current_date_shift(now),
+            non_shift_date=get_current_date_non_shift(now),
+            vehicle_ids=vehicle_ids
+        )
+        
+        # current_shift hanya bergantung pada tipe shift, dihitung sekali per tipe
+        current_shift = {
+            ShiftType.NON_SHIFT: 1,
+            ShiftType.LONG_SHIFT: get_long_shift_number(current_time),
+            ShiftType.SHIFT: get_shift_number(current_time),
+        }
+        
+        return [
+            {
+                "vehicle_id": str(row.id),
+                "no_lambung": row.no_lambung,
+                "plat_nomor": row.plat_nomor,
+                "warna_no_lambung": row.warna_no_lambung,
+                "shift_type": row.shift_type.value,
+                "current_shift": current_shift[row.shift_type],
+                "status_p2h": "Lengkap" if row.color_code == "green" else "Belum Lengkap",
+                "color_code": row.color_code,
+                "shifts_completed": row.shifts_completed or []
+            }
+            for row in rows
+        ]
+    
+    @staticmethod
+    def build_report_filters(
+        kategori: Optional[str] = None,
+        report_status: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        search: Optional[str] = None,
+        vehicle_id: Optional[UUID] = None,
+        user_id: Optional[UUID] = None,
+        vehicle_type: Optional[str] = None
+    ) -> List:
+        """
+        Validasi filter daftar/export laporan P2H lalu bangun klausa WHERE-nya.
+        Dipakai /p2h/reports dan /export/p2h-reports agar hasil filter selalu sama.
+        
+        Raises ValueError jika nilai filter tidak valid.
+        """
+        kategori_value = None
+        if kategori:
+            kategori_upper = kategori.upper()
+            if kategori_upper == 'PT':
+                kategori_upper = 'IMM'
+            try:
+                kategori_value = UserKategori(kategori_upper)
+            except ValueError:
+                raise ValueError(f"Invalid kategori: {kategori}")
+        
+        status_value = None
+        if report_status:
+            try:
+                status_value = InspectionStatus(report_status.lower())
+            except ValueError:
+                raise ValueError(f"Invalid status: {report_status}")
+        
+        start = end = None
+        if start_date:
+            try:
+                start = datetime.strptime(start_date, "%Y-%m-%d").date()
+            except ValueError:
+                raise ValueError("Format start_date tidak valid. Gunakan YYYY-MM-DD")
+        if end_date:
+            try:
+                end = datetime.strptime(end_date, "%Y-%m-%d").date()
+            except ValueError:
+                raise ValueError("Format end_date tidak valid. Gunakan YYYY-MM-DD")
+        
+        vehicle_type_value = None
+        if vehicle_type:
+            try:
+                vehicle_type_value = VehicleType(vehicle_type)
+            except ValueError:
+                raise ValueError(f"Invalid vehicle_type: {vehicle_type}")
+        
+        return p2h_repository.report_filter_clauses(
+            kategori=kategori_value,
+            status=status_value,
+            start_date=start,
+            end_date=end,
+            search=search.strip() if search else None,
+            vehicle_id=vehicle_id,
+            user_id=user_id,
+            vehicle_type=vehicle_type_value
+        )
+    
+    @staticmethod
+    def get_reports_page(
+        db: Session,
+        page_size: int,
+        cursor: Optional[str] = None,
+        summary: bool = False,
+        filters: Optional[List] = None
+    ) -> Tuple[List, Optional[str]]:
+        """
+        Satu halaman laporan P2H (terbaru dulu) dengan keyset pagination.
+        
+        summary=True mengembalikan baris proyeksi ringkas (tanpa details),
+        selain itu objek P2HReport lengkap.
+        
+        Returns: (reports, next_cursor). next_cursor None jika sudah halaman terakhir.
+        Raises ValueError jika cursor tidak valid.
+        """
+        after = decode_report_cursor(cursor) if cursor else None
+        if summary:
+            reports = p2h_repository.get_report_summaries(db, page_size + 1, after=after, filters=filters)
+        else:
+            reports = p2h_repository.get_reports_page(db, page_size + 1, after=after, filters=filters)
+        
+        if len(reports) <= page_size:
+            return reports, None
+        
+        reports = reports[:page_size]
+        last = reports[-1]
+        return reports, encode_cursor(last.submission_date, last.submission_time, last.id)
+    
+    @staticmethod
+    def soft_delete_report(db: Session, report: P2HReport) -> P2HReport:
+        """
+        Soft delete laporan P2H lalu perbarui status cache unit, cache dashboard dan
+        kirim event p2h_deleted ke live dashboard.
+        Slot tracker tidak dilepas (kuota shift tetap terpakai).
+        
+        Flag dihapus lewat UPDATE ... WHERE is_deleted = false: hanya request yang
+        benar-benar menghapus yang mengurangi agregat harian (delete ganda tidak
+        mengurangi dua kali).
+        """
+        vehicle_id, submission_date, shift_number = report.vehicle_id, report.submission_date, report.shift_number
+        key = daily_stats_repository.stat_key(report, report.vehicle.vehicle_type, report.user.kategori_pengguna)
+        live_event = P2HService.build_live_event(report, report.vehicle, report.user.kategori_pengguna)
+        deleted = db.query(P2HReport).filter(
+            P2HReport.id == report.id,
+            P2HReport.is_deleted == False
+        ).update({"is_deleted": True, "deleted_at": datetime.utcnow()}, synchronize_session="evaluate")
+        if deleted:
+            daily_stats_repository.apply(db, [key], delta=-1)
+        db.commit()
+        
+        p2h_status_cache.record_delete(vehicle_id, submission_date, shift_number)
+        if deleted:
+            dashboard_cache.bump()
+            live_events.publish("p2h_deleted", live_event)
+        return report
 
 p2h_service = P2HService()
@@ -0,0 +1,157 @@
+"""
+P2H Status Cache - Cache in-process status P2H unit per (vehicle, tanggal operasional)
+
+Dipakai oleh jalur scan QR/nomor lambung (/vehicles/lambung/{no_lambung}) dan
+/p2h/vehicle/{id}/status. Entry diperbarui langsung (in place) oleh P2HService
+setelah submit/batch commit dan oleh soft delete laporan, sehingga tidak perlu
+query ulang. Entry kedaluwarsa pada batas reset tanggal operasional
+(05:00 untuk shift/long shift, 00:00 untuk non-shift).
+
+Deployment memakai satu proses uvicorn, sehingga cache per proses konsisten
+dengan semua penulisan lewat API. Perubahan langsung di database (script/SQL
+manual) baru terlihat setelah batas reset atau restart.
+"""
+
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from app.models.vehicle import ShiftType
+
+
+@dataclass(frozen=True)
+class VehicleSnapshot:
+    """Field kendaraan yang dibutuhkan untuk status P2H"""
+    id: UUID
+    no_lambung: Optional[str]
+    warna_no_lambung: Optional[str]
+    shift_type: ShiftType
+
+
+@dataclass
+class ShiftState:
+    """Status shift unit pada satu tanggal operasional"""
+    expires_at: datetime
+    # Jumlah laporan aktif (belum soft delete) per shift_number
+    report_counts: Counter = field(default_factory=Counter)
+    # Slot yang sudah diklaim di p2h_daily_tracker (kuota submit)
+    tracker_done: Dict[int, bool] = field(default_factory=lambda: {1: False, 2: False, 3: False})
+
+    @property
+    def shifts_done(self) -> Dict[int, bool]:
+        """
+        Shift yang sudah selesai untuk warna status: dari laporan aktif,
+        fallback ke tracker jika tidak ada laporan sama sekali.
+        """
+        if sum(self.report_counts.values()) > 0:
+            return {s: self.report_counts.get(s, 0) > 0 for s in (1, 2, 3)}
+        return dict(self.tracker_done)
+
+
+class P2HStatusCache:
+    """Cache status P2H per (vehicle_id, tanggal operasional)"""
+
+    MAX_ENTRIES = 5000  # Prune entry kedaluwarsa jika melewati batas ini
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vehicles: Dict[UUID, VehicleSnapshot] = {}
+        self._states: Dict[Tuple[UUID, date], ShiftState] = {}
+        # Naik setiap kali state unit berubah; mencegah hasil load lama menimpa update terbaru
+        self._versions: Counter = Counter()
+        self._epoch = 0  # Naik setiap clear()
+
+    # --- Kendaraan ---
+
+    def get_vehicle(self, vehicle_id: UUID) -> Optional[VehicleSnapshot]:
+        return self._vehicles.get(vehicle_id)
+
+    def put_vehicle(self, vehicle) -> VehicleSnapshot:
+        snapshot = VehicleSnapshot(
+            id=vehicle.id,
+            no_lambung=vehicle.no_lambung,
+            warna_no_lambung=vehicle.warna_no_lambung,
+            shift_type=vehicle.shift_type
+        )
+        with self._lock:
+            self._vehicles[vehicle.id] = snapshot
+        return snapshot
+
+    def invalidate_vehicle(self, vehicle_id: UUID) -> None:
+        """Dipanggil setelah data kendaraan diubah (shift_type/no_lambung/warna)"""
+        with self._lock:
+            self._vehicles.pop(vehicle_id, None)
+            for key in [k for k in self._states if k[0] == vehicle_id]:
+                del self._states[key]
+            self._versions[vehicle_id] += 1
+
+    # --- State shift ---
+
+    def version(self, vehicle_id: UUID) -> Tuple[int, int]:
+        return self._epoch, self._versions[vehicle_id]
+
+    def get_state(self, vehicle_id: UUID, operational_date: date, now: datetime) -> Optional[ShiftState]:
+        state = self._states.get((vehicle_id, operational_date))
+        if state is None or state.expires_at <= now:
+            return None
+        return state
+
+    def put_state(
+        self,
+        vehicle_id: UUID,
+        operational_date: date,
+        state: ShiftState,
+        version: Tuple[int, int],
+        now: datetime
+    ) -> None:
+        """
+        Simpan hasil load dari database. Diabaikan jika ada submit/delete
+        untuk unit ini setelah load dimulai (version berubah).
+        """
+        with self._lock:
+            if (self._epoch, self._versions[vehicle_id]) != version:
+                return
+            if len(self._states) >= self.MAX_ENTRIES:
+                self._prune(now)
+            self._states[(vehicle_id, operational_date)] = state
+
+    def record_submit(self, vehicle_id: UUID, operational_date: date, shift_number: int, slot: int) -> None:
+        """Laporan baru sudah di-commit: tandai shift & slot tracker selesai"""
+        with self._lock:
+            self._versions[vehicle_id] += 1
+            state = self._states.get((vehicle_id, operational_date))
+            if state is None:
+                return
+            state.report_counts[shift_number] += 1
+            state.tracker_done[slot] = True
+
+    def record_delete(self, vehicle_id: UUID, operational_date: date, shift_number: int) -> None:
+        """
+        Laporan di-soft delete. Slot tracker tidak dilepas (kuota tetap terpakai),
+        sama seperti perilaku database.
+        """
+        with self._lock:
+            self._versions[vehicle_id] += 1
+            state = self._states.get((vehicle_id, operational_date))
+            if state is None:
+                return
+            if state.report_counts[shift_number] > 0:
+                state.report_counts[shift_number] -= 1
+
+    def clear(self) -> None:
+        """Kosongkan seluruh cache (misal setelah bulk upload kendaraan)"""
+        with self._lock:
+            self._vehicles.clear()
+            self._states.clear()
+            self._epoch += 1
+
+    def _prune(self, now: datetime) -> None:
+        for key in [k for k, s in self._states.items() if s.expires_at <= now]:
+            del self._states[key]
+
+
+# Global instance
+p2h_status_cache = P2HStatusCache()
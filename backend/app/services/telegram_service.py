@@ -131,32 +131,14 @@ class TelegramService:
             return False
         return await self.send_message_to_chat(self.default_chat_id, message, max_retries)
     
-    async def send_to_all_subscribers(self, db: Session, message: str) -> BroadcastResult:
-        """Kirim pesan ke semua subscriber aktif"""
-        chat_ids = self._get_active_subscribers(db)
-        
+    async def broadcast_to_chats(self, chat_ids: List[str], message: str) -> BroadcastResult:
+        """Kirim pesan ke daftar chat_id tertentu (tanpa akses database)"""
         result = BroadcastResult(total_subscribers=len(chat_ids))
         
-        if not chat_ids:
-            logger.warning("⚠️ No active subscribers to send message to")
-            return result
-        
-        logger.info(f"📤 Broadcasting message to {len(chat_ids)} subscribers")
-        
         for chat_id in chat_ids:
             success = await self.send_message_to_chat(chat_id, message)
             if success:
                 result.success_count += 1
-                # Update last_notified_at - wrapped in try-except to prevent crashes
-                try:
-                    from app.models.telegram_subscriber import TelegramSubscriber
-                    subscriber = db.query(TelegramSubscriber).filter(
-                        TelegramSubscriber.chat_id == chat_id
-                    ).first()
-                    if subscriber:
-                        subscriber.last_notified_at = datetime.utcnow()
-                except Exception as e:
-                    logger.warning(f"⚠️ Could not update last_notified_at for {chat_id}: {str(e)}")
             else:
                 result.failed_count += 1
                 result.failed_chat_ids.append(chat_id)
@@ -164,6 +146,23 @@ class TelegramService:
             # Small delay untuk menghindari rate limiting
             await asyncio.sleep(0.1)
         
+        return result
+    
+    async def send_to_all_subscribers(self, db: Session, message: str) -> BroadcastResult:
+        """Kirim pesan ke semua subscriber aktif"""
+        chat_ids = self._get_active_subscribers(db)
+        
+        if not chat_ids:
+            logger.warning("⚠️ No active subscribers to send message to")
+            return BroadcastResult()
+        
+        logger.info(f"📤 Broadcasting message to {len(chat_ids)} subscribers")
+        
+        result = await self.broadcast_to_chats(chat_ids, message)
+        self.mark_subscribers_notified(
+            db, [c for c in chat_ids if c not in result.failed_chat_ids]
+        )
+        
         try:
             db.commit()
         except Exception as e:
@@ -172,6 +171,18 @@ class TelegramService:
         logger.info(f"✅ Broadcast complete: {result.success_count}/{result.total_subscribers} successful")
         return result
     
+    def mark_subscribers_notified(self, db: Session, chat_ids: List[str]) -> None:
+        """Update last_notified_at untuk subscriber yang berhasil dikirimi (satu UPDATE, tanpa commit)"""
+        if not chat_ids:
+            return
+        try:
+            from app.models.telegram_subscriber import TelegramSubscriber
+            db.query(TelegramSubscriber).filter(
+                TelegramSubscriber.chat_id.in_(chat_ids)
+            ).update({"last_notified_at": datetime.utcnow()}, synchronize_session=False)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not update last_notified_at: {str(e)}")
+    
     async def broadcast_message(self, db: Session, message: str, parse_mode: str = "HTML") -> BroadcastResult:
         """Alias untuk send_to_all_subscribers dengan parse_mode"""
         return await self.send_to_all_subscribers(db, message)
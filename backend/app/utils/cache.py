@@ -0,0 +1,171 @@
+"""
+Cache in-process dengan version stamp.
+
+Data master yang jarang berubah (checklist, dll) disimpan per key bersama versi
+saat disimpan. Endpoint tulis memanggil bump() setelah commit, sehingga semua
+entry lama otomatis tidak dipakai lagi tanpa harus tahu key mana yang terdampak.
+Versi diawali token proses agar tetap unik setelah restart.
+
+Versi yang sama dipakai sebagai ETag (conditional GET) dan waktu bump terakhir
+sebagai Last-Modified, sehingga If-None-Match bisa dijawab 304 tanpa query.
+
+TTLVersionedCache menambahkan umur maksimum per entry dan satu loader per key
+(request bersamaan dengan filter yang sama menunggu hasil yang sama) untuk data
+yang juga bergantung pada hal di luar versi (tanggal hari ini, data kendaraan).
+"""
+
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Tuple
+
+from app.config import settings
+
+_BOOT_TOKEN = format(int(time.time()), "x")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+class VersionedCache:
+    """Cache key -> value yang berlaku untuk satu versi data"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._counter = itertools.count(1)
+        self._version = f"{_BOOT_TOKEN}.{next(self._counter)}"
+        self._modified_at = _now()
+        self._entries: Dict[Any, Tuple[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> str:
+        return self._version
+
+    @property
+    def modified_at(self) -> datetime:
+        """Waktu bump terakhir (UTC, presisi detik seperti header Last-Modified)"""
+        return self._modified_at
+
+    @property
+    def etag(self) -> str:
+        """ETag (tanpa tanda kutip) untuk versi saat ini"""
+        return self.etag_for(self._version)
+
+    def etag_for(self, version: str) -> str:
+        return f"{self.name}-{version}"
+
+    def bump(self) -> str:
+        """Naikkan versi (dipanggil setelah commit perubahan data)"""
+        with self._lock:
+            self._version = f"{_BOOT_TOKEN}.{next(self._counter)}"
+            # Naik minimal 1 detik agar If-Modified-Since tidak menganggap data sama
+            self._modified_at = max(_now(), self._modified_at + timedelta(seconds=1))
+            self._entries.clear()
+            return self._version
+
+    def get_or_set(self, key: Any, loader: Callable[[], Any]) -> Tuple[str, Any]:
+        """
+        Ambil value untuk key pada versi saat ini, atau muat dengan loader.
+        Returns: (version, value)
+        """
+        version = self._version
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            return entry
+
+        value = loader()
+        with self._lock:
+            # Jangan simpan hasil load jika versi berubah selama loader berjalan
+            if self._version == version:
+                self._entries[key] = (version, value)
+        return version, value
+
+
+class TTLVersionedCache(VersionedCache):
+    """VersionedCache dengan TTL per entry, batas jumlah entry, dan single-flight per key"""
+
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int = 256):
+        super().__init__(name)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._key_locks: Dict[Any, threading.Lock] = {}
+
+    def bump(self) -> str:
+        with self._lock:
+            self._key_locks.clear()
+        return super().bump()
+
+    def _fresh(self, key: Any, version: str):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version and entry[2] > time.monotonic():
+            return entry
+        return None
+
+    def _key_lock(self, key: Any) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _store(self, key: Any, version: str, value: Any) -> None:
+        now = time.monotonic()
+        with self._lock:
+            # Jangan simpan hasil load jika versi berubah selama loader berjalan
+            if self._version != version:
+                return
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                for stale in [k for k, e in self._entries.items() if e[2] <= now]:
+                    del self._entries[stale]
+                    self._key_locks.pop(stale, None)
+                while len(self._entries) >= self.max_entries:
+                    oldest = next(iter(self._entries))
+                    del self._entries[oldest]
+                    self._key_locks.pop(oldest, None)
+            self._entries[key] = (version, value, now + self.ttl_seconds)
+
+    def get_or_set(self, key: Any, loader: Callable[[], Any]) -> Tuple[str, Any]:
+        """
+        Ambil value untuk key pada versi saat ini dan belum kedaluwarsa, atau muat
+        dengan loader. Loader untuk key yang sama hanya berjalan sekali sekaligus.
+        Returns: (version, value)
+        """
+        entry = self._fresh(key, self._version)
+        if entry is not None:
+            return entry[0], entry[1]
+
+        with self._key_lock(key):
+            # Request lain mungkin sudah memuat key ini selama menunggu lock
+            version = self._version
+            entry = self._fresh(key, version)
+            if entry is not None:
+                return entry[0], entry[1]
+            value = loader()
+            self._store(key, version, value)
+            return version, value
+
+
+# Cache checklist_templates: di-bump oleh endpoint tambah/ubah/hapus checklist
+checklist_cache = VersionedCache("checklist")
+
+# Data master (dropdown): di-bump oleh endpoint tambah/ubah/hapus masing-masing
+companies_cache = VersionedCache("companies")
+departments_cache = VersionedCache("departments")
+positions_cache = VersionedCache("positions")
+work_statuses_cache = VersionedCache("work-statuses")
+
+# Tabel vehicle_types (/vehicle-types/active)
+vehicle_types_cache = VersionedCache("vehicle-types")
+
+# Tabel vehicles (/dashboard/vehicle-types): di-bump oleh semua endpoint tulis kendaraan
+vehicles_cache = VersionedCache("vehicles")
+
+# Hasil dashboard per kombinasi filter: di-bump setiap submit / soft delete laporan P2H
+dashboard_cache = TTLVersionedCache(
+    "dashboard",
+    ttl_seconds=settings.DASHBOARD_CACHE_TTL_SECONDS,
+    max_entries=settings.DASHBOARD_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,262 @@
+"""
+Middleware kompresi response (gzip / brotli).
+
+Response JSON list (/p2h/reports, /users limit 5000) dan export CSV bisa
+berukuran beberapa MB dan dikirim ke tablet lapangan lewat jaringan site yang
+terbatas. Middleware ASGI ini mengompres body jika:
+    - client mengirim Accept-Encoding yang didukung (br diutamakan jika modul
+      brotli terpasang, lalu gzip),
+    - Content-Type ada di allowlist (xlsx/pdf sudah terkompresi, tidak diulang),
+    - body minimal COMPRESSION_MIN_SIZE byte.
+
+Body dibuffer hanya sampai ambang ukuran tercapai. Response satu-potong
+dikompres utuh (Content-Length diperbarui); StreamingResponse dikompres per
+chunk dengan flush, sehingga export yang di-stream tetap di-stream.
+
+Setiap response dicatat di compression_stats per route (template path) untuk
+melihat byte yang dihemat.
+"""
+
+import logging
+import threading
+import zlib
+from typing import Dict, Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli opsional, fallback ke gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+class CompressionStats:
+    """Counter byte asli vs byte terkirim per route"""
+
+    def __init__(self):
+        self._routes: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, encoding: Optional[str], original: int, sent: int) -> None:
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {
+                    "responses": 0, "compressed": 0, "gzip": 0, "br": 0,
+                    "bytes_original": 0, "bytes_sent": 0,
+                }
+            entry["responses"] += 1
+            entry["bytes_original"] += original
+            entry["bytes_sent"] += sent
+            if encoding:
+                entry["compressed"] += 1
+                entry[encoding] += 1
+
+    def snapshot(self) -> list:
+        """Statistik per route, diurutkan dari byte terhemat terbesar"""
+        with self._lock:
+            rows = [{"route": route, **entry} for route, entry in self._routes.items()]
+        for row in rows:
+            row["bytes_saved"] = row["bytes_original"] - row["bytes_sent"]
+            row["ratio"] = round(row["bytes_sent"] / row["bytes_original"], 4) if row["bytes_original"] else None
+        return sorted(rows, key=lambda r: r["bytes_saved"], reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+# Global instance (dibaca endpoint /admin-tools/compression-stats)
+compression_stats = CompressionStats()
+
+
+def _gzip_compressor(level: int):
+    # wbits 31 = format gzip (header + trailer), bukan zlib mentah
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return (
+        lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH),
+        compressor.flush,
+    )
+
+
+def _brotli_compressor(quality: int):
+    compressor = brotli.Compressor(quality=quality)
+    return (
+        lambda chunk: compressor.process(chunk) + compressor.flush(),
+        compressor.finish,
+    )
+
+
+def choose_encoding(accept_encoding: str, brotli_enabled: bool) -> Optional[str]:
+    """Pilih 'br' atau 'gzip' dari header Accept-Encoding (q=0 berarti ditolak)"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+
+    if brotli_enabled and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """Kompresi gzip/brotli dengan ambang ukuran dan allowlist Content-Type"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        content_types: Iterable[str] = ("application/json",),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        stats: CompressionStats = compression_stats,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = frozenset(t.strip().lower() for t in content_types if t.strip())
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.stats = stats
+        if brotli is None:
+            logger.info("ℹ️ Modul brotli tidak terpasang, kompresi response hanya gzip")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), brotli is not None)
+        responder = _CompressionResponder(self, scope, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+    def compressor(self, encoding: str):
+        """(compress_chunk, finish) untuk satu response"""
+        if encoding == "br":
+            return _brotli_compressor(self.brotli_quality)
+        return _gzip_compressor(self.gzip_level)
+
+    def eligible(self, status: int, headers: Headers) -> bool:
+        """Response boleh dikompres (tanpa melihat ukuran body)"""
+        if status < 200 or status in (204, 304):
+            return False
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type in self.content_types
+
+
+class _CompressionResponder:
+    """State kompresi untuk satu request"""
+
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, send: Send, encoding: Optional[str]):
+        self.middleware = middleware
+        self.scope = scope
+        self._send = send
+        self.encoding = encoding
+        self.start: Optional[Message] = None
+        self.buffer = []
+        self.buffered = 0
+        self.mode = None  # None = masih buffer, "identity", atau "compress"
+        self.compress_chunk = self.finish = None
+        self.original = 0
+        self.sent = 0
+
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope.get("path", "")
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            if not self.middleware.eligible(message["status"], headers):
+                self.mode = "identity"
+                await self._send(message)
+            elif self.encoding is None:
+                self.mode = "identity"
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        self.original += len(body)
+
+        if self.mode == "identity":
+            self.sent += len(body)
+            await self._send(message)
+        elif self.mode == "compress":
+            await self._send_compressed(body, more_body)
+        else:
+            self.buffer.append(body)
+            self.buffered += len(body)
+            if self.buffered >= self.middleware.minimum_size:
+                await self._begin_compression(more_body)
+            elif not more_body:
+                await self._flush_identity()
+
+        if not more_body:
+            self.middleware.stats.record(
+                self.route(), self.encoding if self.mode == "compress" else None, self.original, self.sent
+            )
+
+    async def _flush_identity(self) -> None:
+        """Body selesai di bawah ambang: kirim apa adanya"""
+        self.mode = "identity"
+        MutableHeaders(raw=self.start["headers"]).add_vary_header("Accept-Encoding")
+        body = b"".join(self.buffer)
+        self.buffer = []
+        self.sent += len(body)
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": body, "more_body": False})
+
+    async def _begin_compression(self, more_body: bool) -> None:
+        self.mode = "compress"
+        self.compress_chunk, self.finish = self.middleware.compressor(self.encoding)
+        body = b"".join(self.buffer)
+        self.buffer = []
+
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        # Representasi berbeda dari body asli: ETag kuat diturunkan jadi weak
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+        if more_body:
+            # Streaming: panjang akhir tidak diketahui, kirim chunked
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            await self._send(self.start)
+            await self._send_compressed(body, more_body=True)
+        else:
+            compressed = self.compress_chunk(body) + self.finish()
+            headers["Content-Length"] = str(len(compressed))
+            self.sent += len(compressed)
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+    async def _send_compressed(self, body: bytes, more_body: bool) -> None:
+        data = self.compress_chunk(body) if body else b""
+        if not more_body:
+            data += self.finish()
+        self.sent += len(data)
+        if data or not more_body:
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -1,32 +1,41 @@
-from datetime import datetime, date, time, timedelta
-import pytz
-from app.config import settings
+from datetime import datetime, date, time
+from app.models.vehicle import ShiftType
+from app.utils.shift_clock import shift_clock
+
+# Jam shift & reset tanggal operasional dikelola oleh ShiftClock (tabel shift_configs).
+# Fungsi di bawah dipertahankan sebagai API lama yang mendelegasikan ke shift_clock.
 
 def get_current_datetime() -> datetime:
     """Mendapatkan waktu sekarang sesuai timezone Asia/Makassar (WITA)"""
-    tz = pytz.timezone(settings.TIMEZONE)
-    return datetime.now(tz)
+    return shift_clock.now()
+
+def to_local_datetime(dt: datetime) -> datetime:
+    """
+    Konversi datetime dari client ke timezone operasional (WITA).
+    Datetime tanpa timezone dianggap sudah dalam waktu lokal.
+    """
+    return shift_clock.localize(dt)
 
-def get_current_date_shift() -> date:
+def get_current_date_shift(now: datetime = None) -> date:
     """
     [LOGIKA OPERASIONAL SHIFT - Kuning, Long Shift] 
-    Reset jam 05:00 pagi.
+    Reset jam 05:00 pagi (SHIFT_DAY_RESET_HOUR).
     Jika waktu < 05:00 pagi, maka dianggap masih tanggal hari sebelumnya.
+    Parameter now dipakai untuk laporan offline (waktu pemeriksaan di perangkat).
     """
-    now = get_current_datetime()
-    # Jika jam sekarang antara 00:00 sampai 04:59
-    if now.hour < 5:
-        return (now - timedelta(days=1)).date()
-    return now.date()
+    if now is None:
+        now = get_current_datetime()
+    return shift_clock.operational_date(ShiftType.SHIFT, now)
 
-def get_current_date_non_shift() -> date:
+def get_current_date_non_shift(now: datetime = None) -> date:
     """
     [LOGIKA OPERASIONAL NON-SHIFT - Hijau, Biru]
     Reset jam 00:00 (12 malam).
     Langsung menggunakan tanggal hari ini.
     """
-    now = get_current_datetime()
-    return now.date()
+    if now is None:
+        now = get_current_datetime()
+    return shift_clock.operational_date(ShiftType.NON_SHIFT, now)
 
 def get_current_date() -> date:
     """
@@ -41,61 +50,33 @@ def get_current_time() -> time:
 
 def get_shift_number(current_time: time = None) -> int:
     """
-    Menentukan shift berdasarkan jam kerja PT. IMM (Updated):
-    - Shift 1: 07:00 - 15:00
+    Menentukan shift berdasarkan jam kerja PT. IMM (default shift_configs):
+    - Shift 1: 07:00 - 15:00 (bisa diisi mulai 06:00)
     - Shift 2: 15:00 - 23:00
-    - Shift 3: 23:00 - 07:00
-    
-    Toleransi mundur: 1 jam (bisa isi dari jam sebelumnya)
+    - Shift 3: 23:00 - 07:00 (sampai 06:00)
     """
     if current_time is None:
         current_time = get_current_time()
-        
-    now_hour = current_time.hour
-    
-    # Shift 1: 06:00 (toleransi -1 jam dari 07:00) sampai 15:00
-    if 6 <= now_hour < 15:
-        return 1
-    # Shift 2: 14:00 (toleransi -1 jam dari 15:00) sampai 23:00
-    elif 14 <= now_hour < 23:
-        return 2
-    # Shift 3: 22:00 (toleransi -1 jam dari 23:00) sampai 07:00
-    else:
-        return 3
+    return shift_clock.shift_number(ShiftType.SHIFT, current_time)
 
 def get_long_shift_number(current_time: time = None) -> int:
     """
-    Menentukan long shift (2x sehari):
-    - Long Shift 1: 07:00 - 19:00
-    - Long Shift 2: 19:00 - 07:00
-    
-    Toleransi mundur: 1 jam
+    Menentukan long shift (2x sehari, default shift_configs):
+    - Long Shift 1: 07:00 - 19:00 (bisa diisi mulai 06:00)
+    - Long Shift 2: 19:00 - 07:00 (sampai 06:00)
     """
     if current_time is None:
         current_time = get_current_time()
-        
-    now_hour = current_time.hour
-    
-    # Long Shift 1: 06:00 (toleransi -1 jam) sampai 19:00
-    if 6 <= now_hour < 19:
-        return 1
-    # Long Shift 2: 18:00 (toleransi -1 jam) sampai 07:00
-    else:
-        return 2
+    return shift_clock.shift_number(ShiftType.LONG_SHIFT, current_time)
 
 def is_within_non_shift_hours(current_time: time = None) -> bool:
     """
     Cek apakah waktu saat ini dalam jam kerja non-shift.
-    Non-shift (Hijau & Biru): 07:00 - 16:00
-    Toleransi mundur: 1 jam (mulai dari 06:00)
+    Non-shift (Hijau & Biru): 07:00 - 16:00, bisa diisi mulai 06:00 (default shift_configs)
     """
     if current_time is None:
         current_time = get_current_time()
-        
-    now_hour = current_time.hour
-    
-    # 06:00 (toleransi -1 jam dari 07:00) sampai 16:00
-    return 6 <= now_hour < 16
+    return shift_clock.is_open(ShiftType.NON_SHIFT, current_time)
 
 def days_until_expiry(expiry_date: date) -> int:
     """
@@ -111,19 +92,20 @@ def days_until_expiry(expiry_date: date) -> int:
     return delta.days
 
 
-def validate_shift_time(shift_number: int = None) -> tuple[bool, str]:
+def validate_shift_time(shift_number: int = None, current_time: time = None) -> tuple[bool, str]:
     """
-    Validasi apakah shift_number yang dikirim sesuai dengan waktu saat ini.
+    Validasi apakah shift_number yang dikirim sesuai dengan waktu saat ini
+    (atau current_time yang diberikan, misal waktu pemeriksaan laporan offline).
     
     Shift numbers:
-    - 0: Non-shift (hijau/biru) - bisa submit 06:00-16:00
+    - 0: Non-shift (hijau/biru) - hanya dalam jendela non-shift
     - 1, 2, 3: Regular shift (kuning)
     - 11, 12: Long shift
     
     Returns: (is_valid, error_message)
     """
-    current_time = get_current_time()
-    now_hour = current_time.hour
+    if current_time is None:
+        current_time = get_current_time()
     
     # Jika shift_number None, backend akan auto-detect
     if shift_number is None:
@@ -134,7 +116,8 @@ def validate_shift_time(shift_number: int = None) -> tuple[bool, str]:
         if is_within_non_shift_hours(current_time):
             return True, ""
         else:
-            return False, "Waktu submit untuk Non-Shift hanya 06:00-16:00"
+            window = shift_clock.get_window(ShiftType.NON_SHIFT, 1)
+            return False, f"Waktu submit untuk Non-Shift hanya {window.window_label if window else '-'}"
     
     # Regular shift (1, 2, 3)
     if shift_number in [1, 2, 3]:
@@ -0,0 +1,54 @@
+"""
+Helper cursor untuk keyset pagination.
+
+Cursor adalah nilai kunci urutan baris terakhir di halaman sebelumnya, di-encode
+base64url (JSON) agar opaque bagi client. Client cukup mengirim ulang next_cursor.
+"""
+
+import base64
+import json
+from datetime import date, datetime, time
+from typing import List, Tuple
+from uuid import UUID
+
+
+def encode_cursor(*values) -> str:
+    """Encode nilai kunci (date/time/UUID/str/int) menjadi cursor opaque"""
+    raw = json.dumps([
+        v.isoformat() if isinstance(v, (date, time)) else str(v) if isinstance(v, UUID) else v
+        for v in values
+    ], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, count: int) -> List:
+    """
+    Decode cursor menjadi list nilai mentah (string/int) sepanjang `count`.
+    Raises ValueError jika cursor rusak atau bukan hasil encode_cursor.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError):
+        raise ValueError("Cursor tidak valid")
+    if not isinstance(values, list) or len(values) != count:
+        raise ValueError("Cursor tidak valid")
+    return values
+
+
+def decode_report_cursor(cursor: str) -> Tuple[date, time, UUID]:
+    """Cursor laporan P2H: (submission_date, submission_time, id)"""
+    submission_date, submission_time, report_id = decode_cursor(cursor, 3)
+    try:
+        return date.fromisoformat(submission_date), time.fromisoformat(submission_time), UUID(report_id)
+    except (TypeError, ValueError):
+        raise ValueError("Cursor tidak valid")
+
+
+def decode_vehicle_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Cursor kendaraan: (created_at, id)"""
+    created_at, vehicle_id = decode_cursor(cursor, 2)
+    try:
+        return datetime.fromisoformat(created_at), UUID(vehicle_id)
+    except (TypeError, ValueError):
+        raise ValueError("Cursor tidak valid")
@@ -1,16 +1,158 @@
 # app/utils/response.py
-from typing import Any, Optional
-from fastapi.responses import JSONResponse
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Optional
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+
+def _default(obj: Any) -> Any:
+    """Tipe yang tidak dikenal orjson (UUID/date/datetime/enum sudah native)"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode='json')
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode JSON dengan orjson (compact, UTF-8, key non-string diizinkan)"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse yang di-render dengan orjson (UUID, date, enum tanpa konversi manual)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _envelope(message: str, payload_json: bytes, status_code: int) -> bytes:
+    """Susun body base_response dari payload yang sudah berupa JSON bytes"""
+    return b"".join((
+        b'{"status":', b'"success"' if status_code < 400 else b'"error"',
+        b',"message":', dumps(message),
+        b',"payload":', payload_json,
+        b'}'
+    ))
+
 
 def base_response(message: str, payload: Any = None, status_code: int = 200):
     """
     Fungsi helper untuk menyeragamkan output JSON seperti saran senior Anda.
     """
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=status_code,
         content={
             "status": "success" if status_code < 400 else "error",
             "message": message,
             "payload": payload
         }
-    )
\ No newline at end of file
+    )
+
+
+def raw_response(message: str, payload_json: bytes, status_code: int = 200) -> Response:
+    """
+    base_response untuk payload yang sudah di-encode (misal lewat TypeAdapter.dump_json),
+    sehingga payload tidak di-decode lalu di-encode ulang.
+    """
+    return Response(
+        content=_envelope(message, payload_json, status_code),
+        status_code=status_code,
+        media_type="application/json"
+    )
+
+
+def render_base_response(message: str, payload: Any = None, status_code: int = 200) -> bytes:
+    """
+    Body JSON base_response dalam bentuk bytes (format sama dengan base_response),
+    untuk disimpan di cache dan dikirim ulang tanpa serialisasi.
+    """
+    return dumps({
+        "status": "success" if status_code < 400 else "error",
+        "message": message,
+        "payload": payload
+    })
+
+def body_etag(body: bytes) -> str:
+    """ETag dari isi body (stabil antar restart selama isinya sama)"""
+    return hashlib.sha1(body).hexdigest()
+
+def _validator_headers(etag: str, cache_control: str, last_modified: Optional[datetime]) -> dict:
+    headers = {"ETag": f'"{etag}"', "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    True jika validator client masih cocok: If-None-Match dibandingkan weak
+    (gzip/br mengubah ETag jadi W/), If-Modified-Since hanya dipakai jika
+    If-None-Match tidak dikirim.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return if_none_match.strip() == "*" or f'"{etag}"' in [
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        ]
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def not_modified_response(
+    etag: str,
+    cache_control: str = "private, no-cache",
+    last_modified: Optional[datetime] = None
+) -> Response:
+    """304 tanpa body dengan validator yang sama seperti response 200"""
+    return Response(status_code=304, headers=_validator_headers(etag, cache_control, last_modified))
+
+
+def cached_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    cache_control: str = "private, no-cache",
+    last_modified: Optional[datetime] = None
+) -> Response:
+    """
+    Kirim body yang sudah di-render dengan header ETag (dan Last-Modified jika ada).
+    Jika If-None-Match client cocok, kirim 304 tanpa body.
+    """
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, cache_control, last_modified)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers=_validator_headers(etag, cache_control, last_modified)
+    )
+
+
+def versioned_response(
+    request: Request,
+    cache,
+    key: Any,
+    render: Callable[[], bytes],
+    cache_control: str = "private, no-cache"
+) -> Response:
+    """
+    cached_response untuk data di VersionedCache: body di-render sekali per versi
+    (render dipanggil hanya saat cache kosong), ETag = versi cache.
+    """
+    version, body = cache.get_or_set(key, render)
+    return cached_response(
+        request, body,
+        etag=cache.etag_for(version),
+        cache_control=cache_control,
+        last_modified=cache.modified_at
+    )
@@ -0,0 +1,43 @@
+"""
+Serializer list berbasis TypeAdapter.
+
+Endpoint list besar (/p2h/reports, /users, /vehicles) sebelumnya memanggil
+Model.model_validate(obj).model_dump(mode='json') per baris lalu meng-encode
+envelope-nya lagi. Di sini satu TypeAdapter(List[Model]) per schema dibuat sekali
+(di-cache), memvalidasi seluruh list dari atribut ORM lalu langsung menulis JSON
+bytes di pydantic-core, tanpa dict perantara.
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, List, Type
+
+from pydantic import BaseModel, TypeAdapter
+
+from app.utils.response import dumps, raw_response
+
+
+@lru_cache(maxsize=None)
+def list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter(List[schema]) yang dipakai ulang antar request"""
+    return TypeAdapter(List[schema])
+
+
+def dump_list_json(schema: Type[BaseModel], items: Iterable[Any]) -> bytes:
+    """Validasi objek ORM/Row ke schema lalu encode ke JSON array dalam satu langkah"""
+    adapter = list_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(list(items), from_attributes=True))
+
+
+def list_response(message: str, schema: Type[BaseModel], items: Iterable[Any], status_code: int = 200):
+    """base_response dengan payload berupa list schema"""
+    return raw_response(message, dump_list_json(schema, items), status_code)
+
+
+def page_response(message: str, schema: Type[BaseModel], items: Iterable[Any], status_code: int = 200, **meta):
+    """base_response dengan payload {"items": [...], **meta} (cursor pagination dll)"""
+    payload_json = b'{"items":' + dump_list_json(schema, items)
+    if meta:
+        payload_json += b"," + dumps(meta)[1:]
+    else:
+        payload_json += b"}"
+    return raw_response(message, payload_json, status_code)
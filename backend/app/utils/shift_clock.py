@@ -0,0 +1,257 @@
+"""
+ShiftClock - Satu sumber kebenaran untuk jam shift P2H.
+
+Jendela shift dibaca dari tabel shift_configs (fallback ke DEFAULT_WINDOWS jika
+tabel belum ada/kosong/tidak valid). Saat dimuat, jendela diubah menjadi daftar
+segmen detik-dalam-hari yang terurut per tipe shift, sehingga pertanyaan
+"shift berapa / jendela terbuka / tanggal operasional" cukup dijawab dengan bisect.
+Batas (instant) per tanggal dihitung sekali lalu di-cache, dan next_boundary()
+dipakai cache lain untuk kedaluwarsa tepat di pergantian shift.
+
+Timezone memakai zoneinfo (objek dibuat sekali), bukan pytz per panggilan.
+"""
+
+import logging
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.config import settings
+from app.models.vehicle import ShiftType
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+@dataclass(frozen=True)
+class ShiftWindow:
+    """Jendela submit satu shift (end <= start berarti melewati tengah malam)"""
+    shift_type: ShiftType
+    shift_number: int
+    name: str
+    start: time
+    end: time
+    nominal_start: Optional[time] = None
+
+    @property
+    def label(self) -> str:
+        """Rentang jam resmi untuk tampilan, misal '07:00 - 15:00'"""
+        return f"{(self.nominal_start or self.start):%H:%M} - {self.end:%H:%M}"
+
+    @property
+    def window_label(self) -> str:
+        """Rentang jam submit yang ditegakkan, misal '06:00-15:00'"""
+        return f"{self.start:%H:%M}-{self.end:%H:%M}"
+
+
+# Sama dengan seed migrasi a7b8c9d0e1f2
+DEFAULT_WINDOWS = [
+    ShiftWindow(ShiftType.SHIFT, 1, "Shift 1", time(6, 0), time(15, 0), time(7, 0)),
+    ShiftWindow(ShiftType.SHIFT, 2, "Shift 2", time(15, 0), time(23, 0), time(15, 0)),
+    ShiftWindow(ShiftType.SHIFT, 3, "Shift 3", time(23, 0), time(6, 0), time(23, 0)),
+    ShiftWindow(ShiftType.LONG_SHIFT, 1, "Long Shift 1", time(6, 0), time(19, 0), time(7, 0)),
+    ShiftWindow(ShiftType.LONG_SHIFT, 2, "Long Shift 2", time(19, 0), time(6, 0), time(19, 0)),
+    ShiftWindow(ShiftType.NON_SHIFT, 1, "Non Shift", time(6, 0), time(16, 0), time(7, 0)),
+]
+
+# Tipe shift yang jendelanya wajib menutup 24 jam
+FULL_DAY_TYPES = (ShiftType.SHIFT, ShiftType.LONG_SHIFT)
+
+
+def _seconds(t: time) -> int:
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+def _hhmm(seconds: int) -> str:
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}"
+
+
+def windows_from_rows(rows) -> List[ShiftWindow]:
+    """Konversi baris ShiftConfig menjadi ShiftWindow"""
+    return [
+        ShiftWindow(
+            shift_type=row.shift_type,
+            shift_number=row.shift_number,
+            name=row.name,
+            start=row.start_time,
+            end=row.end_time,
+            nominal_start=row.nominal_start,
+        )
+        for row in rows
+    ]
+
+
+class ShiftClock:
+    """Kalender shift dengan batas yang sudah dihitung sebelumnya"""
+
+    MAX_CACHED_DAYS = 8
+
+    def __init__(self, windows: List[ShiftWindow] = None):
+        self.tz = ZoneInfo(settings.TIMEZONE)
+        self.day_resets: Dict[ShiftType, time] = {
+            ShiftType.SHIFT: time(settings.SHIFT_DAY_RESET_HOUR),
+            ShiftType.LONG_SHIFT: time(settings.SHIFT_DAY_RESET_HOUR),
+            ShiftType.NON_SHIFT: time(settings.NON_SHIFT_DAY_RESET_HOUR),
+        }
+        self._lock = threading.Lock()
+        self._day_boundaries: Dict[date, List[datetime]] = {}
+        self._apply(windows or DEFAULT_WINDOWS)
+
+    # --- Konfigurasi ---
+
+    def _apply(self, windows: List[ShiftWindow]) -> None:
+        """Bangun tabel segmen per tipe shift: starts[i] -> window[i] (None = tertutup)"""
+        segments: Dict[ShiftType, Tuple[List[int], List[Optional[ShiftWindow]]]] = {}
+        for shift_type in ShiftType:
+            pieces = []
+            for w in windows:
+                if w.shift_type != shift_type:
+                    continue
+                start, end = _seconds(w.start), _seconds(w.end)
+                if start < end:
+                    pieces.append((start, end, w))
+                else:  # Melewati tengah malam
+                    pieces.append((start, SECONDS_PER_DAY, w))
+                    if end > 0:
+                        pieces.append((0, end, w))
+            pieces.sort(key=lambda p: p[0])
+
+            starts, owners, cursor = [], [], 0
+            for start, end, w in pieces:
+                if start < cursor:
+                    raise ValueError(f"Jendela {w.name} tumpang tindih dengan shift lain")
+                if start > cursor:
+                    if shift_type in FULL_DAY_TYPES:
+                        raise ValueError(f"Jendela {shift_type.value} tidak menutup 24 jam (celah mulai {_hhmm(cursor)})")
+                    starts.append(cursor)
+                    owners.append(None)
+                starts.append(start)
+                owners.append(w)
+                cursor = end
+            if cursor < SECONDS_PER_DAY:
+                if shift_type in FULL_DAY_TYPES:
+                    raise ValueError(f"Jendela {shift_type.value} tidak menutup 24 jam (celah mulai {_hhmm(cursor)})")
+                starts.append(cursor)
+                owners.append(None)
+            segments[shift_type] = (starts, owners)
+
+        with self._lock:
+            self.windows = list(windows)
+            self._segments = segments
+            self._day_boundaries.clear()
+
+    def load(self, db) -> None:
+        """
+        Muat jendela dari tabel shift_configs. Jika tabel kosong, belum ada,
+        atau konfigurasinya tidak valid, tetap memakai konfigurasi sebelumnya.
+        """
+        from app.models.shift_config import ShiftConfig
+
+        try:
+            rows = db.query(ShiftConfig).filter(ShiftConfig.is_active == True).all()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"⚠️ shift_configs tidak bisa dibaca, memakai jam default: {str(e)}")
+            return
+
+        if not rows:
+            logger.warning("⚠️ shift_configs kosong, memakai jam default")
+            return
+
+        windows = windows_from_rows(rows)
+        try:
+            self._apply(windows)
+        except ValueError as e:
+            logger.error(f"❌ shift_configs tidak valid, konfigurasi lama tetap dipakai: {str(e)}")
+            return
+        logger.info(f"🕒 ShiftClock loaded {len(windows)} shift windows from shift_configs")
+
+    # --- Waktu ---
+
+    def now(self) -> datetime:
+        return datetime.now(self.tz)
+
+    def localize(self, dt: datetime) -> datetime:
+        """Datetime tanpa timezone dianggap waktu lokal; yang lain dikonversi ke timezone lokal"""
+        if dt.tzinfo is None:
+            return dt.replace(tzinfo=self.tz)
+        return dt.astimezone(self.tz)
+
+    # --- Pertanyaan shift (bisect di tabel segmen) ---
+
+    def window_at(self, shift_type: ShiftType, t: time) -> Optional[ShiftWindow]:
+        """Jendela shift yang aktif pada jam t (None jika tertutup, hanya NON_SHIFT)"""
+        starts, owners = self._segments[shift_type]
+        return owners[bisect_right(starts, _seconds(t)) - 1]
+
+    def shift_number(self, shift_type: ShiftType, t: time) -> Optional[int]:
+        window = self.window_at(shift_type, t)
+        return window.shift_number if window else None
+
+    def is_open(self, shift_type: ShiftType, t: time) -> bool:
+        return self.window_at(shift_type, t) is not None
+
+    def get_window(self, shift_type: ShiftType, shift_number: int) -> Optional[ShiftWindow]:
+        for w in self.windows:
+            if w.shift_type == shift_type and w.shift_number == shift_number:
+                return w
+        return None
+
+    def windows_for(self, shift_type: ShiftType) -> List[ShiftWindow]:
+        return sorted(
+            (w for w in self.windows if w.shift_type == shift_type),
+            key=lambda w: w.shift_number
+        )
+
+    def operational_date(self, shift_type: ShiftType, at: datetime) -> date:
+        """Tanggal operasional: sebelum jam reset masih dihitung hari sebelumnya"""
+        at = self.localize(at)
+        if at.time() < self.day_resets[shift_type]:
+            return (at - timedelta(days=1)).date()
+        return at.date()
+
+    # --- Batas waktu ---
+
+    def boundaries_on(self, day: date) -> List[datetime]:
+        """Semua instant pergantian shift & reset tanggal operasional pada satu tanggal lokal"""
+        cached = self._day_boundaries.get(day)
+        if cached is not None:
+            return cached
+
+        offsets = set()
+        for starts, _ in self._segments.values():
+            offsets.update(starts)
+        offsets.update(_seconds(t) for t in self.day_resets.values())
+        midnight = datetime.combine(day, time(0), tzinfo=self.tz)
+        boundaries = sorted(midnight + timedelta(seconds=s) for s in offsets)
+
+        with self._lock:
+            if len(self._day_boundaries) >= self.MAX_CACHED_DAYS:
+                self._day_boundaries.pop(min(self._day_boundaries))
+            self._day_boundaries[day] = boundaries
+        return boundaries
+
+    def next_boundary(self, at: Optional[datetime] = None) -> datetime:
+        """Instant pergantian shift/reset berikutnya setelah `at` (default: sekarang)"""
+        at = self.localize(at) if at is not None else self.now()
+        today = self.boundaries_on(at.date())
+        index = bisect_right(today, at)
+        if index < len(today):
+            return today[index]
+        return self.boundaries_on(at.date() + timedelta(days=1))[0]
+
+    def next_reset(self, shift_type: ShiftType, at: Optional[datetime] = None) -> datetime:
+        """Instant reset tanggal operasional berikutnya untuk tipe shift ini"""
+        at = self.localize(at) if at is not None else self.now()
+        reset = datetime.combine(at.date(), self.day_resets[shift_type], tzinfo=self.tz)
+        if reset <= at:
+            reset = datetime.combine(at.date() + timedelta(days=1), self.day_resets[shift_type], tzinfo=self.tz)
+        return reset
+
+
+# Global instance (dimuat ulang dari shift_configs saat startup)
+shift_clock = ShiftClock()
@@ -0,0 +1,115 @@
+"""
+Verifikasi conditional GET untuk data master, tipe kendaraan dan daftar tipe
+kendaraan dashboard: If-None-Match yang cocok harus dijawab 304 tanpa satu pun
+koneksi database diambil dari pool.
+
+Untuk setiap endpoint:
+    1. If-None-Match = ETag versi saat ini        -> 304, 0 checkout pool
+    2. If-Modified-Since = Last-Modified saat ini -> 304, 0 checkout pool
+    3. setelah cache di-bump, ETag lama           -> bukan 304 (request diproses normal)
+    4. token dengan role yang tidak diizinkan     -> bukan 304 (ditolak dependency biasa)
+
+Token dibuat langsung dengan create_access_token (user tidak perlu ada di DB
+karena jalur 304 tidak memuat user). Langkah 3/4 memang mengakses database;
+jika database tidak tersedia hasilnya 500, dan itu tetap dihitung "bukan 304".
+
+Cara pakai (dari folder backend):
+    python -m scripts.audit_conditional_get
+"""
+import sys
+import uuid
+from email.utils import format_datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.database import engine
+from app.main import app
+from app.models.user import UserRole
+from app.utils.cache import (
+    companies_cache, departments_cache, positions_cache, work_statuses_cache,
+    vehicle_types_cache, vehicles_cache,
+)
+from app.utils.jwt import create_access_token
+
+ENDPOINTS = [
+    ("/master-data/companies", companies_cache, UserRole.user),
+    ("/master-data/departments", departments_cache, UserRole.user),
+    ("/master-data/positions", positions_cache, UserRole.user),
+    ("/master-data/work-statuses", work_statuses_cache, UserRole.user),
+    ("/vehicle-types/active", vehicle_types_cache, UserRole.user),
+    ("/dashboard/vehicle-types", vehicles_cache, UserRole.admin),
+]
+
+
+class CheckoutCounter:
+    """Menghitung koneksi yang diambil dari pool"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, dbapi_connection, connection_record, connection_proxy):
+        self.count += 1
+
+
+def token_for(role: UserRole) -> str:
+    return create_access_token(data={"sub": str(uuid.uuid4()), "role": role.value})
+
+
+def run_checks() -> bool:
+    counter = CheckoutCounter()
+    event.listen(engine.pool, "checkout", counter)
+    client = TestClient(app, raise_server_exceptions=False)
+    ok = True
+
+    def check(name: str, passed: bool, detail: str = ""):
+        nonlocal ok
+        ok = ok and passed
+        print(f"{'✅' if passed else '❌'} {name}{detail}")
+
+    print("=" * 60)
+    print("🔎 Conditional GET (304 sebelum akses database)")
+    print("=" * 60)
+    try:
+        for path, cache, role in ENDPOINTS:
+            auth = {"Authorization": f"Bearer {token_for(role)}"}
+
+            counter.count = 0
+            response = client.get(path, headers={**auth, "If-None-Match": f'"{cache.etag}"'})
+            check(
+                f"{path} If-None-Match",
+                response.status_code == 304 and counter.count == 0 and not response.content,
+                f" ({response.status_code}, {counter.count} koneksi)",
+            )
+            check(f"{path} header validator", response.headers.get("etag") == f'"{cache.etag}"'
+                  and "last-modified" in response.headers and "cache-control" in response.headers)
+
+            counter.count = 0
+            since = format_datetime(cache.modified_at, usegmt=True)
+            response = client.get(path, headers={**auth, "If-Modified-Since": since})
+            check(
+                f"{path} If-Modified-Since",
+                response.status_code == 304 and counter.count == 0,
+                f" ({response.status_code}, {counter.count} koneksi)",
+            )
+
+            stale = cache.etag
+            cache.bump()
+            response = client.get(path, headers={**auth, "If-None-Match": f'"{stale}"'})
+            check(f"{path} ETag lama setelah bump", response.status_code != 304, f" ({response.status_code})")
+
+            if role != UserRole.user:
+                other = {"Authorization": f"Bearer {token_for(UserRole.user)}"}
+                response = client.get(path, headers={**other, "If-None-Match": f'"{cache.etag}"'})
+                check(f"{path} role tidak diizinkan", response.status_code != 304, f" ({response.status_code})")
+
+            response = client.get(path, headers={"If-None-Match": f'"{cache.etag}"'})
+            check(f"{path} tanpa token", response.status_code == 401, f" ({response.status_code})")
+    finally:
+        event.remove(engine.pool, "checkout", counter)
+
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_checks() else 1)
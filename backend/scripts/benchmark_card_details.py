@@ -0,0 +1,115 @@
+"""
+Benchmark & verifikasi detail kartu dashboard: proyeksi + keyset pagination.
+
+Jalur lama (direkonstruksi di sini) memuat objek P2HReport lalu mengakses
+r.vehicle dan r.user per baris: 1 + 2N statement untuk N baris (lazy load).
+Jalur baru (dashboard_service.get_card_details) memakai satu SELECT proyeksi
+yang men-join kendaraan & operator per halaman, ditambah satu COUNT di halaman
+pertama.
+
+Untuk setiap kartu, script menelusuri seluruh halaman dan memastikan:
+    - statement per halaman: 2 di halaman pertama, 1 di halaman berikutnya
+    - tidak ada id ganda antar halaman dan jumlah baris == total
+    - halaman pertama sama dengan hasil jalur lama dengan limit yang sama
+
+Data sintetis dibuat di dalam transaksi luar yang di-rollback di akhir.
+
+Cara pakai (dari folder backend, setelah `alembic upgrade head`):
+    python -m scripts.benchmark_card_details --reports 100000 --page-size 100
+"""
+import argparse
+import sys
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models.p2h import P2HReport
+from app.models.vehicle import Vehicle
+from app.services.dashboard_service import dashboard_service
+from scripts.explain_report_queries import StatementRecorder, seed
+
+CARDS = ["total_abnormal", "total_warning", "total_completed", "total_vehicles", "total_pending"]
+
+
+def legacy_card_reports(db: Session, status, limit: int) -> list:
+    """Kartu laporan dengan lazy load vehicle/user per baris seperti sebelum refactor"""
+    query = db.query(P2HReport).join(Vehicle).filter(
+        Vehicle.is_active == True,
+        P2HReport.is_deleted == False
+    )
+    if status is not None:
+        query = query.filter(P2HReport.overall_status == status)
+    reports = query.order_by(
+        P2HReport.submission_date.desc(), P2HReport.submission_time.desc(), P2HReport.id.desc()
+    ).limit(limit).all()
+    return [
+        (str(r.id), r.vehicle.no_lambung, r.vehicle.plat_nomor, r.submission_date.isoformat(),
+         r.user.full_name if r.user else None)
+        for r in reports
+    ]
+
+
+def run_checks(reports: int, page_size: int) -> bool:
+    engine.echo = False
+    connection = engine.connect()
+    outer = connection.begin()
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+    recorder = StatementRecorder()
+
+    try:
+        seed(db, reports, items=0)
+        event.listen(engine, "before_cursor_execute", recorder)
+        print("=" * 84)
+        print(f"🗂️  Detail kartu dashboard ({reports} laporan, {page_size} baris per halaman)")
+        print("=" * 84)
+        print(f"{'Kartu':18} {'total':>8} {'halaman':>8} {'stmt maks':>10} {'ms/halaman':>11} {'stmt lama':>10}")
+        ok = True
+        for card_type in CARDS:
+            seen, rows, pages, max_statements, cursor, total = set(), 0, 0, 0, None, None
+            first_items, started = None, time.perf_counter()
+            while True:
+                recorder.statements.clear()
+                page = dashboard_service.get_card_details(db, card_type, page_size=page_size, cursor=cursor)
+                expected = 2 if cursor is None else 1
+                max_statements = max(max_statements, len(recorder.statements))
+                ok = ok and len(recorder.statements) == expected
+                if cursor is None:
+                    total, first_items = page["total"], page["items"]
+                seen.update(item["id"] for item in page["items"])
+                rows += len(page["items"])
+                pages += 1
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            per_page = (time.perf_counter() - started) * 1000 / pages
+
+            passed = rows == total == len(seen)
+            legacy_count = "-"
+            status = dashboard_service.REPORT_CARDS.get(card_type, False)
+            if status is not False:
+                recorder.statements.clear()
+                legacy = legacy_card_reports(db, status, page_size)
+                legacy_count = len(recorder.statements)
+                passed = passed and legacy == [
+                    (i["id"], i["no_lambung"], i["plat_nomor"], i["submission_date"], i["operator"]) for i in first_items
+                ]
+            ok = ok and passed
+            print(f"{'✅' if passed else '❌'} {card_type:16} {total:8d} {pages:8d} {max_statements:10d}"
+                  f" {per_page:11.1f} {legacy_count:>10}")
+        event.remove(engine, "before_cursor_execute", recorder)
+    finally:
+        db.close()
+        outer.rollback()
+        connection.close()
+
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark detail kartu dashboard dengan keyset pagination")
+    parser.add_argument("--reports", type=int, default=100000, help="Jumlah laporan sintetis")
+    parser.add_argument("--page-size", type=int, default=100, help="Baris per halaman")
+    args = parser.parse_args()
+    sys.exit(0 if run_checks(args.reports, args.page_size) else 1)
@@ -0,0 +1,161 @@
+"""
+Benchmark CompressionMiddleware: ukuran dan waktu kompresi payload besar.
+
+Payload dibuat sama seperti endpoint sebenarnya tanpa database:
+    - /p2h/reports : list laporan transient (scripts.benchmark_json_response)
+                     di-encode lewat page_response
+    - /users       : list user lewat list_response
+    - export CSV   : StreamingResponse yang mengirim CSV per blok baris
+
+Aplikasi kecil dengan middleware yang sama dipanggil langsung lewat ASGI
+(tanpa server). Body hasil kompresi di-dekompres dan dibandingkan dengan body
+asli; untuk export dicek juga bahwa response tetap terkirim dalam banyak chunk.
+
+Cara pakai (dari folder backend):
+    python -m scripts.benchmark_compression --rows 5000
+"""
+import argparse
+import asyncio
+import gzip
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.schemas.p2h import P2HReportListResponse
+from app.schemas.user import UserResponse
+from app.utils.compression import CompressionMiddleware, CompressionStats, brotli
+from app.utils.serializers import list_response, page_response
+from scripts.benchmark_json_response import make_reports
+
+CSV_BLOCK_ROWS = 500
+
+
+def build_app(rows: int, items: int, stats: CompressionStats) -> FastAPI:
+    reports, users, _ = make_reports(rows, items)
+    users = (users * (rows // len(users) + 1))[:rows]
+    csv_lines = ["no_lambung,plat_nomor,tanggal,shift,status,pengemudi\n"] + [
+        f"{r.vehicle.no_lambung},{r.vehicle.plat_nomor},{r.submission_date},{r.shift_number},"
+        f"{r.overall_status.value},{r.user.full_name}\n"
+        for r in reports
+    ]
+
+    app = FastAPI()
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        content_types=settings.compression_content_types_list,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        stats=stats,
+    )
+
+    @app.get("/p2h/reports")
+    def p2h_reports():
+        return page_response("ok", P2HReportListResponse, reports, next_cursor=None, has_more=False)
+
+    @app.get("/users")
+    def list_users():
+        return list_response("ok", UserResponse, users)
+
+    @app.get("/export/p2h-reports")
+    def export_csv():
+        def blocks():
+            for start in range(0, len(csv_lines), CSV_BLOCK_ROWS):
+                yield "".join(csv_lines[start:start + CSV_BLOCK_ROWS])
+        return StreamingResponse(blocks(), media_type="text/csv")
+
+    @app.get("/small")
+    def small():
+        return list_response("ok", UserResponse, users[:1])
+
+    return app
+
+
+async def call(app, path: str, accept_encoding: str) -> tuple:
+    """(headers, daftar chunk body, detik) untuk satu GET lewat ASGI"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "server": ("bench", 80), "client": ("bench", 1),
+        "headers": [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else [],
+    }
+    messages = []
+    requested = asyncio.Event()
+    done = asyncio.Event()
+
+    async def receive():
+        # Panggilan berikutnya (listener disconnect StreamingResponse) menunggu sampai selesai
+        if requested.is_set():
+            await done.wait()
+            return {"type": "http.disconnect"}
+        requested.set()
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    done.set()
+    elapsed = time.perf_counter() - started
+
+    headers = {k.decode().lower(): v.decode() for k, v in messages[0]["headers"]}
+    chunks = [m.get("body", b"") for m in messages[1:] if m["type"] == "http.response.body"]
+    return headers, chunks, elapsed
+
+
+def decode(encoding: str, body: bytes) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "br":
+        return brotli.decompress(body)
+    return body
+
+
+async def run(rows: int, items: int):
+    stats = CompressionStats()
+    app = build_app(rows, items, stats)
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+    paths = ["/p2h/reports", "/users", "/export/p2h-reports", "/small"]
+
+    print("=" * 86)
+    print(f"📦 Kompresi response ({rows} baris, ambang {settings.COMPRESSION_MIN_SIZE} byte)")
+    print("=" * 86)
+    print(f"{'Route':22} {'encoding':>8} {'asli KB':>10} {'kirim KB':>10} {'rasio':>7} {'chunk':>6} {'ms':>8}")
+    for path in paths:
+        _, plain_chunks, plain_s = await call(app, path, "")
+        plain = b"".join(plain_chunks)
+        print(f"{path:22} {'-':>8} {len(plain) / 1024:10.1f} {len(plain) / 1024:10.1f} {1:7.3f}"
+              f" {len(plain_chunks):6d} {plain_s * 1000:8.1f}")
+        for encoding in encodings:
+            headers, chunks, elapsed = await call(app, path, encoding)
+            body = b"".join(chunks)
+            used = headers.get("content-encoding")
+            assert decode(used, body) == plain, f"Body berbeda setelah dekompresi untuk {path} ({encoding})"
+            if path == "/small":
+                assert used is None, "Body di bawah ambang tidak boleh dikompres"
+            else:
+                assert used == encoding, f"{path} tidak dikompres dengan {encoding}"
+            if path.startswith("/export"):
+                assert len(chunks) > 1, "Export streaming harus tetap terkirim per chunk"
+                assert "content-length" not in headers, "Export streaming tidak boleh punya Content-Length"
+            print(f"{'':22} {used or 'identity':>8} {len(plain) / 1024:10.1f} {len(body) / 1024:10.1f}"
+                  f" {len(body) / len(plain):7.3f} {len(chunks):6d} {elapsed * 1000:8.1f}")
+
+    print("-" * 86)
+    for row in stats.snapshot():
+        print(f"{row['route']:22} disimpan {row['bytes_saved'] / 1024:10.1f} KB"
+              f" ({row['compressed']}/{row['responses']} response dikompres)")
+    if brotli is None:
+        print("ℹ️  Modul brotli tidak terpasang, hanya gzip yang diukur")
+    print("✅ Semua body identik setelah dekompresi")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark middleware kompresi response")
+    parser.add_argument("--rows", type=int, default=5000, help="Jumlah baris per list")
+    parser.add_argument("--items", type=int, default=36, help="Jumlah detail per laporan")
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.items))
@@ -0,0 +1,138 @@
+"""
+Benchmark & verifikasi dashboard_cache: hasil dashboard per kombinasi filter.
+
+Endpoint /dashboard/statistics, /monthly-reports, /vehicle-type-status dan
+/recent-reports dipanggil lewat TestClient dengan session yang berisi data
+sintetis (transaksi luar di-rollback di akhir). Untuk setiap endpoint:
+    - request pertama (cache kosong) menjalankan query dashboard
+    - request berikutnya dengan filter yang sama (termasuk format berbeda yang
+      dinormalisasi, mis. tanggal dengan jam 00:00) hanya menjalankan query
+      autentikasi, dengan body identik
+Setelah itu satu laporan di-soft delete lewat p2h_service: statistik berikutnya
+harus dihitung ulang dan langsung menampilkan angka baru (tidak ada hasil basi).
+
+Cara pakai (dari folder backend, setelah `alembic upgrade head`):
+    python -m scripts.benchmark_dashboard_cache --reports 100000
+"""
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from datetime import timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.database import engine, get_db
+from app.main import app
+from app.models.p2h import P2HReport
+from app.models.user import User, UserRole
+from app.models.vehicle import VehicleType
+from app.repositories.daily_stats_repository import daily_stats_repository
+from app.services.p2h_service import p2h_service
+from app.utils.cache import dashboard_cache
+from app.utils.datetime import get_current_datetime
+from app.utils.jwt import create_access_token
+from scripts.explain_report_queries import StatementRecorder, seed
+
+RUNS = 5
+
+
+def run_checks(reports: int) -> bool:
+    engine.echo = False
+    connection = engine.connect()
+    outer = connection.begin()
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+    recorder = StatementRecorder()
+
+    def override_get_db():
+        yield db
+
+    try:
+        seed(db, reports, items=0)
+        daily_stats_repository.rebuild(db)
+        admin = User(
+            full_name="Cache Admin", phone_number=f"cache-{uuid.uuid4().hex[:8]}",
+            password_hash="-", role=UserRole.superadmin
+        )
+        db.add(admin)
+        db.flush()
+
+        app.dependency_overrides[get_db] = override_get_db
+        client = TestClient(app, raise_server_exceptions=True)
+        auth = {"Authorization": f"Bearer {create_access_token(data={'sub': str(admin.id), 'role': admin.role.value})}"}
+        today = get_current_datetime().date()
+        start = (today - timedelta(days=30)).isoformat()
+        cases = [
+            ("/dashboard/statistics", {}, {}),
+            ("/dashboard/statistics", {"start_date": start, "end_date": today.isoformat()},
+             {"start_date": f"{start}T00:00:00", "end_date": today.isoformat()}),
+            ("/dashboard/monthly-reports", {"year": today.year}, {"year": today.year}),
+            ("/dashboard/vehicle-type-status", {"vehicle_type": VehicleType.BUS.value},
+             {"vehicle_type": f" {VehicleType.BUS.value} "}),
+            ("/dashboard/recent-reports", {"limit": 50}, {"limit": 50}),
+        ]
+
+        def get(path, params) -> tuple:
+            recorder.statements.clear()
+            started = time.perf_counter()
+            response = client.get(path, params=params, headers=auth)
+            elapsed = (time.perf_counter() - started) * 1000
+            assert response.status_code == 200, f"{path}: {response.status_code} {response.text[:200]}"
+            return response.content, len(recorder.statements), elapsed
+
+        event.listen(engine, "before_cursor_execute", recorder)
+
+        # Biaya autentikasi saja: /dashboard/vehicle-types yang sudah ada di cache
+        get("/dashboard/vehicle-types", {})
+        _, auth_statements, _ = get("/dashboard/vehicle-types", {})
+
+        print("=" * 86)
+        print(f"🗃️  Cache dashboard ({reports} laporan, median dari {RUNS} run, {auth_statements} stmt autentikasi)")
+        print("=" * 86)
+        print(f"{'Endpoint':32} {'stmt miss':>10} {'ms miss':>9} {'stmt hit':>9} {'ms hit':>8}")
+        ok = True
+        for path, params, variant in cases:
+            miss_ms, hit_ms = [], []
+            for _ in range(RUNS):
+                dashboard_cache.bump()
+                body, miss_count, elapsed = get(path, params)
+                miss_ms.append(elapsed)
+                cached, hit_count, elapsed = get(path, variant)
+                hit_ms.append(elapsed)
+            passed = cached == body and hit_count == auth_statements and miss_count > hit_count
+            ok = ok and passed
+            print(f"{'✅' if passed else '❌'} {path:30} {miss_count:10d} {statistics.median(miss_ms):9.1f}"
+                  f" {hit_count:9d} {statistics.median(hit_ms):8.1f}")
+
+        # Invalidasi: soft delete satu laporan, statistik harus langsung berubah
+        before = client.get("/dashboard/statistics", headers=auth).json()["payload"]
+        report = db.query(P2HReport).filter(P2HReport.is_deleted == False).first()
+        p2h_service.soft_delete_report(db, report)
+        recorder.statements.clear()
+        after = client.get("/dashboard/statistics", headers=auth).json()["payload"]
+        fresh = len(recorder.statements) > auth_statements
+        passed = fresh and after["total_completed_p2h"] == before["total_completed_p2h"] - 1
+        ok = ok and passed
+        print(f"{'✅' if passed else '❌'} Soft delete -> total_completed_p2h "
+              f"{before['total_completed_p2h']} -> {after['total_completed_p2h']}")
+
+        event.remove(engine, "before_cursor_execute", recorder)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        # Entry berisi data sintetis yang akan di-rollback
+        dashboard_cache.bump()
+        db.close()
+        outer.rollback()
+        connection.close()
+
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cache hasil dashboard")
+    parser.add_argument("--reports", type=int, default=100000, help="Jumlah laporan sintetis")
+    args = parser.parse_args()
+    sys.exit(0 if run_checks(args.reports) else 1)
@@ -0,0 +1,139 @@
+"""
+Benchmark & verifikasi statistik dashboard: satu query agregat vs query per kartu.
+
+Jalur lama (direkonstruksi di sini) mengirim 6 statement per load dashboard:
+count kendaraan, tiga count_by_status, count total laporan, lalu
+get_vehicles_reported_on_date. Jalur baru (dashboard_service.get_dashboard_statistics)
+memakai satu SELECT dengan SUM(...) FILTER (WHERE ...) atas agregat p2h_daily_stats
+(dibangun ulang dari data sintetis sebelum pengukuran).
+
+Untuk beberapa kombinasi filter (tanpa filter, rentang tanggal, tipe kendaraan,
+keduanya) script ini memastikan:
+    - jumlah statement jalur baru <= MAX_STATEMENTS
+    - setiap nilai kartu sama dengan jalur lama (dengan filter tipe kendaraan yang
+      sama juga untuk unit yang sudah P2H hari ini)
+
+Data sintetis dibuat di dalam transaksi luar yang di-rollback di akhir.
+
+Cara pakai (dari folder backend, setelah `alembic upgrade head`):
+    python -m scripts.benchmark_dashboard_statistics --reports 100000
+
+Exit code 1 jika jumlah statement melebihi batas atau ada nilai yang berbeda.
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import timedelta
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models.p2h import P2HReport
+from app.models.vehicle import Vehicle, VehicleType
+from app.repositories.p2h_repository import p2h_repository
+from app.services.dashboard_service import dashboard_service
+from app.utils.datetime import get_current_datetime
+from app.repositories.daily_stats_repository import daily_stats_repository
+from scripts.explain_report_queries import StatementRecorder, seed
+
+MAX_STATEMENTS = 2
+RUNS = 5
+
+
+def legacy_statistics(db: Session, start_date, end_date, vehicle_type) -> dict:
+    """Statistik dengan query per kartu seperti sebelum refactor"""
+    vehicle_query = db.query(func.count(Vehicle.id))
+    if vehicle_type:
+        vehicle_query = vehicle_query.filter(Vehicle.vehicle_type == vehicle_type)
+    total_vehicles = vehicle_query.scalar() or 0
+
+    counts = {
+        status: p2h_repository.count_by_status(db, status, start_date, end_date, vehicle_type)
+        for status in ("normal", "abnormal", "warning")
+    }
+    total_completed = p2h_repository.get_reports_query(
+        db, start_date, end_date, vehicle_type=vehicle_type
+    ).count() or 0
+
+    today = get_current_datetime().date()
+    reported = p2h_repository.get_reports_query(db, today, today, vehicle_type=vehicle_type).with_entities(
+        func.count(func.distinct(P2HReport.vehicle_id))
+    ).scalar() or 0
+
+    return {
+        "total_vehicles": total_vehicles,
+        "total_normal": counts["normal"],
+        "total_abnormal": counts["abnormal"],
+        "total_warning": counts["warning"],
+        "total_completed_p2h": total_completed,
+        "total_pending_p2h": max(total_vehicles - reported, 0),
+    }
+
+
+def timed(recorder: StatementRecorder, fn) -> tuple:
+    """(hasil, jumlah statement, median ms)"""
+    timings = []
+    for _ in range(RUNS):
+        recorder.statements.clear()
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, len(recorder.statements), statistics.median(timings)
+
+
+def run_checks(reports: int) -> bool:
+    engine.echo = False
+    connection = engine.connect()
+    outer = connection.begin()
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+    recorder = StatementRecorder()
+
+    try:
+        seed(db, reports, items=0)
+        # Data sintetis di-insert langsung: agregat harian dihitung ulang dari p2h_reports
+        daily_stats_repository.rebuild(db)
+        today = get_current_datetime().date()
+        cases = [
+            ("Tanpa filter", None, None, None),
+            ("30 hari terakhir", today - timedelta(days=30), today, None),
+            ("Rentang tanpa hari ini", today - timedelta(days=60), today - timedelta(days=31), None),
+            ("Tipe kendaraan", None, None, VehicleType.BUS.value),
+            ("30 hari + tipe kendaraan", today - timedelta(days=30), today, VehicleType.LIGHT_VEHICLE.value),
+        ]
+
+        event.listen(engine, "before_cursor_execute", recorder)
+        print("=" * 78)
+        print(f"📊 Statistik dashboard ({reports} laporan, median dari {RUNS} run)")
+        print("=" * 78)
+        print(f"{'Filter':28} {'stmt lama':>10} {'ms lama':>9} {'stmt baru':>10} {'ms baru':>9}")
+        ok = True
+        for name, start_date, end_date, vehicle_type in cases:
+            old, old_count, old_ms = timed(
+                recorder, lambda: legacy_statistics(db, start_date, end_date, vehicle_type)
+            )
+            new, new_count, new_ms = timed(
+                recorder, lambda: dashboard_service.get_dashboard_statistics(db, start_date, end_date, vehicle_type)
+            )
+            passed = new == old and new_count <= MAX_STATEMENTS
+            ok = ok and passed
+            mark = "✅" if passed else "❌"
+            print(f"{mark} {name:26} {old_count:10d} {old_ms:9.1f} {new_count:10d} {new_ms:9.1f}")
+            if new != old:
+                print(f"   lama: {old}")
+                print(f"   baru: {new}")
+        event.remove(engine, "before_cursor_execute", recorder)
+    finally:
+        db.close()
+        outer.rollback()
+        connection.close()
+
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark statistik dashboard satu query")
+    parser.add_argument("--reports", type=int, default=100000, help="Jumlah laporan sintetis")
+    args = parser.parse_args()
+    sys.exit(0 if run_checks(args.reports) else 1)
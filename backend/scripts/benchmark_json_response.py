@@ -0,0 +1,156 @@
+"""
+Benchmark serialisasi list endpoint: jalur lama vs TypeAdapter + orjson.
+
+Jalur lama : Model.model_validate(obj).model_dump(mode='json') per baris,
+             lalu envelope di-encode JSONResponse (json stdlib).
+Jalur baru : app.utils.serializers (TypeAdapter(List[Model]) memvalidasi seluruh
+             list lalu dump_json langsung ke bytes, envelope disusun dari bytes).
+
+Waktu validasi dan encode dilaporkan terpisah: validasi (membaca atribut ORM)
+sama mahalnya di kedua jalur, keuntungan ada di tahap encode.
+
+Objek ORM dibuat transient (tidak disimpan), jadi tidak butuh database. Hasil
+kedua jalur di-decode dan dibandingkan agar payload dipastikan identik.
+
+Cara pakai (dari folder backend):
+    python -m scripts.benchmark_json_response --rows 5000
+"""
+import argparse
+import gc
+import json
+import statistics
+import time
+import uuid
+from datetime import date, datetime, time as dtime, timedelta
+
+from fastapi.responses import JSONResponse
+
+from app.models.user import User, UserRole, UserKategori
+from app.models.vehicle import Vehicle, VehicleType, ShiftType, UnitKategori
+from app.models.checklist import ChecklistTemplate
+from app.models.p2h import P2HReport, P2HDetail, InspectionStatus
+from app.schemas.p2h import P2HReportListResponse
+from app.schemas.user import UserResponse
+from app.schemas.vehicle import VehicleResponse
+from app.utils.response import raw_response
+from app.utils.serializers import list_adapter
+
+RUNS = 5
+
+
+def make_user(i: int) -> User:
+    now = datetime(2026, 1, 1, 7, 0)
+    return User(
+        id=uuid.uuid4(), full_name=f"Driver {i}", email=f"driver{i}@example.com",
+        phone_number=f"0812{i:08d}", birth_date=date(1990, 1, 1) + timedelta(days=i % 3000),
+        role=UserRole.user, kategori_pengguna=UserKategori.IMM, is_active=True,
+        department_id=None, position_id=None, work_status_id=None, company_id=None,
+        department=None, position=None, work_status=None, company=None,
+        created_at=now, updated_at=now,
+    )
+
+
+def make_vehicle(i: int) -> Vehicle:
+    now = datetime(2026, 1, 1, 7, 0)
+    return Vehicle(
+        id=uuid.uuid4(), no_lambung=f"P{i:04d}", warna_no_lambung="kuning", plat_nomor=f"KT {i} AB",
+        lokasi_kendaraan="Site", vehicle_type=VehicleType.LIGHT_VEHICLE, merk="Toyota",
+        user_id=None, company_id=None, custom_user_name=None, no_rangka=None, no_mesin=None,
+        user=None, company=None,
+        stnk_expiry=date(2027, 1, 1), pajak_expiry=date(2027, 1, 1), kir_expiry=None,
+        is_active=True, shift_type=ShiftType.SHIFT, kategori_unit=UnitKategori.IMM,
+        created_at=now, updated_at=now,
+    )
+
+
+# Semua atribut yang dibaca schema diisi, seperti objek hasil query (sudah ada di __dict__)
+def make_reports(rows: int, items: int):
+    checklist = [
+        ChecklistTemplate(
+            id=uuid.uuid4(), item_name=f"Item {i}", section_name="REM", item_order=i + 1, vehicle_type=None,
+            vehicle_tags=[VehicleType.LIGHT_VEHICLE.value], applicable_shifts=[], options=["Baik", "Abnormal"],
+        )
+        for i in range(items)
+    ]
+    users = [make_user(i) for i in range(50)]
+    vehicles = [make_vehicle(i) for i in range(300)]
+    reports = []
+    for i in range(rows):
+        report = P2HReport(
+            id=uuid.uuid4(), shift_number=1 + i % 3, overall_status=InspectionStatus.NORMAL,
+            submission_date=date(2026, 1, 1) - timedelta(days=i % 365), submission_time=dtime(i % 24, i % 60),
+            created_at=datetime(2026, 1, 1, 7, 0),
+        )
+        report.vehicle = vehicles[i % len(vehicles)]
+        report.user = users[i % len(users)]
+        report.details = [
+            P2HDetail(id=uuid.uuid4(), checklist_item=c, status=InspectionStatus.NORMAL, keterangan=None)
+            for c in checklist
+        ]
+        reports.append(report)
+    return reports, users, vehicles
+
+
+def old_path(schema, objs) -> tuple:
+    """(body, detik validasi, detik encode) jalur lama"""
+    started = time.perf_counter()
+    models = [schema.model_validate(o) for o in objs]
+    validated = time.perf_counter()
+    payload = [m.model_dump(mode='json') for m in models]
+    body = JSONResponse(content={"status": "success", "message": "ok", "payload": payload}).body
+    return body, validated - started, time.perf_counter() - validated
+
+
+def new_path(schema, objs) -> tuple:
+    """(body, detik validasi, detik encode) jalur TypeAdapter + orjson"""
+    adapter = list_adapter(schema)
+    started = time.perf_counter()
+    validated_items = adapter.validate_python(list(objs), from_attributes=True)
+    validated = time.perf_counter()
+    body = raw_response("ok", adapter.dump_json(validated_items)).body
+    return body, validated - started, time.perf_counter() - validated
+
+
+def timed(fn, *args) -> tuple:
+    """Median (validasi ms, encode ms) dari RUNS run"""
+    validate_ms, encode_ms, body = [], [], b""
+    for _ in range(RUNS):
+        gc.collect()
+        body, validate_s, encode_s = fn(*args)
+        validate_ms.append(validate_s * 1000)
+        encode_ms.append(encode_s * 1000)
+    return statistics.median(validate_ms), statistics.median(encode_ms), body
+
+
+def run(rows: int, items: int):
+    reports, users, vehicles = make_reports(rows, items)
+    cases = [
+        (f"/p2h/reports ({rows} x {items} detail)", P2HReportListResponse, reports),
+        (f"/vehicles ({rows} kendaraan)", VehicleResponse, (vehicles * (rows // len(vehicles) + 1))[:rows]),
+        (f"/users ({rows} user)", UserResponse, (users * (rows // len(users) + 1))[:rows]),
+    ]
+
+    print("=" * 86)
+    print("📊 Serialisasi list endpoint (median dari %d run, ms)" % RUNS)
+    print("=" * 86)
+    print(f"{'Endpoint':34} {'validasi':>9} {'encode':>9} | {'validasi':>9} {'encode':>9} | {'encode x':>8}")
+    print(f"{'':34} {'(lama)':>9} {'(lama)':>9} | {'(baru)':>9} {'(baru)':>9} |")
+    for name, schema, objs in cases:
+        old_validate, old_encode, old_body = timed(old_path, schema, objs)
+        new_validate, new_encode, new_body = timed(new_path, schema, objs)
+        assert json.loads(old_body) == json.loads(new_body), f"Payload berbeda untuk {name}"
+        print(
+            f"{name:34} {old_validate:9.1f} {old_encode:9.1f} | {new_validate:9.1f} {new_encode:9.1f} |"
+            f" {old_encode / new_encode:7.1f}x"
+        )
+    print("✅ Payload kedua jalur identik")
+    print("ℹ️  Validasi = membaca atribut ORM ke schema (sama-sama di pydantic-core);")
+    print("   encode = dump + JSON envelope (model_dump + json stdlib vs dump_json + orjson)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark serialisasi JSON list endpoint")
+    parser.add_argument("--rows", type=int, default=5000, help="Jumlah baris per list")
+    parser.add_argument("--items", type=int, default=36, help="Jumlah detail per laporan")
+    args = parser.parse_args()
+    run(args.rows, args.items)
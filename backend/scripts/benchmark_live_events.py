@@ -0,0 +1,75 @@
+"""
+Benchmark LiveEventBroadcaster: fan-out event P2H ke banyak koneksi SSE.
+
+Setiap "dashboard" adalah generator stream() yang dikonsumsi di event loop yang
+sama seperti StreamingResponse. Script mengirim sejumlah event (seperti submit
+P2H beruntun) dan mengukur waktu sampai semua koneksi menerima semuanya, lalu
+memastikan urutan id lengkap di setiap koneksi dan semua subscription dilepas
+setelah koneksi ditutup.
+
+Cara pakai (dari folder backend):
+    python -m scripts.benchmark_live_events --clients 100 --events 1000
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from app.services.live_events import LiveEventBroadcaster
+
+
+async def consume(stream, expected: int) -> list:
+    """Id event yang diterima satu koneksi (heartbeat/retry diabaikan)"""
+    ids = []
+    async for frame in stream:
+        if frame.startswith(b"id: "):
+            ids.append(int(frame[4:frame.index(b"\n")]))
+            if len(ids) == expected:
+                break
+    return ids
+
+
+async def run(clients: int, events: int) -> bool:
+    broadcaster = LiveEventBroadcaster()
+    broadcaster.QUEUE_SIZE = max(broadcaster.QUEUE_SIZE, events)
+    streams = [broadcaster.stream() for _ in range(clients)]
+    tasks = [asyncio.create_task(consume(stream, events)) for stream in streams]
+    await asyncio.sleep(0)  # Semua koneksi sudah subscribe sebelum publish
+    while broadcaster.subscriber_count < clients:
+        await asyncio.sleep(0.01)
+
+    payload = {
+        "report_id": "00000000-0000-0000-0000-000000000000", "vehicle_id": "00000000-0000-0000-0000-000000000000",
+        "no_lambung": "LV-001", "vehicle_type": "Light Vehicle", "kategori": "IMM",
+        "shift_number": 1, "status": "normal", "submission_date": "2026-01-01", "submission_time": "06:00:00",
+    }
+    started = time.perf_counter()
+    for _ in range(events):
+        broadcaster.publish("p2h_submitted", payload)
+    publish_ms = (time.perf_counter() - started) * 1000
+    results = await asyncio.gather(*tasks)
+    delivered_ms = (time.perf_counter() - started) * 1000
+
+    for stream in streams:
+        await stream.aclose()
+
+    expected = list(range(1, events + 1))
+    complete = all(ids == expected for ids in results)
+    released = broadcaster.subscriber_count == 0
+
+    print("=" * 64)
+    print(f"📡 Live events ({clients} koneksi, {events} event)")
+    print("=" * 64)
+    print(f"publish total        : {publish_ms:9.1f} ms ({publish_ms * 1000 / events:.1f} µs/event)")
+    print(f"diterima semua klien : {delivered_ms:9.1f} ms ({clients * events} frame)")
+    print(f"{'✅' if complete else '❌'} Urutan id lengkap di setiap koneksi")
+    print(f"{'✅' if released else '❌'} Subscription dilepas setelah koneksi ditutup")
+    return complete and released
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fan-out SSE live dashboard")
+    parser.add_argument("--clients", type=int, default=100, help="Jumlah koneksi dashboard")
+    parser.add_argument("--events", type=int, default=1000, help="Jumlah event")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args.clients, args.events)) else 1)
@@ -0,0 +1,126 @@
+"""
+Benchmark & verifikasi grafik bulanan dashboard: satu GROUP BY vs 36 count.
+
+Jalur lama (direkonstruksi di sini) memanggil get_monthly_counts per bulan dengan
+tiga .count() per status: 36 statement per render grafik. Jalur baru
+(dashboard_repository.get_monthly_reports) memakai satu query
+date_trunc('month') + GROUP BY bulan, status atas agregat p2h_daily_stats di
+rentang [1 Jan, 1 Jan berikutnya).
+
+Script memastikan hasil kedua jalur identik (termasuk bulan tanpa laporan),
+dan jalur baru hanya mengirim satu statement. Index yang dipakai statement itu
+ikut dicetak dari EXPLAIN (rentang setahun penuh bisa wajar memakai Seq Scan
+jika hampir seluruh tabel masuk rentang).
+
+Data sintetis dibuat di dalam transaksi luar yang di-rollback di akhir.
+
+Cara pakai (dari folder backend, setelah `alembic upgrade head`):
+    python -m scripts.benchmark_monthly_reports --reports 100000
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import date
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models.p2h import P2HReport
+from app.models.vehicle import Vehicle, VehicleType
+from app.repositories.dashboard_repository import dashboard_repository
+from app.constants import MONTH_NAMES_ID
+from app.repositories.daily_stats_repository import daily_stats_repository
+from scripts.explain_report_queries import StatementRecorder, index_names, seed
+
+RUNS = 5
+
+
+def legacy_monthly_reports(db: Session, year: int, vehicle_type) -> dict:
+    """Grafik bulanan dengan 3 count per bulan seperti sebelum refactor"""
+    monthly_data = {}
+    for month in range(1, 13):
+        month_start = date(year, month, 1)
+        next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        query = db.query(P2HReport).filter(
+            P2HReport.submission_date >= month_start,
+            P2HReport.submission_date < next_month,
+            P2HReport.is_deleted == False
+        )
+        if vehicle_type is not None:
+            query = query.join(Vehicle).filter(Vehicle.vehicle_type == vehicle_type)
+        monthly_data[MONTH_NAMES_ID[month - 1]] = [
+            query.filter(P2HReport.overall_status == status).count()
+            for status in ("normal", "abnormal", "warning")
+        ]
+    return monthly_data
+
+
+def timed(recorder: StatementRecorder, fn) -> tuple:
+    """(hasil, jumlah statement, median ms)"""
+    timings = []
+    for _ in range(RUNS):
+        recorder.statements.clear()
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, len(recorder.statements), statistics.median(timings)
+
+
+def run_checks(reports: int) -> bool:
+    engine.echo = False
+    connection = engine.connect()
+    outer = connection.begin()
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+    recorder = StatementRecorder()
+
+    try:
+        seed(db, reports, items=0)
+        # Data sintetis di-insert langsung: agregat harian dihitung ulang dari p2h_reports
+        daily_stats_repository.rebuild(db)
+        this_year = date.today().year
+        cases = [
+            (this_year, None),
+            (this_year, VehicleType.BUS.value),
+            (this_year - 1, None),
+            (this_year + 1, None),  # Semua bulan kosong (gap-fill)
+        ]
+
+        event.listen(engine, "before_cursor_execute", recorder)
+        print("=" * 72)
+        print(f"📈 Grafik bulanan ({reports} laporan, median dari {RUNS} run)")
+        print("=" * 72)
+        print(f"{'Tahun / tipe':26} {'stmt lama':>10} {'ms lama':>9} {'stmt baru':>10} {'ms baru':>9}")
+        ok = True
+        for year, vehicle_type in cases:
+            old, old_count, old_ms = timed(recorder, lambda: legacy_monthly_reports(db, year, vehicle_type))
+            new, new_count, new_ms = timed(
+                recorder, lambda: dashboard_repository.get_monthly_reports(db, year, vehicle_type)
+            )
+            statement, parameters = recorder.statements[0]
+            plan = db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+            indexes = index_names(plan[0]["Plan"])
+
+            passed = new == old and new_count == 1
+            ok = ok and passed
+            label = f"{year} / {vehicle_type or 'semua'}"
+            print(f"{'✅' if passed else '❌'} {label:24} {old_count:10d} {old_ms:9.1f} {new_count:10d} {new_ms:9.1f}")
+            print(f"   index: {', '.join(sorted(indexes)) or 'Seq Scan'}")
+            if new != old:
+                print(f"   lama: {old}")
+                print(f"   baru: {new}")
+        event.remove(engine, "before_cursor_execute", recorder)
+    finally:
+        db.close()
+        outer.rollback()
+        connection.close()
+
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark grafik bulanan satu query")
+    parser.add_argument("--reports", type=int, default=100000, help="Jumlah laporan sintetis")
+    args = parser.parse_args()
+    sys.exit(0 if run_checks(args.reports) else 1)
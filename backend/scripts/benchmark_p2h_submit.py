@@ -0,0 +1,131 @@
+"""
+Benchmark submit P2H: jumlah round trip ke database dan latensi (p50/p95) per submit.
+
+Semua data sintetis (user, kendaraan, checklist) dibuat di dalam satu transaksi luar
+yang di-rollback di akhir, sehingga aman dijalankan terhadap database development.
+Commit di dalam P2HService hanya me-release SAVEPOINT.
+
+Cara pakai (dari folder backend):
+    python -m scripts.benchmark_p2h_submit --vehicles 200 --items 36
+
+Jalankan pada commit sebelum dan sesudah perubahan untuk membandingkan hasil.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models.user import User
+from app.models.vehicle import Vehicle, VehicleType, ShiftType
+from app.models.checklist import ChecklistTemplate
+from app.models.p2h import InspectionStatus
+from app.schemas.p2h import P2HReportSubmit, P2HDetailSubmit
+from app.services.p2h_service import p2h_service
+
+
+class StatementCounter:
+    """Menghitung jumlah statement yang benar-benar dikirim ke database"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def seed(db: Session, vehicles: int, items: int):
+    """Buat data sintetis di dalam transaksi benchmark"""
+    suffix = uuid.uuid4().hex[:8]
+    user = User(
+        full_name="Benchmark Driver",
+        phone_number=f"bench-{suffix}",
+        password_hash="-",
+    )
+    db.add(user)
+
+    checklist = [
+        ChecklistTemplate(
+            item_name=f"Benchmark item {i}",
+            section_name="BENCHMARK",
+            item_order=i + 1,
+            vehicle_tags=[VehicleType.LIGHT_VEHICLE.value],
+            applicable_shifts=[],
+            is_active=True,
+        )
+        for i in range(items)
+    ]
+    db.add_all(checklist)
+
+    units = [
+        Vehicle(
+            no_lambung=f"BENCH{suffix}{i}",
+            plat_nomor=f"BENCH {i}",
+            vehicle_type=VehicleType.LIGHT_VEHICLE,
+            shift_type=ShiftType.SHIFT,
+            is_active=True,
+        )
+        for i in range(vehicles)
+    ]
+    db.add_all(units)
+    db.flush()
+
+    return user, [v.id for v in units], [c.id for c in checklist]
+
+
+async def run(vehicles: int, items: int):
+    engine.echo = False
+    connection = engine.connect()
+    outer = connection.begin()
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+
+    try:
+        user, vehicle_ids, checklist_ids = seed(db, vehicles, items)
+        db.commit()
+
+        counter = StatementCounter()
+        event.listen(engine, "before_cursor_execute", counter)
+
+        latencies = []
+        round_trips = []
+        for vehicle_id in vehicle_ids:
+            submission = P2HReportSubmit(
+                vehicle_id=vehicle_id,
+                shift_number=None,
+                details=[
+                    P2HDetailSubmit(checklist_item_id=cid, status=InspectionStatus.NORMAL)
+                    for cid in checklist_ids
+                ],
+            )
+            before = counter.count
+            started = time.perf_counter()
+            await p2h_service.submit_p2h(db, user, submission)
+            latencies.append((time.perf_counter() - started) * 1000)
+            round_trips.append(counter.count - before)
+
+        event.remove(engine, "before_cursor_execute", counter)
+    finally:
+        db.close()
+        outer.rollback()
+        connection.close()
+
+    latencies.sort()
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+    print("=" * 60)
+    print(f"📊 Submit P2H benchmark ({vehicles} submit, {items} item/laporan)")
+    print("=" * 60)
+    print(f"Round trip / submit : {statistics.mean(round_trips):.1f} (max {max(round_trips)})")
+    print(f"Latency p50         : {statistics.median(latencies):.2f} ms")
+    print(f"Latency p95         : {p95:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark submit P2H")
+    parser.add_argument("--vehicles", type=int, default=100, help="Jumlah submit (1 kendaraan per submit)")
+    parser.add_argument("--items", type=int, default=36, help="Jumlah item checklist per laporan")
+    args = parser.parse_args()
+    asyncio.run(run(args.vehicles, args.items))
@@ -0,0 +1,205 @@
+"""
+Benchmark index partial (WHERE is_deleted = false / WHERE is_active) vs index penuh.
+
+Dataset sintetis dengan porsi laporan soft delete dan kendaraan non-aktif yang besar
+dibuat di dalam satu transaksi luar yang di-rollback di akhir. Query hot path
+dijalankan lewat fungsi repository yang sebenarnya, lalu statement-nya diukur
+dengan EXPLAIN (ANALYZE, BUFFERS):
+    1. "sesudah" : index partial dari migrasi e1f2a3b4c5d6
+    2. "sebelum" : index yang sama dibuat ulang tanpa WHERE (definisi lama)
+Pencarian laporan per plat (termasuk unit non-aktif) ikut diukur karena index
+trigram penuh ix_vehicles_plat_nomor_trgm dihapus oleh migrasi tersebut.
+
+DDL ikut di-rollback, tetapi memegang lock tabel selama benchmark berjalan:
+jalankan hanya terhadap database development.
+
+Cara pakai (dari folder backend, setelah `alembic upgrade head`):
+    python -m scripts.benchmark_partial_indexes --reports 200000 --deleted-ratio 0.4
+"""
+import argparse
+import statistics
+import uuid
+from datetime import date, timedelta
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models.user import User
+from app.models.vehicle import Vehicle, VehicleType, ShiftType
+from app.repositories.p2h_repository import p2h_repository
+from scripts.explain_report_queries import StatementRecorder
+
+DAYS = 365
+RUNS = 5
+
+# (nama index, tabel, kolom, opsi CREATE INDEX, predicate partial)
+PARTIAL_INDEXES = [
+    ("ix_p2h_reports_keyset", "p2h_reports", "submission_date, submission_time, id", "", "is_deleted = false"),
+    ("ix_p2h_reports_vehicle_keyset", "p2h_reports", "vehicle_id, submission_date, submission_time, id", "", "is_deleted = false"),
+    ("ix_p2h_reports_user_keyset", "p2h_reports", "user_id, submission_date, submission_time, id", "", "is_deleted = false"),
+    ("ix_p2h_reports_status_keyset", "p2h_reports", "overall_status, submission_date, submission_time, id", "", "is_deleted = false"),
+    ("ix_p2h_reports_date_status", "p2h_reports", "submission_date, overall_status", "", "is_deleted = false"),
+    ("ix_vehicles_active_plat_nomor_trgm", "vehicles", "plat_nomor gin_trgm_ops", "USING gin", "is_active"),
+    ("ix_vehicles_active_created_at", "vehicles", "created_at", "", "is_active"),
+]
+
+
+def seed(db: Session, reports: int, vehicles: int, deleted_ratio: float):
+    """Laporan tersebar DAYS hari; `deleted_ratio` laporan & kendaraan di-soft delete"""
+    suffix = uuid.uuid4().hex[:8]
+    users = [
+        User(full_name=f"Bench Partial {i}", phone_number=f"bench-partial-{suffix}-{i}", password_hash="-")
+        for i in range(50)
+    ]
+    units = [
+        Vehicle(
+            no_lambung=f"BP{suffix}{i}",
+            plat_nomor=f"BP {i} {suffix[:3].upper()}",
+            vehicle_type=VehicleType.LIGHT_VEHICLE,
+            shift_type=ShiftType.SHIFT,
+            is_active=(i % 100) >= deleted_ratio * 100,
+        )
+        for i in range(vehicles)
+    ]
+    db.add_all(users + units)
+    db.flush()
+
+    db.execute(text("""
+        INSERT INTO p2h_reports (id, vehicle_id, user_id, shift_number, overall_status,
+                                 submission_date, submission_time, created_at, updated_at, is_deleted)
+        SELECT gen_random_uuid(),
+               (CAST(:vehicle_ids AS uuid[]))[1 + g % cardinality(CAST(:vehicle_ids AS uuid[]))],
+               (CAST(:user_ids AS uuid[]))[1 + g % cardinality(CAST(:user_ids AS uuid[]))],
+               1 + g % 3,
+               (CASE WHEN g % 20 = 0 THEN 'ABNORMAL' WHEN g % 7 = 0 THEN 'WARNING' ELSE 'NORMAL' END)::inspectionstatus,
+               CAST(:today AS date) - (g % :days),
+               make_time(g % 24, g % 60, 0),
+               now(), now(),
+               random() < :deleted_ratio
+        FROM generate_series(1, :reports) AS g
+    """), {
+        "reports": reports,
+        "days": DAYS,
+        "today": date.today(),
+        "deleted_ratio": deleted_ratio,
+        "vehicle_ids": [str(v.id) for v in units],
+        "user_ids": [str(u.id) for u in users],
+    })
+    return units[-1]
+
+
+def analyze(db: Session) -> None:
+    db.execute(text("ANALYZE p2h_reports"))
+    db.execute(text("ANALYZE vehicles"))
+
+
+def index_sizes(db: Session) -> dict:
+    names = [name for name, *_ in PARTIAL_INDEXES]
+    rows = db.execute(
+        text("SELECT relname, pg_relation_size(oid) FROM pg_class WHERE relname = ANY(:names)"),
+        {"names": names}
+    ).all()
+    return dict(rows)
+
+
+def rebuild_indexes(db: Session, partial: bool) -> None:
+    """Buat ulang semua index dalam bentuk partial atau penuh"""
+    for name, table, columns, using, predicate in PARTIAL_INDEXES:
+        where = f" WHERE {predicate}" if partial else ""
+        db.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        db.execute(text(f"CREATE INDEX {name} ON {table} {using} ({columns}){where}"))
+    analyze(db)
+
+
+def measure(db: Session, recorder: StatementRecorder, run) -> tuple:
+    """Median waktu eksekusi (ms) dan jumlah buffer dari EXPLAIN ANALYZE statement pertama `run`"""
+    recorder.statements.clear()
+    run()
+    statement, parameters = recorder.statements[0]
+    connection = db.connection()
+
+    timings, buffers = [], 0
+    for _ in range(RUNS):
+        result = connection.exec_driver_sql(
+            "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters
+        ).scalar()[0]
+        timings.append(result["Execution Time"])
+        buffers = result["Plan"].get("Shared Hit Blocks", 0) + result["Plan"].get("Shared Read Blocks", 0)
+    return statistics.median(timings), buffers
+
+
+def run(reports: int, vehicles: int, deleted_ratio: float):
+    engine.echo = False
+    connection = engine.connect()
+    outer = connection.begin()
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+    recorder = StatementRecorder()
+
+    try:
+        vehicle = seed(db, reports, vehicles, deleted_ratio)
+        today = date.today()
+        month_ago = today - timedelta(days=30)
+
+        queries = [
+            ("Halaman pertama /p2h/reports", lambda: p2h_repository.get_reports_page(db, 51)),
+            ("Laporan per unit", lambda: p2h_repository.get_reports_page(
+                db, 51, filters=p2h_repository.report_filter_clauses(vehicle_id=vehicle.id)
+            )),
+            ("Kartu abnormal 30 hari", lambda: p2h_repository.count_by_status(db, "abnormal", month_ago, today)),
+            ("Unit sudah P2H hari ini", lambda: p2h_repository.get_vehicles_reported_on_date(db, today)),
+            ("Status shift unit", lambda: p2h_repository.count_reports_by_shift(db, vehicle.id, today)),
+            ("Kendaraan aktif terbaru", lambda: db.query(Vehicle).filter(
+                Vehicle.is_active == True
+            ).order_by(Vehicle.created_at.desc()).limit(50).all()),
+            ("Cari plat kendaraan aktif", lambda: db.query(Vehicle).filter(
+                Vehicle.is_active == True, Vehicle.plat_nomor.ilike("%12%")
+            ).limit(20).all()),
+            ("Cari laporan (plat/nama)", lambda: p2h_repository.get_reports_page(
+                db, 51, filters=p2h_repository.report_filter_clauses(search="12")
+            )),
+        ]
+
+        # Migrasi mengganti index trigram penuh, bukan menambah di sampingnya
+        legacy_dropped = db.execute(
+            text("SELECT to_regclass('ix_vehicles_plat_nomor_trgm') IS NULL")
+        ).scalar()
+
+        event.listen(engine, "before_cursor_execute", recorder)
+        results = {}
+        for label, partial in (("sesudah", True), ("sebelum", False)):
+            rebuild_indexes(db, partial)
+            results[label] = {
+                "sizes": index_sizes(db),
+                "queries": {name: measure(db, recorder, q) for name, q in queries},
+            }
+        event.remove(engine, "before_cursor_execute", recorder)
+    finally:
+        db.close()
+        outer.rollback()
+        connection.close()
+
+    print("=" * 78)
+    print(f"📊 Index partial ({reports} laporan, {vehicles} kendaraan, {deleted_ratio:.0%} soft delete)")
+    print("=" * 78)
+    print(f"{'Query':32} {'sebelum ms':>11} {'sesudah ms':>11} {'buf sebelum':>11} {'buf sesudah':>11}")
+    for name in results["sesudah"]["queries"]:
+        before_ms, before_buf = results["sebelum"]["queries"][name]
+        after_ms, after_buf = results["sesudah"]["queries"][name]
+        print(f"{name:32} {before_ms:11.2f} {after_ms:11.2f} {before_buf:11d} {after_buf:11d}")
+    print("-" * 78)
+    print(f"{'Index':38} {'sebelum KB':>12} {'sesudah KB':>12}")
+    for name, *_ in PARTIAL_INDEXES:
+        before = results["sebelum"]["sizes"].get(name, 0) // 1024
+        after = results["sesudah"]["sizes"].get(name, 0) // 1024
+        print(f"{name:38} {before:12d} {after:12d}")
+    print(f"{'✅' if legacy_dropped else '❌'} Index penuh ix_vehicles_plat_nomor_trgm sudah dihapus")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark index partial vs index penuh")
+    parser.add_argument("--reports", type=int, default=200000, help="Jumlah laporan sintetis")
+    parser.add_argument("--vehicles", type=int, default=2000, help="Jumlah kendaraan sintetis")
+    parser.add_argument("--deleted-ratio", type=float, default=0.4, help="Porsi laporan/kendaraan soft delete")
+    args = parser.parse_args()
+    run(args.reports, args.vehicles, args.deleted_ratio)
@@ -0,0 +1,231 @@
+"""
+Verifikasi EXPLAIN untuk jalur akses laporan P2H: memastikan query repository
+memakai index (bukan seq scan) pada dataset sintetis yang besar.
+
+Data sintetis (user, kendaraan, checklist, laporan, detail) dibuat di dalam satu
+transaksi luar yang di-rollback di akhir, sehingga aman dijalankan terhadap
+database development. Query dijalankan lewat fungsi repository yang sebenarnya;
+statement SQL-nya ditangkap lalu di-EXPLAIN dengan parameter yang sama.
+
+Cara pakai (dari folder backend, setelah `alembic upgrade head`):
+    python -m scripts.explain_report_queries --reports 50000 --items 10
+
+Exit code 1 jika ada jalur akses yang tidak memakai index yang diharapkan.
+"""
+import argparse
+import sys
+import uuid
+from datetime import date, timedelta
+
+from sqlalchemy import event, func, text
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models.user import User
+from app.models.vehicle import Vehicle, VehicleType, ShiftType
+from app.models.checklist import ChecklistTemplate
+from app.models.p2h import P2HDetail, InspectionStatus
+from app.repositories.p2h_repository import p2h_repository
+from app.repositories.dashboard_repository import dashboard_repository
+
+DAYS = 365
+
+
+class StatementRecorder:
+    """Menyimpan statement (SQL driver + parameter) yang dikirim ke database"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            self.statements.append((statement, parameters))
+
+
+def seed(db: Session, reports: int, items: int):
+    """Buat data sintetis: laporan tersebar DAYS hari ke belakang, `items` detail per laporan"""
+    suffix = uuid.uuid4().hex[:8]
+    users = [
+        User(full_name=f"Explain Driver {i}", phone_number=f"explain-{suffix}-{i}", password_hash="-")
+        for i in range(50)
+    ]
+    vehicles = [
+        Vehicle(
+            no_lambung=f"EXPL{suffix}{i}",
+            plat_nomor=f"EXPL {i}",
+            vehicle_type=list(VehicleType)[i % len(VehicleType)],
+            shift_type=ShiftType.SHIFT,
+            is_active=True,
+        )
+        for i in range(300)
+    ]
+    checklist = [
+        ChecklistTemplate(
+            item_name=f"Explain item {i}",
+            section_name="EXPLAIN",
+            item_order=i + 1,
+            vehicle_tags=[VehicleType.LIGHT_VEHICLE.value],
+            applicable_shifts=[],
+            is_active=True,
+        )
+        for i in range(items)
+    ]
+    db.add_all(users + vehicles + checklist)
+    db.flush()
+
+    params = {
+        "reports": reports,
+        "days": DAYS,
+        "today": date.today(),
+        "vehicle_ids": [str(v.id) for v in vehicles],
+        "user_ids": [str(u.id) for u in users],
+    }
+    db.execute(text("""
+        INSERT INTO p2h_reports (id, vehicle_id, user_id, shift_number, overall_status,
+                                 submission_date, submission_time, created_at, updated_at, is_deleted)
+        SELECT gen_random_uuid(),
+               (CAST(:vehicle_ids AS uuid[]))[1 + g % cardinality(CAST(:vehicle_ids AS uuid[]))],
+               (CAST(:user_ids AS uuid[]))[1 + g % cardinality(CAST(:user_ids AS uuid[]))],
+               1 + g % 3,
+               (CASE WHEN g % 20 = 0 THEN 'ABNORMAL' WHEN g % 7 = 0 THEN 'WARNING' ELSE 'NORMAL' END)::inspectionstatus,
+               CAST(:today AS date) - (g % :days),
+               make_time(g % 24, g % 60, 0),
+               now(), now(),
+               g % 50 = 0
+        FROM generate_series(1, :reports) AS g
+    """), params)
+    db.execute(text("""
+        INSERT INTO p2h_details (id, report_id, checklist_item_id, status, is_deleted)
+        SELECT gen_random_uuid(), r.id, c.id,
+               (CASE WHEN random() < 0.03 THEN 'ABNORMAL' ELSE 'NORMAL' END)::inspectionstatus,
+               false
+        FROM p2h_reports r
+        CROSS JOIN checklist_templates c
+        WHERE r.vehicle_id = ANY(CAST(:vehicle_ids AS uuid[]))
+          AND c.section_name = 'EXPLAIN'
+    """), params)
+    db.execute(text("ANALYZE p2h_reports"))
+    db.execute(text("ANALYZE p2h_details"))
+    db.execute(text("ANALYZE vehicles"))
+    db.execute(text("ANALYZE users"))
+
+    return vehicles[0], users[0], checklist[0]
+
+
+def index_names(plan: dict) -> set:
+    """Semua nama index yang dipakai di pohon plan"""
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= index_names(child)
+    return names
+
+
+def explain(db: Session, recorder: StatementRecorder, run, table: str) -> set:
+    """Jalankan `run`, ambil statement pertama yang membaca `table`, lalu EXPLAIN statement itu"""
+    recorder.statements.clear()
+    run()
+    statement, parameters = next(
+        (s, p) for s, p in recorder.statements if f"FROM {table}" in s
+    )
+    connection = db.connection()
+    plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    return index_names(plan[0]["Plan"])
+
+
+def run_checks(reports: int, items: int) -> bool:
+    engine.echo = False
+    connection = engine.connect()
+    outer = connection.begin()
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+    recorder = StatementRecorder()
+
+    try:
+        vehicle, user, item = seed(db, reports, items)
+        today = date.today()
+        week_ago = today - timedelta(days=7)
+        report_id = db.query(P2HDetail.report_id).limit(1).scalar()
+
+        event.listen(engine, "before_cursor_execute", recorder)
+        checks = [
+            (
+                "Kartu status dashboard (rentang tanggal + status)",
+                lambda: p2h_repository.count_by_status(db, "abnormal", week_ago, today),
+                "p2h_reports",
+                {"ix_p2h_reports_date_status", "ix_p2h_reports_status_keyset"},
+            ),
+            (
+                "Unit yang sudah P2H pada satu tanggal",
+                lambda: p2h_repository.get_vehicles_reported_on_date(db, today),
+                "p2h_reports",
+                {"ix_p2h_reports_date_status", "ix_p2h_reports_keyset"},
+            ),
+            (
+                "Grafik bulanan (range satu bulan)",
+                lambda: p2h_repository.get_monthly_counts(db, today.year, today.month),
+                "p2h_reports",
+                {"ix_p2h_reports_date_status", "ix_p2h_reports_status_keyset"},
+            ),
+            (
+                "Status per tipe kendaraan (rentang tanggal)",
+                lambda: dashboard_repository.get_vehicle_type_status(db, VehicleType.BUS.value, week_ago, today),
+                "p2h_reports",
+                {"ix_p2h_reports_date_status", "ix_p2h_reports_vehicle_keyset", "ix_p2h_reports_status_keyset"},
+            ),
+            (
+                "Halaman pertama /p2h/reports",
+                lambda: p2h_repository.get_reports_page(db, 51),
+                "p2h_reports",
+                {"ix_p2h_reports_keyset"},
+            ),
+            (
+                "Laporan per unit (vehicle_id, submission_date)",
+                lambda: p2h_repository.get_reports_page(
+                    db, 51, filters=p2h_repository.report_filter_clauses(vehicle_id=vehicle.id)
+                ),
+                "p2h_reports",
+                {"ix_p2h_reports_vehicle_keyset"},
+            ),
+            (
+                "Detail satu laporan (p2h_details.report_id)",
+                lambda: p2h_repository.get_report_with_details(db, report_id),
+                "p2h_details",
+                {"ix_p2h_details_report_status"},
+            ),
+            (
+                "Item checklist abnormal (checklist_item_id, status)",
+                lambda: db.query(func.count(P2HDetail.id)).filter(
+                    P2HDetail.checklist_item_id == item.id,
+                    P2HDetail.status == InspectionStatus.ABNORMAL
+                ).scalar(),
+                "p2h_details",
+                {"ix_p2h_details_checklist_item_status"},
+            ),
+        ]
+
+        print("=" * 60)
+        print(f"🔎 EXPLAIN jalur akses laporan ({reports} laporan, {items} detail/laporan)")
+        print("=" * 60)
+        ok = True
+        for name, run, table, expected in checks:
+            used = explain(db, recorder, run, table)
+            passed = bool(used & expected)
+            ok = ok and passed
+            mark = "✅" if passed else "❌"
+            print(f"{mark} {name}: {', '.join(sorted(used)) or 'Seq Scan'}")
+            if not passed:
+                print(f"   diharapkan salah satu dari: {', '.join(sorted(expected))}")
+        event.remove(engine, "before_cursor_execute", recorder)
+    finally:
+        db.close()
+        outer.rollback()
+        connection.close()
+
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifikasi EXPLAIN jalur akses laporan P2H")
+    parser.add_argument("--reports", type=int, default=50000, help="Jumlah laporan sintetis")
+    parser.add_argument("--items", type=int, default=10, help="Jumlah detail per laporan")
+    args = parser.parse_args()
+    sys.exit(0 if run_checks(args.reports, args.items) else 1)
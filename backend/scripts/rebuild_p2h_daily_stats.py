@@ -0,0 +1,50 @@
+"""
+Rebuild tabel agregat p2h_daily_stats dari p2h_reports.
+
+Agregat diperbarui otomatis saat submit / soft delete laporan. Script ini untuk
+backfill dan perbaikan (mis. setelah laporan diubah langsung di database):
+baris agregat di rentang tanggal dihapus lalu dihitung ulang dalam satu transaksi.
+Tabel dikunci selama rebuild sehingga submit bersamaan menunggu, tidak hilang.
+
+Cara pakai (dari folder backend, setelah `alembic upgrade head`):
+    python -m scripts.rebuild_p2h_daily_stats                      # seluruh histori
+    python -m scripts.rebuild_p2h_daily_stats --start 2026-01-01 --end 2026-01-31
+"""
+import argparse
+import time
+from datetime import date
+
+from sqlalchemy import func, select
+
+from app.database import SessionLocal
+from app.models.p2h import P2HDailyStat
+from app.repositories.daily_stats_repository import daily_stats_repository
+
+
+def rebuild(start_date, end_date) -> None:
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        rows = daily_stats_repository.rebuild(db, start_date, end_date)
+        total = db.execute(
+            select(func.coalesce(func.sum(P2HDailyStat.report_count), 0)).where(
+                *daily_stats_repository.filter_clauses(start_date, end_date)
+            )
+        ).scalar()
+        db.commit()
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"✅ p2h_daily_stats {start_date or 'awal'} s/d {end_date or 'akhir'}: "
+              f"{rows} baris agregat, {total} laporan ({elapsed:.0f} ms)")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild agregat harian p2h_daily_stats")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="Tanggal awal (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="Tanggal akhir (YYYY-MM-DD)")
+    args = parser.parse_args()
+    rebuild(args.start, args.end)